@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from google.genai import types
+from scientific_research_system.agents.main_adk import write_report
+from scientific_research_system.agents.progress import TokenUsage
+from scientific_research_system.agents.research_app import EXECUTION_MODES, create_research_system
+from scientific_research_system.agents.runtime import APP_NAME, create_runner
+from scientific_research_system.config import Config
+from scientific_research_system.tools.telemetry import run_summary
+
+USER_ID = "batch"
+
+
+def read_topics(path: str) -> list[str]:
+    """
+    One topic per line; blank lines, '#' comments and repeated topics are skipped.
+    """
+    topics = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            topic = line.strip()
+            if topic and not topic.startswith("#") and topic.lower() not in seen:
+                seen.add(topic.lower())
+                topics.append(topic)
+    return topics
+
+
+def report_filename(index: int, topic: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", topic).strip("_")[:80]
+    return f"{index:04d}_{slug}.md"
+
+
+async def run_topic(topic: str, session_id: str, execution_mode: str, resume: bool = False) -> dict:
+    """
+    Runs the workflow for one topic in its own session. Returns the final state,
+    the number of events and, per agent, when it finished (seconds since the start)
+    and the tokens it used, plus the latency and cost per model tier.
+    """
+    workflow = create_research_system(execution_mode=execution_mode, resume=resume)
+    runner = create_runner(workflow)
+    await runner.session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+    started = time.perf_counter()
+    finished = {}
+    events = 0
+    invocation_id = None
+    tokens = TokenUsage()
+    message = types.Content(role="user", parts=[types.Part(text=topic)])
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=message):
+        events += 1
+        invocation_id = event.invocation_id
+        finished[event.author] = round(time.perf_counter() - started, 2)
+        tokens.update(event)
+
+    session = await runner.session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    return {
+        "state": dict(session.state) if session else {},
+        "events": events,
+        "agent_finished_at": finished,
+        "tokens": tokens.rows(),
+        "model_tiers": run_summary(invocation_id)["tiers"] if Config.TELEMETRY_ENABLED and invocation_id else {},
+    }
+
+
+def _process_topic(index: int, topic: str, batch_id: str, execution_mode: str,
+                   output_dir: str, resume: bool) -> dict:
+    """
+    Worker: runs one topic on this thread's own event loop (so blocking tools only
+    stall this topic), writes its report and returns the summary record.
+    """
+    session_id = f"batch_{batch_id}_{index:04d}"
+    record = {
+        "index": index,
+        "topic": topic,
+        "session_id": session_id,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    started = time.perf_counter()
+    try:
+        result = asyncio.run(run_topic(topic, session_id, execution_mode, resume))
+        state = result["state"]
+        record.update(events=result["events"], agent_finished_at=result["agent_finished_at"],
+                      tokens=result["tokens"], model_tiers=result["model_tiers"])
+        if "draft" in state:
+            path = os.path.join(output_dir, report_filename(index, topic))
+            write_report(path, topic, state)
+            record.update(status="ok", report=path)
+        else:
+            record.update(status="no_draft", state_keys=sorted(state))
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - started, 2)
+    record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return record
+
+
+def run_batch(topics: list[str], workers: int = None, execution_mode: str = None,
+              output_dir: str = "batch_output", resume: bool = False, summary_path: str = None) -> list[dict]:
+    """
+    Runs many topics concurrently on a pool of workers. Search, LLM and checkpoint
+    caches and the rate limits are process-wide, so every worker shares them.
+    Each finished topic's report is written immediately, and its summary record
+    is appended to the JSONL summary as soon as it completes.
+    """
+    workers = workers or Config.BATCH_WORKERS
+    execution_mode = execution_mode or Config.EXECUTION_MODE
+    os.makedirs(output_dir, exist_ok=True)
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = summary_path or os.path.join(output_dir, f"summary_{batch_id}.jsonl")
+
+    started = time.perf_counter()
+    records = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="topic") as pool, \
+            open(summary_path, "a", encoding="utf-8") as summary:
+        futures = [
+            pool.submit(_process_topic, i, topic, batch_id, execution_mode, output_dir, resume)
+            for i, topic in enumerate(topics)
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            summary.write(json.dumps(record) + "\n")
+            summary.flush()
+            records.append(record)
+            print(f"[{len(records)}/{len(topics)}] {record['status']:8s} {record['seconds']:8.1f}s  {record['topic']}")
+
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in records if r["status"] == "ok")
+    per_hour = succeeded * 3600 / elapsed if elapsed else 0.0
+    print(f"\n{succeeded}/{len(topics)} topics completed in {elapsed:.0f}s "
+          f"({per_hour:.1f} topics/hour, {workers} workers, {execution_mode} mode).")
+    print(f"Summary: {summary_path}")
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the research workflow over many topics.")
+    parser.add_argument("topics_file", help="Text file with one research topic per line.")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS,
+                        help="Topics processed concurrently.")
+    parser.add_argument("--mode", choices=EXECUTION_MODES, default=Config.EXECUTION_MODE,
+                        help="Execution mode of each workflow.")
+    parser.add_argument("--output-dir", default="batch_output", help="Directory for reports and the summary.")
+    parser.add_argument("--summary", default=None, help="JSONL summary path (default: <output-dir>/summary_<timestamp>.jsonl).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse checkpointed stages from earlier runs of the same topics.")
+    args = parser.parse_args(argv)
+
+    # Replaying a recorded run never reaches the model
+    if not Config.GOOGLE_API_KEY and Config.LLM_CACHE_MODE != "replay":
+        print("Error: GOOGLE_API_KEY not set.")
+        return
+
+    topics = read_topics(args.topics_file)
+    if not topics:
+        print(f"No topics found in {args.topics_file}.")
+        return
+
+    print(f"=== Batch research: {len(topics)} topics, {args.workers} workers ===")
+    run_batch(topics, args.workers, args.mode, args.output_dir, args.resume, args.summary)
+
+
+if __name__ == "__main__":
+    main()
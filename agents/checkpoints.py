@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from scientific_research_system.config import Config
+from scientific_research_system.tools.telemetry import record_cache
+
+
+def checkpoint_run_id(topic: str) -> str:
+    """
+    Stable run identifier for a research topic, so a rerun of the same topic
+    finds the checkpoints of the previous attempt.
+    """
+    normalized = " ".join(topic.strip().lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """
+    Durable per-stage checkpoints backed by SQLite (WAL, safe across processes).
+    One row per (run, stage) holds the hash of the stage inputs and the output
+    state keys the stage produced.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.CHECKPOINT_PATH
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connect().execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                outputs TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, stage)
+            )
+            """
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, run_id: str, stage: str):
+        """
+        Returns (input_hash, outputs) for a finished stage, or None.
+        """
+        row = self._connect().execute(
+            "SELECT input_hash, outputs FROM checkpoints WHERE run_id = ? AND stage = ?",
+            (run_id, stage),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def save(self, run_id: str, stage: str, input_hash: str, outputs: dict):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO checkpoints(run_id, stage, input_hash, outputs, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (run_id, stage, input_hash, json.dumps(outputs), time.time()),
+        )
+
+    def completed_stages(self, run_id: str) -> list[str]:
+        """
+        Stages checkpointed for a run, in the order they finished.
+        """
+        rows = self._connect().execute(
+            "SELECT stage FROM checkpoints WHERE run_id = ? ORDER BY updated_at", (run_id,)
+        )
+        return [stage for (stage,) in rows]
+
+    def clear(self, run_id: str):
+        self._connect().execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Returns the store shared by every checkpointed stage in this process.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
+
+
+def _describe(agent: BaseAgent) -> dict:
+    """
+    Everything about an agent subtree that changes what it produces:
+    instructions, models, tools and output keys.
+    """
+    instruction = getattr(agent, "instruction", None)
+    model = getattr(agent, "model", "")
+    return {
+        "type": type(agent).__name__,
+        "name": agent.name,
+        "instruction": instruction if isinstance(instruction, str) else repr(instruction),
+        "model": str(getattr(model, "model", model)),
+        "output_key": getattr(agent, "output_key", None),
+        "tools": [getattr(t, "name", repr(t)) for t in getattr(agent, "tools", [])],
+        "sub_agents": [_describe(sub) for sub in agent.sub_agents],
+    }
+
+
+def output_authors(agent: BaseAgent, authors: dict = None) -> dict:
+    """
+    Maps each output key in the subtree to the name of the agent that writes it.
+    """
+    authors = {} if authors is None else authors
+    if getattr(agent, "output_key", None):
+        authors[agent.output_key] = agent.name
+    for sub in agent.sub_agents:
+        output_authors(sub, authors)
+    return authors
+
+
+class CheckpointedStage(BaseAgent):
+    """
+    Runs one workflow stage and checkpoints its output state keys when it finishes.
+
+    The checkpoint is keyed by the research topic and the stage name, and stores
+    a content hash of everything the stage depends on: the topic, the stage
+    definition (prompts, models, tools) and the session state keys it reads.
+    With `resume=True` a stage whose hash matches its checkpoint is not run;
+    its outputs are restored from the checkpoint instead.
+    """
+
+    reads: list[str] = []
+    writes: list[str] = []
+    resume: bool = False
+
+    @classmethod
+    def wrap(cls, stage: BaseAgent, reads: list[str], writes: list[str], resume: bool = False):
+        return cls(
+            name=f"{stage.name}_checkpoint",
+            description=stage.description,
+            sub_agents=[stage],
+            reads=reads,
+            writes=writes,
+            resume=resume,
+        )
+
+    def _input_hash(self, topic: str, state) -> str:
+        payload = json.dumps(
+            [topic, _describe(self.sub_agents[0]), {key: state.get(key) for key in self.reads}],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        stage = self.sub_agents[0]
+        topic = ""
+        if ctx.user_content and ctx.user_content.parts:
+            topic = "".join(part.text or "" for part in ctx.user_content.parts)
+        run_id = checkpoint_run_id(topic)
+        store = get_checkpoint_store()
+        input_hash = self._input_hash(topic, ctx.session.state)
+
+        if self.resume:
+            saved = store.load(run_id, stage.name)
+            restored = saved is not None and saved[0] == input_hash and all(key in saved[1] for key in self.writes)
+            record_cache("checkpoint", stage.name, hit=restored)
+            if restored:
+                # Restore the outputs as the stage's own answers, so later
+                # agents also see them in the conversation history
+                authors = output_authors(stage)
+                for key in self.writes:
+                    value = saved[1][key]
+                    text = value if isinstance(value, str) else json.dumps(value)
+                    yield Event(
+                        invocation_id=ctx.invocation_id,
+                        author=authors.get(key, stage.name),
+                        branch=ctx.branch,
+                        content=types.Content(role="model", parts=[types.Part(text=text)]),
+                        actions=EventActions(state_delta={key: value}),
+                        custom_metadata={"checkpoint": "restored"},
+                    )
+                return
+
+        async for event in stage.run_async(ctx):
+            yield event
+
+        state = ctx.session.state
+        outputs = {key: state[key] for key in self.writes if key in state}
+        store.save(run_id, stage.name, input_hash, outputs)
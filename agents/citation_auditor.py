@@ -1,11 +1,12 @@
 from google.adk.agents import LlmAgent
-from scientific_research_system.tools.citation_tools import fetch_citation_tool, detect_anomaly_tool
+from scientific_research_system.tools.citation_tools import fetch_citation_tool, detect_anomaly_tool, audit_graph_tool
+from scientific_research_system.tools.corpus_tools import search_corpus_tool, paper_references_tool
 from scientific_research_system.config import Config
 
 citation_auditor_agent = LlmAgent(
     name="citation_auditor",
     model=Config.MODEL_NAME,
-    tools=[fetch_citation_tool, detect_anomaly_tool],
+    tools=[fetch_citation_tool, detect_anomaly_tool, audit_graph_tool, search_corpus_tool, paper_references_tool],
     instruction="""
     You are a Citation Integrity Specialist.
     
@@ -13,7 +14,11 @@ citation_auditor_agent = LlmAgent(
     
     1. Use `fetch_citation_metadata` to get citations for the paper (assume paper_id is 'current_paper').
     2. Use `detect_temporal_anomaly` with the paper's publication date (assume today's date or '2023-10-01' if not specified).
-    3. Calculate a Citation Integrity Score (0-100) based on the percentage of valid citations.
+    3. When several papers are involved, call `audit_citation_graph` once with their paper IDs (or with no
+       arguments to audit the whole local citation store) instead of checking papers one at a time.
+    4. If the paper's full text is in the local corpus (`search_local_corpus`), use `extract_paper_references`
+       to get the arXiv IDs and DOIs it actually cites, and flag references that do not resolve.
+    5. Calculate a Citation Integrity Score (0-100) based on the percentage of valid citations.
     
     Return a JSON object with:
     - `score`: (int) 0-100
@@ -0,0 +1,79 @@
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from scientific_research_system.config import Config
+from scientific_research_system.tools.context_compaction import (
+    build_digests, estimate_text_tokens, parse_budgets, select_digest
+)
+
+# Headings of the sources inside a digest
+SOURCE_LABELS = {"arxiv_results": "ArXiv Findings", "web_results": "Web Findings"}
+
+
+def context_key(consumer: str) -> str:
+    """
+    State key holding the compacted context of one consumer agent.
+    """
+    return f"{consumer}_context"
+
+
+class ContextCompactor(BaseAgent):
+    """
+    Deterministic stage (no model call) that compacts the mining output once for
+    every downstream agent.
+
+    Digests of the sources are built at several granularities (raw, deduplicated,
+    extractive summaries, lead sentences only). Each consumer gets the largest
+    digest that fits its token budget in `<consumer>_context`, so the big mining
+    blobs are no longer pasted in full into every prompt. The level chosen and
+    the token counts before and after are reported in the event metadata.
+    """
+
+    consumers: dict[str, list[str]] = {}
+    budgets: dict[str, int] = {}
+
+    @classmethod
+    def build(cls, name: str, consumers: dict[str, list[str]], budgets: dict[str, int] = None):
+        """
+        `consumers` maps each consumer agent to the state keys it needs compacted.
+        Without compaction enabled, every consumer gets the raw sources.
+        """
+        if budgets is None:
+            budgets = parse_budgets(Config.CONTEXT_BUDGETS) if Config.CONTEXT_COMPACTION_ENABLED else {}
+        return cls(name=name, consumers=consumers, budgets=budgets)
+
+    def reads(self) -> list[str]:
+        keys = []
+        for sources in self.consumers.values():
+            keys += [key for key in sources if key not in keys]
+        return keys
+
+    def writes(self) -> list[str]:
+        return [context_key(consumer) for consumer in self.consumers]
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        digests = {}
+        delta = {}
+        report = {}
+        for consumer, sources in self.consumers.items():
+            # Consumers of the same sources share one set of digests
+            key = tuple(sources)
+            if key not in digests:
+                digests[key] = build_digests({s: state.get(s, "") for s in sources}, SOURCE_LABELS)
+            level, text = select_digest(digests[key], self.budgets.get(consumer))
+            delta[context_key(consumer)] = text
+            report[consumer] = {
+                "level": level,
+                "raw_tokens": estimate_text_tokens(digests[key]["raw"]),
+                "tokens": estimate_text_tokens(text),
+                "budget": self.budgets.get(consumer),
+            }
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=delta),
+            custom_metadata={"compaction": report},
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import contextlib
+import json
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.genai import types
+from scientific_research_system.agents.checkpoints import output_authors
+from scientific_research_system.config import Config
+
+
+class DagAgent(BaseAgent):
+    """
+    Runs its sub-agents as a dependency graph instead of a fixed chain.
+
+    Every node declares the session state keys it reads and writes. A node
+    starts as soon as every node producing one of its inputs has finished
+    (at most `max_concurrency` at a time), so the run takes as long as the
+    critical path rather than the sum of all stages.
+
+    Nodes run on their own branches, like the sub-agents of a ParallelAgent,
+    so they do not see each other's in-flight tool calls. When a node finishes,
+    its outputs are re-published on the parent branch, so every node started
+    afterwards sees them in its conversation history.
+    """
+
+    reads: dict[str, list[str]] = {}
+    writes: dict[str, list[str]] = {}
+    max_concurrency: int = 4
+
+    @classmethod
+    def build(cls, name: str, nodes: list[tuple], max_concurrency: int = None) -> "DagAgent":
+        """
+        Builds the graph from (agent, reads, writes) tuples and rejects cycles.
+        """
+        dag = cls(
+            name=name,
+            sub_agents=[agent for agent, _, _ in nodes],
+            reads={agent.name: list(reads) for agent, reads, _ in nodes},
+            writes={agent.name: list(writes) for agent, _, writes in nodes},
+            max_concurrency=max_concurrency or Config.DAG_MAX_CONCURRENCY,
+        )
+        dag.topological_order()
+        return dag
+
+    def dependencies(self) -> dict[str, set[str]]:
+        """
+        Node name -> names of the nodes producing its inputs. Inputs that no
+        node produces (e.g. initial session state) do not create edges.
+        """
+        producers = {}
+        for node, keys in self.writes.items():
+            for key in keys:
+                producers[key] = node
+        return {
+            agent.name: {producers[key] for key in self.reads.get(agent.name, [])
+                         if key in producers and producers[key] != agent.name}
+            for agent in self.sub_agents
+        }
+
+    def topological_order(self) -> list[str]:
+        """
+        Node names in a valid execution order; raises ValueError on a cycle.
+        """
+        deps = self.dependencies()
+        order = []
+        done = set()
+        while len(order) < len(deps):
+            ready = [name for name in deps if name not in done and deps[name] <= done]
+            if not ready:
+                stuck = sorted(set(deps) - done)
+                raise ValueError(f"Dependency cycle between: {', '.join(stuck)}")
+            order.extend(ready)
+            done.update(ready)
+        return order
+
+    def _publish(self, ctx, node: BaseAgent) -> list[Event]:
+        """
+        Copies of a finished node's model outputs on the parent branch (the state
+        itself was already updated by the node's own events). Keys no model wrote,
+        such as compacted contexts, stay out of the conversation history.
+        """
+        authors = output_authors(node)
+        events = []
+        for key in self.writes.get(node.name, []):
+            if key not in ctx.session.state or key not in authors:
+                continue
+            value = ctx.session.state[key]
+            events.append(Event(
+                invocation_id=ctx.invocation_id,
+                author=authors[key],
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(text=value if isinstance(value, str) else json.dumps(value, default=str))],
+                ),
+                custom_metadata={"dag": "published"},
+            ))
+        return events
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        deps = self.dependencies()
+        nodes = {agent.name: agent for agent in self.sub_agents}
+        order = self.topological_order()
+        done = set()
+        started = set()
+        tasks = []
+        queue = asyncio.Queue()
+
+        async def run_node(node: BaseAgent):
+            node_ctx = ctx.model_copy()
+            node_ctx.branch = f"{ctx.branch}.{self.name}.{node.name}" if ctx.branch else f"{self.name}.{node.name}"
+            error = None
+            try:
+                async with contextlib.aclosing(node.run_async(node_ctx)) as events:
+                    async for event in events:
+                        resume = asyncio.Event()
+                        await queue.put((node.name, event, resume))
+                        # Wait until the runner has applied the event before continuing
+                        await resume.wait()
+            except Exception as e:
+                error = e
+            finally:
+                await queue.put((node.name, None, error))
+
+        def launch():
+            for name in order:
+                if len(started) - len(done) >= self.max_concurrency:
+                    return
+                if name not in started and deps[name] <= done:
+                    started.add(name)
+                    tasks.append(asyncio.create_task(run_node(nodes[name])))
+
+        try:
+            launch()
+            while len(done) < len(nodes):
+                name, event, payload = await queue.get()
+                if event is not None:
+                    yield event
+                    payload.set()
+                    continue
+                if payload is not None:
+                    raise payload
+                done.add(name)
+                for published in self._publish(ctx, nodes[name]):
+                    yield published
+                launch()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -1,19 +1,29 @@
 from google.adk.agents import LlmAgent
-from scientific_research_system.tools.forensics_tools import benford_tool, p_value_tool
+from scientific_research_system.tools.forensics_tools import benford_tool, benford_batch_tool, p_value_tool, p_value_batch_tool
+from scientific_research_system.tools.corpus_tools import search_corpus_tool, paper_statistics_tool, read_section_tool
 from scientific_research_system.config import Config
 
 fraud_detector_agent = LlmAgent(
     name="fraud_detector",
     model=Config.MODEL_NAME,
-    tools=[benford_tool, p_value_tool],
+    tools=[benford_tool, benford_batch_tool, p_value_tool, p_value_batch_tool,
+           search_corpus_tool, paper_statistics_tool, read_section_tool],
     instruction="""
     You are a Forensic Data Scientist.
     
     1. Extract statistical tables and numerical data from the paper text.
     2. Use `check_benfords_law` on extracted raw numbers (e.g., sample sizes, counts) to detect fabrication.
-    3. Use `check_p_value_consistency` if test statistics (t, Z, F) and p-values are reported together.
-    4. Flag suspicious patterns (e.g., "p-hacking" signs like p=0.049 repeatedly).
-    5. Analyze author history (mock data) for retraction patterns.
+       When there are several tables, score them all at once with `check_benfords_law_batch` (table name -> numbers).
+       Use test="first_two" for large tables (hundreds of values or more); it is the most sensitive test.
+       Results marked `small_sample` (listed under `small_sample_tables`) are not evidence of fabrication.
+    3. If test statistics (z, t, F, chi², r) and p-values are reported together, collect ALL of them and
+       submit them in a single `check_p_value_batch` call (test, stat as reported, p, comparison, df1/df2).
+       Use `check_p_value_consistency` only for a one-off check.
+    4. If a paper's full text is in the local corpus (find it with `search_local_corpus`), call
+       `check_paper_statistics` with its paper ID: it checks every reported result and all numbers of the
+       full text in one call. Use `read_paper_section` to quote the context of a flagged result.
+    5. Flag suspicious patterns (e.g., "p-hacking" signs like p=0.049 repeatedly).
+    6. Analyze author history (mock data) for retraction patterns.
     
     Return a JSON object with:
     - `FraudRiskScore`: (int) 0-100
@@ -0,0 +1,55 @@
+import asyncio
+import hashlib
+import json
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from scientific_research_system.config import Config
+from scientific_research_system.tools.graph_store import (
+    KnowledgeGraph, format_gaps, get_knowledge_graph, parse_graph
+)
+
+
+class GraphAnalyzer(BaseAgent):
+    """
+    Deterministic stage (no model call) between the knowledge graph agent and gap analysis.
+
+    It parses the knowledge graph agent's JSON into entities and relation
+    triples. These are merged into the persistent graph store (or into a
+    throwaway graph when KNOWLEDGE_GRAPH_PERSIST is off). The stage then
+    computes gap candidates around this run's entities with graph algorithms:
+    disconnected clusters, single-link bridges and structural holes. Only
+    that short report goes to the gap analysis prompt, not the graph itself.
+    """
+
+    source_key: str = "knowledge_graph"
+    output_key: str = "graph_gaps"
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        parsed = parse_graph(ctx.session.state.get(self.source_key, ""))
+        digest = hashlib.sha256(
+            json.dumps([parsed["entities"], parsed["relations"]], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        graph = get_knowledge_graph() if Config.KNOWLEDGE_GRAPH_PERSIST else KnowledgeGraph()
+        merged = graph.merge(parsed["entities"], parsed["relations"], key=digest)
+        report = await asyncio.to_thread(graph.gap_candidates, merged["entities"])
+        if Config.KNOWLEDGE_GRAPH_PERSIST and merged["new_entities"] + merged["new_edges"]:
+            await asyncio.to_thread(graph.save, Config.KNOWLEDGE_GRAPH_PATH)
+
+        text = format_gaps(report) if merged["entities"] else "The knowledge graph could not be parsed; no structural gap candidates."
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: text}),
+            custom_metadata={"graph": {
+                "entities": len(parsed["entities"]),
+                "relations": len(parsed["relations"]),
+                "unparsed_relations": parsed["unparsed"],
+                "new_entities": merged["new_entities"],
+                "new_edges": merged["new_edges"],
+                "graph_entities": report["entities"],
+                "graph_edges": report["edges"],
+            }},
+        )
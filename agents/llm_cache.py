@@ -0,0 +1,119 @@
+import hashlib
+import json
+import sys
+import threading
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from scientific_research_system.config import Config
+from scientific_research_system.tools.cache import ToolCache
+from scientific_research_system.tools.telemetry import record_cache
+
+LLM_CACHE_MODES = ("off", "cache", "record", "replay")
+
+# Recorded runs must never expire or be evicted, otherwise replay breaks
+RECORDING_TTL = 100 * 365 * 24 * 3600
+
+
+class LlmReplayMissError(RuntimeError):
+    """Raised in replay mode when a model request was never recorded."""
+
+
+def _strip_call_ids(value):
+    """
+    Removes the random IDs ADK assigns to function calls/responses so that
+    identical tool-using turns hash identically across runs.
+    """
+    if isinstance(value, dict):
+        for key in ("function_call", "function_response"):
+            if isinstance(value.get(key), dict):
+                value[key].pop("id", None)
+        for item in value.values():
+            _strip_call_ids(item)
+    elif isinstance(value, list):
+        for item in value:
+            _strip_call_ids(item)
+
+
+def llm_request_key(llm_request) -> str:
+    """
+    Content address of a model request: model name, system instruction (with the
+    interpolated session state), conversation contents (including tool results),
+    tool declarations and generation settings.
+    """
+    payload = llm_request.model_dump(
+        mode="json", exclude_none=True, include={"model", "contents", "config"}
+    )
+    config = payload.get("config", {})
+    # Transport details and billing labels do not change the answer
+    config.pop("http_options", None)
+    config.pop("labels", None)
+    _strip_call_ids(payload.get("contents"))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LlmCachePlugin(BasePlugin):
+    """
+    Runner plugin that caches model responses by content address.
+
+    Modes:
+    - "cache":  serve identical requests from disk, call the model on a miss and store the answer.
+    - "record": always call the model and store every answer (never evicted).
+    - "replay": serve answers from the recording only; a miss raises LlmReplayMissError,
+                so a recorded run can be played back fully offline.
+
+    Recordings are kept in LLM_RECORDING_PATH, apart from the cache (LLM_CACHE_PATH),
+    so the cache's size bound never evicts them.
+    """
+
+    def __init__(self, mode: str = None, path: str = None):
+        super().__init__(name="llm_cache")
+        self.mode = (mode or Config.LLM_CACHE_MODE).lower()
+        if self.mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{self.mode}'. Use one of {LLM_CACHE_MODES}.")
+        if self.mode == "cache":
+            path, max_entries = path or Config.LLM_CACHE_PATH, Config.LLM_CACHE_MAX_ENTRIES
+        else:
+            path, max_entries = path or Config.LLM_RECORDING_PATH, sys.maxsize
+        # Expired responses are never served, so they need not be kept
+        self.store = ToolCache(path=path, max_entries=max_entries, stale_ttl=0)
+        self.ttl = Config.LLM_CACHE_TTL if self.mode == "cache" else RECORDING_TTL
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        key = llm_request_key(llm_request)
+        if self.mode in ("cache", "replay"):
+            cached = self.store.get("llm", key)
+            record_cache("llm", callback_context.agent_name, hit=cached is not None)
+            if cached is not None:
+                self.hits += 1
+                response = LlmResponse.model_validate_json(cached)
+                response.custom_metadata = {**(response.custom_metadata or {}), "llm_cache": "hit"}
+                return response
+            self.misses += 1
+            if self.mode == "replay":
+                raise LlmReplayMissError(
+                    f"No recorded response for agent '{callback_context.agent_name}' "
+                    f"(request {key[:12]}). Re-record the run with LLM_CACHE_MODE=record."
+                )
+        with self._lock:
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = key
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        with self._lock:
+            key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        # Only complete, successful answers are worth replaying
+        if key is None or llm_response.partial or llm_response.error_code or not llm_response.content:
+            return None
+        self.store.set("llm", key, llm_response.model_dump_json(exclude_none=True), self.ttl)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        with self._lock:
+            self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
@@ -1,11 +1,47 @@
+import argparse
 import asyncio
 import os
-from google.adk.runners import InMemoryRunner
-from scientific_research_system.agents.research_app import create_research_system
+import uuid
+from scientific_research_system.agents.checkpoints import checkpoint_run_id, get_checkpoint_store
+from scientific_research_system.agents.progress import TokenUsage
+from scientific_research_system.agents.research_app import EXECUTION_MODES, create_research_system
+from scientific_research_system.agents.runtime import APP_NAME, create_runner
 from scientific_research_system.config import Config
+from scientific_research_system.tools.telemetry import format_tiers, get_telemetry, run_summary
 
-async def main():
-    if not Config.GOOGLE_API_KEY:
+def write_report(filename: str, topic: str, state) -> None:
+    """
+    Writes the Markdown report (draft, hypotheses, gaps, evaluation) for a finished run.
+    """
+    hypotheses = state.get("hypotheses", "")
+    gaps = state.get("gaps", "")
+    eval_report = state.get("final_report", "")
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f"# Research Topic: {topic}\n\n")
+        f.write(state["draft"])
+        f.write("\n\n## Hypotheses\n")
+        f.write(hypotheses)
+        f.write("\n\n## Identified Gaps\n")
+        f.write(gaps)
+        if eval_report:
+            f.write("\n\n## Evaluation\n")
+            f.write(eval_report)
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Autonomous Scientific Literature Research System")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Resume the previous run of the same topic, skipping stages whose checkpointed inputs are unchanged."
+    )
+    parser.add_argument(
+        "--mode", choices=EXECUTION_MODES, default="sequential",
+        help="Execution mode (default: sequential, to be safe on rate limits)."
+    )
+    args = parser.parse_args(argv)
+
+    # Replaying a recorded run never reaches the model
+    if not Config.GOOGLE_API_KEY and Config.LLM_CACHE_MODE != "replay":
         print("Error: GOOGLE_API_KEY not set.")
         return
 
@@ -17,11 +53,18 @@ async def main():
 
     # Create the ADK workflow
     # Default to sequential for CLI to be safe on rate limits
-    workflow = create_research_system(execution_mode="sequential")
+    workflow = create_research_system(execution_mode=args.mode, resume=args.resume)
+
+    if args.resume and Config.CHECKPOINT_ENABLED:
+        completed = get_checkpoint_store().completed_stages(checkpoint_run_id(topic))
+        print(f"Resuming run {checkpoint_run_id(topic)}; checkpointed stages: {', '.join(completed) or 'none'}")
     
-    # Create Runner with explicit app_name
-    runner = InMemoryRunner(agent=workflow, app_name="agents")
+    # Create Runner with explicit app_name (and the configured plugins, e.g. LLM cache)
+    runner = create_runner(workflow)
     
+    # Sessions are persisted, so every run gets its own session
+    session_id = f"research_session_{uuid.uuid4().hex[:8]}"
+
     print("\nStarting Research Workflow...")
     
     # Run workflow - run_debug is synchronous
@@ -29,17 +72,31 @@ async def main():
     events = await runner.run_debug(
         user_messages=topic,
         user_id="researcher",
-        session_id="research_session_1",
+        session_id=session_id,
         verbose=True
     )
     
     print("\n\n=== Workflow Completed ===")
+
+    token_usage = TokenUsage()
+    for event in events:
+        token_usage.update(event)
+    print("\n=== Token Usage ===")
+    print(token_usage.format_table())
+    if Config.TELEMETRY_ENABLED and events:
+        print("\n=== Model Tiers (latency and cost) ===")
+        print(format_tiers(run_summary(events[-1].invocation_id)))
+        search_stats = get_telemetry().search_stats()
+        if search_stats:
+            print("\n=== Search Resilience (retries, hedges, fallbacks) ===")
+            for source, counts in search_stats.items():
+                print(f"{source}: " + ", ".join(f"{event} {count}" for event, count in sorted(counts.items())))
     
     # Inspect results - get_session is async
     session = await runner.session_service.get_session(
-        app_name="agents", 
+        app_name=APP_NAME, 
         user_id="researcher", 
-        session_id="research_session_1"
+        session_id=session_id
     )
     
     if session:
@@ -48,22 +105,9 @@ async def main():
             print("\n=== FINAL DRAFT ===\n")
             print(state["draft"])
             
-            hypotheses = state.get("hypotheses", "")
-            gaps = state.get("gaps", "")
-            eval_report = state.get("final_report", "")
-
             # Save to file
             filename = f"research_output_adk_{topic.replace(' ', '_')}.md"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"# Research Topic: {topic}\n\n")
-                f.write(state["draft"])
-                f.write("\n\n## Hypotheses\n")
-                f.write(hypotheses)
-                f.write("\n\n## Identified Gaps\n")
-                f.write(gaps)
-                if eval_report:
-                    f.write("\n\n## Evaluation\n")
-                    f.write(eval_report)
+            write_report(filename, topic, state)
                     
             print(f"\nResults saved to {filename}")
         else:
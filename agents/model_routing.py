@@ -0,0 +1,187 @@
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+from typing import Any, NamedTuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.registry import LLMRegistry
+from google.genai import errors
+from scientific_research_system.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tier of agents no route matches
+DEFAULT_TIER = "default"
+# Routes used unless the routing file or MODEL_ROUTES says otherwise: cheap, high-volume
+# agents on the fast tier, the agents that produce the final draft on the strong tier
+DEFAULT_ROUTES = {
+    "query_formulation": "fast",
+    "arxiv_mining": "fast",
+    "web_mining": "fast",
+    "*_narrator": "fast",
+    "writing": "strong",
+    "evaluation": "strong",
+}
+
+
+class ModelRoute(NamedTuple):
+    tier: str
+    models: list[str]  # fallback order
+
+
+def parse_tiers(spec: str) -> dict[str, list[str]]:
+    """
+    Parses "tier=model|fallback|...,tier=..." into {tier: [models]}.
+    """
+    tiers = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        tier, models = item.split("=", 1)
+        models = [model.strip() for model in models.split("|") if model.strip()]
+        if tier.strip() and models:
+            tiers[tier.strip()] = models
+    return tiers
+
+
+def parse_routes(spec: str) -> dict[str, str]:
+    """
+    Parses "agent_or_stage_or_pattern=tier_or_model,..." into a dict.
+    """
+    routes = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, target = item.split("=", 1)
+        if name.strip() and target.strip():
+            routes[name.strip()] = target.strip()
+    return routes
+
+
+def _should_fall_back(error: Exception) -> bool:
+    """
+    Errors another model may not have: quota (429, after the rate limiter's
+    retries), unknown model (404), server errors and timeouts.
+    """
+    if isinstance(error, errors.APIError):
+        return error.code in (404, 429) or (error.code or 0) >= 500
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+
+def _is_model(name: str) -> bool:
+    try:
+        LLMRegistry.resolve(name)
+        return True
+    except ValueError:
+        return False
+
+
+class RoutedModel(BaseLlm):
+    """
+    Model of a routed agent: its tier's models in fallback order. A call that
+    fails with a quota, availability or server error is retried on the next
+    model of the chain. Responses carry the tier and the model that answered
+    in `custom_metadata["model_routing"]`, for the per-tier report.
+    """
+
+    tier: str = DEFAULT_TIER
+    chain: list[Any] = []
+
+    @classmethod
+    def build(cls, route: ModelRoute) -> "RoutedModel":
+        return cls(model=route.models[0], tier=route.tier,
+                   chain=[LLMRegistry.new_llm(model) for model in route.models])
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        for index, llm in enumerate(self.chain):
+            llm_request.model = llm.model
+            yielded = False
+            try:
+                async for response in llm.generate_content_async(llm_request, stream):
+                    yielded = True
+                    response.custom_metadata = {
+                        **(response.custom_metadata or {}),
+                        "model_routing": {"tier": self.tier, "model": llm.model, "fallbacks": index},
+                    }
+                    yield response
+                return
+            except Exception as e:
+                # A partially streamed answer cannot be handed to another model
+                if yielded or index == len(self.chain) - 1 or not _should_fall_back(e):
+                    raise
+                logger.warning("Model %s (tier %s) failed (%s); falling back to %s",
+                               llm.model, self.tier, e, self.chain[index + 1].model)
+
+
+class ModelRouter:
+    """
+    Assigns a model tier (a fallback chain of models) to every LlmAgent.
+
+    A route maps an agent name, a stage name or a name pattern (fnmatch, e.g.
+    "*_narrator") to a tier or directly to a model ("model|fallback"). The
+    agent's own name wins over its enclosing stages, and exact names over
+    patterns. Tiers that are not configured use MODEL_NAME, so routing only
+    changes models once MODEL_TIERS (or the routing file) defines them.
+    """
+
+    def __init__(self, tiers: dict[str, list[str]] = None, routes: dict[str, str] = None):
+        self.tiers = dict(tiers or {})
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+
+    @classmethod
+    def from_config(cls) -> "ModelRouter":
+        """
+        Routing from MODEL_ROUTING_PATH ({"tiers": {tier: [models]}, "routes": {name: target}}),
+        overridden entry by entry by MODEL_TIERS and MODEL_ROUTES.
+        """
+        tiers = {}
+        routes = dict(DEFAULT_ROUTES)
+        path = Config.MODEL_ROUTING_PATH
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            tiers.update({
+                tier: [models] if isinstance(models, str) else list(models)
+                for tier, models in config.get("tiers", {}).items()
+            })
+            routes.update(config.get("routes", {}))
+        tiers.update(parse_tiers(Config.MODEL_TIERS))
+        routes.update(parse_routes(Config.MODEL_ROUTES))
+        return cls(tiers, routes)
+
+    def _target(self, names: list[str]) -> str:
+        for name in names:
+            if name in self.routes:
+                return self.routes[name]
+        for name in names:
+            for pattern, target in self.routes.items():
+                if fnmatch.fnmatchcase(name, pattern):
+                    return target
+        return DEFAULT_TIER
+
+    def route(self, agent_name: str, stages: list[str] = ()) -> ModelRoute:
+        """
+        Tier and models of an agent; `stages` are its enclosing agents, innermost first.
+        """
+        target = self._target([agent_name, *stages])
+        if target in self.tiers:
+            return ModelRoute(target, self.tiers[target])
+        models = [model.strip() for model in target.split("|") if model.strip()]
+        if models and all(_is_model(model) for model in models):
+            # A model (chain) named directly in the route is its own tier
+            return ModelRoute(target, models)
+        # A tier nobody configured
+        return ModelRoute(target, [Config.MODEL_NAME])
+
+    def apply(self, agent: BaseAgent, stages: list[str] = ()) -> BaseAgent:
+        """
+        Sets the model of every LlmAgent in the tree to its routed chain. Returns the agent.
+        """
+        if isinstance(agent, LlmAgent) and isinstance(agent.model, str):
+            agent.model = RoutedModel.build(self.route(agent.name, stages))
+        for sub_agent in agent.sub_agents:
+            self.apply(sub_agent, [agent.name, *stages])
+        return agent
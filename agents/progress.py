@@ -0,0 +1,93 @@
+from scientific_research_system.agents.checkpoints import CheckpointedStage
+from scientific_research_system.agents.research_app import stage_io
+
+
+class WorkflowProgress:
+    """
+    Tracks a run's progress from the structure of the workflow: every top-level
+    stage (or DAG node) is complete once all the state keys it writes have
+    arrived in event state deltas. Keeps no events, only the keys seen so far.
+    """
+
+    def __init__(self, workflow):
+        self.stages = []
+        for stage in workflow.sub_agents:
+            inner = stage.sub_agents[0] if isinstance(stage, CheckpointedStage) else stage
+            self.stages.append((inner.name, set(stage_io(stage)[1])))
+        self.seen_keys = set()
+        self.completed = []
+        self.current_agent = None
+        self.events = 0
+
+    def update(self, event) -> list[str]:
+        """
+        Records one event and returns the names of the stages it completed.
+        """
+        self.events += 1
+        if event.author and event.author != "user":
+            self.current_agent = event.author
+        if not (event.actions and event.actions.state_delta):
+            return []
+        self.seen_keys.update(event.actions.state_delta)
+        newly_done = [
+            name for name, writes in self.stages
+            if name not in self.completed and writes and writes <= self.seen_keys
+        ]
+        self.completed.extend(newly_done)
+        return newly_done
+
+    def status(self, name: str) -> str:
+        return "done" if name in self.completed else "pending"
+
+    @property
+    def fraction(self) -> float:
+        return len(self.completed) / len(self.stages) if self.stages else 1.0
+
+
+class TokenUsage:
+    """
+    Per-agent token counts summed from the usage metadata of model responses,
+    plus the context compaction report (tokens before and after, per consumer).
+    """
+
+    def __init__(self):
+        self.agents = {}
+        self.compaction = {}
+
+    def update(self, event):
+        usage = event.usage_metadata
+        if usage and event.author:
+            totals = self.agents.setdefault(event.author, {"calls": 0, "prompt": 0, "output": 0})
+            totals["calls"] += 1
+            totals["prompt"] += usage.prompt_token_count or 0
+            totals["output"] += usage.candidates_token_count or 0
+        report = (event.custom_metadata or {}).get("compaction")
+        if report:
+            self.compaction.update(report)
+
+    def rows(self) -> list[dict]:
+        """
+        One row per agent, with the context tokens saved by compaction where it applies.
+        """
+        rows = []
+        for agent in sorted(set(self.agents) | set(self.compaction)):
+            totals = self.agents.get(agent, {"calls": 0, "prompt": 0, "output": 0})
+            row = {"agent": agent, **totals}
+            if agent in self.compaction:
+                report = self.compaction[agent]
+                row.update(context_level=report["level"], context_tokens=report["tokens"],
+                           context_saved=report["raw_tokens"] - report["tokens"])
+            rows.append(row)
+        return rows
+
+    def format_table(self) -> str:
+        lines = [f"{'agent':28s} {'calls':>5s} {'prompt':>9s} {'output':>8s}  context (saved)"]
+        for row in self.rows():
+            context = ""
+            if "context_level" in row:
+                context = f"{row['context_level']}: {row['context_tokens']} (-{row['context_saved']})"
+            lines.append(f"{row['agent']:28s} {row['calls']:5d} {row['prompt']:9d} {row['output']:8d}  {context}")
+        total_prompt = sum(r["prompt"] for r in self.rows())
+        total_output = sum(r["output"] for r in self.rows())
+        lines.append(f"{'total':28s} {'':5s} {total_prompt:9d} {total_output:8d}")
+        return "\n".join(lines)
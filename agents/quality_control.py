@@ -0,0 +1,159 @@
+import asyncio
+import json
+from typing import AsyncGenerator, Callable
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from scientific_research_system.config import Config
+from scientific_research_system.tools.quality_checks import (
+    assess_fraud_risk, assess_reproducibility, audit_citations, find_arxiv_ids
+)
+from scientific_research_system.agents.citation_auditor import citation_auditor_agent
+from scientific_research_system.agents.fraud_detector import fraud_detector_agent
+from scientific_research_system.agents.reproducibility_agent import reproducibility_agent
+
+# Values accepted for Config.QC_MODE
+QC_MODES = ("llm", "deterministic", "narrated")
+
+
+def run_papers(events) -> set:
+    """
+    arXiv IDs returned by any tool call of the session so far (the run's search results).
+    """
+    papers = set()
+    for event in events:
+        for response in event.get_function_responses():
+            for value in (response.response or {}).values():
+                if isinstance(value, str):
+                    papers.update(find_arxiv_ids(value))
+    return papers
+
+
+class DeterministicAuditor(BaseAgent):
+    """
+    Quality control auditor that runs its checks directly in Python instead of
+    through a model's tool loop.
+
+    `analysis(text, run_papers)` scores the mining output, so the scores are
+    reproducible and cost no model calls. With a narrator sub-agent, one model
+    call then writes the report's `narrative_field` from the computed findings
+    (`<output_key>_findings`); the scores themselves are never rewritten.
+    The result is the same JSON object the tool-calling auditor returns.
+    """
+
+    output_key: str
+    analysis: Callable[..., dict]
+    narrative_field: str
+    source_keys: list[str] = ["arxiv_results", "web_results"]
+    # Only call the narrator when the analysis left the narrative field empty
+    narrate_if_empty: bool = False
+
+    @classmethod
+    def build(cls, name: str, output_key: str, analysis: Callable[..., dict], narrative_field: str,
+              narration: str = None, narrate_if_empty: bool = False):
+        """
+        `narration` is the narrator's instruction; without it no model is called.
+        """
+        sub_agents = []
+        if narration:
+            sub_agents.append(LlmAgent(
+                name=f"{name}_narrator",
+                model=Config.MODEL_NAME,
+                instruction=narration,
+                include_contents="none",
+                output_key=f"{output_key}_narrative",
+            ))
+        return cls(name=name, output_key=output_key, analysis=analysis, narrative_field=narrative_field,
+                   narrate_if_empty=narrate_if_empty, sub_agents=sub_agents)
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        text = "\n\n".join(state[key] for key in self.source_keys if isinstance(state.get(key), str))
+        report = await asyncio.to_thread(self.analysis, text, run_papers(ctx.session.events))
+
+        narrated = False
+        if self.sub_agents and (not self.narrate_if_empty or not report[self.narrative_field]):
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={f"{self.output_key}_findings": json.dumps(report, indent=1)}),
+            )
+            narrator = self.sub_agents[0]
+            async for event in narrator.run_async(ctx):
+                yield event
+            narrative = ctx.session.state.get(narrator.output_key)
+            if isinstance(narrative, str) and narrative.strip():
+                report[self.narrative_field] = narrative.strip()
+                narrated = True
+
+        value = json.dumps(report, indent=1)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=value)]),
+            actions=EventActions(state_delta={self.output_key: value}),
+            custom_metadata={"quality_control": {"mode": "narrated" if narrated else "deterministic"}},
+        )
+
+
+def build_quality_control_agents(mode: str = None) -> list[BaseAgent]:
+    """
+    The three quality control auditors for `mode` (default Config.QC_MODE):
+    'llm' runs the tool-calling agents, 'deterministic' computes every score
+    without a model, and 'narrated' adds at most one model call per auditor
+    to write up the computed findings.
+    """
+    mode = (mode or Config.QC_MODE).lower()
+    if mode not in QC_MODES:
+        raise ValueError(f"Unknown quality control mode '{mode}'. Use one of {QC_MODES}.")
+    if mode == "llm":
+        return [citation_auditor_agent.clone(), fraud_detector_agent.clone(), reproducibility_agent.clone()]
+
+    narrated = mode == "narrated"
+    return [
+        DeterministicAuditor.build(
+            "citation_auditor", "citation_audit", audit_citations, "audit_report",
+            narration="""
+            You are a Citation Integrity Specialist.
+
+            A deterministic audit of the citations in this run's literature found:
+            {citation_audit_findings}
+
+            Write a brief analysis (3-5 sentences) of these findings. Do not change the score
+            and do not mention citations that are not listed. Return plain text only.
+            """ if narrated else None,
+        ),
+        DeterministicAuditor.build(
+            "fraud_detector", "fraud_analysis", assess_fraud_risk, "forensic_analysis",
+            narration="""
+            You are a Forensic Data Scientist.
+
+            Deterministic statistical checks (p-value consistency, Benford's law, p-hacking) of this
+            run's literature found:
+            {fraud_analysis_findings}
+
+            Write a short forensic report (3-6 sentences) explaining these findings and what they imply.
+            Do not change the FraudRiskScore or add red flags. Return plain text only.
+            """ if narrated else None,
+        ),
+        # The narrator is only needed to reconstruct code when the literature contains none
+        DeterministicAuditor.build(
+            "reproducibility_auditor", "reproducibility_report", assess_reproducibility, "pseudo_code",
+            narration="""
+            You are a DevOps Research Engineer.
+
+            No code was found in the literature. Extracted environment and hyperparameters:
+            {reproducibility_report_findings}
+
+            Literature:
+            {arxiv_results}
+
+            Reconstruct short Python pseudo-code for the core algorithm of the methodology described above.
+            Return only the code.
+            """ if narrated else None,
+            narrate_if_empty=True,
+        ),
+    ]
@@ -1,19 +1,26 @@
 from google.adk.agents import LlmAgent
-from scientific_research_system.tools.code_tools import extract_code_tool, validate_env_tool
+from scientific_research_system.tools.code_tools import extract_code_tool, extract_code_file_tool, validate_env_tool
+from scientific_research_system.tools.corpus_tools import search_corpus_tool, list_sections_tool, read_section_tool, extract_paper_code_tool
 from scientific_research_system.config import Config
 
 reproducibility_agent = LlmAgent(
     name="reproducibility_auditor",
     model=Config.MODEL_NAME,
-    tools=[extract_code_tool, validate_env_tool],
+    tools=[extract_code_tool, extract_code_file_tool, validate_env_tool,
+           search_corpus_tool, list_sections_tool, read_section_tool, extract_paper_code_tool],
     instruction="""
     You are a DevOps Research Engineer. 
     Your goal is to reconstruct a runnable environment from the provided research text/code.
     
     1. Analyze the text to extract hyperparameters (batch size, learning rate, etc.).
     2. Identify library dependencies and versions.
-    3. Use `validate_python_env` to check dependency compatibility.
-    4. Use `extract_code_blocks` if code snippets are present.
+    3. Use `validate_python_env` to check dependency compatibility. Pass PEP 508 specifiers with versions
+       when the text states them (e.g. "torch==1.9.0", "numpy<1.22") and the Python version if known.
+    4. Use `extract_code_blocks` if code snippets are present. For full papers or appendix dumps stored
+       on disk (in the configured code files directory), use `extract_code_blocks_from_file` (optionally filtered
+       by language) instead of pasting the text.
+       For papers in the local corpus (`search_local_corpus`), use `extract_paper_code`, and read the methods or
+       experiments section with `list_paper_sections` / `read_paper_section` to find hyperparameters.
     5. Reconstruct likely Python code for the core algorithm based on the methodology section if no code is explicitly provided.
     6. Assign a Reproducibility Confidence Score (0-100).
     
@@ -1,15 +1,74 @@
 from google.adk.agents import LlmAgent, SequentialAgent, ParallelAgent
 from google.adk.tools.function_tool import FunctionTool
-from scientific_research_system.tools.arxiv_tools import search_arxiv
-from scientific_research_system.tools.search_tools import web_search
+from google.adk.tools.tool_context import ToolContext
+from scientific_research_system.tools.arxiv_tools import arxiv_batch_search, search_arxiv
+from scientific_research_system.tools.dedup import get_deduplicator
+from scientific_research_system.tools.search_tools import web_batch_search, web_search
 from scientific_research_system.config import Config
+from scientific_research_system.agents.checkpoints import CheckpointedStage
+from scientific_research_system.agents.compaction import ContextCompactor, context_key
+from scientific_research_system.agents.dag import DagAgent
+from scientific_research_system.agents.graph_analysis import GraphAnalyzer
+from scientific_research_system.agents.model_routing import ModelRouter
+from scientific_research_system.agents.utils import rate_limited_agent
+
+from scientific_research_system.agents.quality_control import build_quality_control_agents
 
 # Import new agents
-from scientific_research_system.agents.citation_auditor import citation_auditor_agent
-from scientific_research_system.agents.reproducibility_agent import reproducibility_agent
 from scientific_research_system.agents.domain_bridge import domain_bridge_agent
 from scientific_research_system.agents.negative_results import negative_results_agent
-from scientific_research_system.agents.fraud_detector import fraud_detector_agent
+
+# Values accepted for `execution_mode`
+EXECUTION_MODES = ("sequential", "parallel", "dag")
+
+# Agents fed a compacted digest of the mining output instead of the raw results,
+# and the state keys compacted for each of them (see CONTEXT_BUDGETS)
+CONTEXT_CONSUMERS = {
+    "knowledge_graph": ["arxiv_results", "web_results"],
+    "gap_analysis": ["arxiv_results"],
+    "writing": ["arxiv_results"],
+}
+
+# Session state each agent reads and writes. It drives the "dag" execution mode
+# and the stage checkpoints (whose inputs also include the topic and the prompts/models).
+AGENT_IO = {
+    "query_formulation": ([], ["queries"]),
+    "arxiv_mining": (["queries"], ["arxiv_results"]),
+    "web_mining": (["queries"], ["web_results"]),
+    "context_compaction": (
+        ["arxiv_results", "web_results"],
+        [context_key(consumer) for consumer in CONTEXT_CONSUMERS],
+    ),
+    "citation_auditor": (["arxiv_results", "web_results"], ["citation_audit"]),
+    "fraud_detector": (["arxiv_results", "web_results"], ["fraud_analysis"]),
+    "reproducibility_auditor": (["arxiv_results", "web_results"], ["reproducibility_report"]),
+    "knowledge_graph": (["knowledge_graph_context"], ["knowledge_graph"]),
+    "graph_analysis": (["knowledge_graph"], ["graph_gaps"]),
+    "gap_analysis": (["graph_gaps", "gap_analysis_context"], ["gaps"]),
+    "domain_bridge": (["queries", "arxiv_results", "web_results"], ["innovation_bridge"]),
+    "negative_results_analyst": (["arxiv_results", "web_results"], ["negative_results"]),
+    "hypothesis_generation": (["gaps", "innovation_bridge", "negative_results"], ["hypotheses"]),
+    "writing": (
+        ["writing_context", "gaps", "hypotheses", "citation_audit", "fraud_analysis",
+         "reproducibility_report", "innovation_bridge", "negative_results"],
+        ["draft"],
+    ),
+    "evaluation": (["draft", "hypotheses"], ["final_report"]),
+}
+
+def stage_io(agent):
+    """
+    (reads, writes) of an agent or of a whole stage: the union over its agents,
+    minus the keys the stage produces itself.
+    """
+    if agent.name in AGENT_IO:
+        return AGENT_IO[agent.name]
+    reads, writes = [], []
+    for sub_agent in agent.sub_agents:
+        sub_reads, sub_writes = stage_io(sub_agent)
+        reads += [key for key in sub_reads if key not in reads and key not in writes]
+        writes += [key for key in sub_writes if key not in writes]
+    return reads, writes
 
 # Wrap tools manually
 def arxiv_search_func(query: str):
@@ -18,18 +77,30 @@ def arxiv_search_func(query: str):
 def web_search_func(query: str):
     return web_search.run(query)
 
-def create_research_system(execution_mode: str = "sequential"):
+# Batched variants: one tool call fans all queries out concurrently. Results
+# repeated across queries, and web pages mirroring the run's arXiv papers, are dropped.
+def arxiv_batch_search_func(queries: list[str], tool_context: ToolContext):
+    return arxiv_batch_search(queries, get_deduplicator(tool_context.invocation_id))
+
+def web_batch_search_func(queries: list[str], tool_context: ToolContext):
+    return web_batch_search(queries, get_deduplicator(tool_context.invocation_id))
+
+def create_research_system(execution_mode: str = "sequential", resume: bool = False):
     """
     Creates the autonomous research system using Google ADK.
     
     Args:
-        execution_mode (str): "parallel" for faster execution, "sequential" for rate-limited environments.
+        execution_mode (str): "parallel" for faster execution, "sequential" for rate-limited environments,
+            "dag" to start every agent as soon as the state keys it reads are available.
+        resume (bool): Skip stages whose inputs match their checkpoint from a previous run of the same topic.
     
     Structure:
     1. Query Formulation
     2. Literature Mining (Parallel/Sequential)
-    3. Quality Control (Parallel/Sequential)
+       Context Compaction (digests of the mining output sized to each agent's token budget)
+    3. Quality Control (Parallel/Sequential; tool-calling agents or deterministic checks, see QC_MODE)
     4. Knowledge Graph Construction
+       Graph Analysis (merge into the persistent graph, structural gap candidates)
     5. Gap Analysis
     6. Innovation Stage (Parallel/Sequential)
     7. Hypothesis Generation
@@ -37,9 +108,6 @@ def create_research_system(execution_mode: str = "sequential"):
     9. Evaluation
     """
     
-    # Determine Agent Class based on mode
-    StageAgent = ParallelAgent if execution_mode == "parallel" else SequentialAgent
-    
     # 1. Query Formulation Agent
     query_agent = LlmAgent(
         name="query_formulation",
@@ -59,12 +127,12 @@ def create_research_system(execution_mode: str = "sequential"):
     arxiv_agent = LlmAgent(
         name="arxiv_mining",
         model=Config.MODEL_NAME,
-        tools=[FunctionTool(arxiv_search_func)],
+        tools=[FunctionTool(arxiv_batch_search_func)],
         instruction="""
         You are a specialist in academic paper mining.
         The research queries are: {queries}
         
-        For each query, use the `arxiv_search_func` tool to find relevant papers.
+        Call the `arxiv_batch_search_func` tool ONCE with all of the queries as a list to find relevant papers.
         Summarize the key findings, methods, and abstracts from the papers you find.
         Return a consolidated summary of arXiv papers.
         """,
@@ -75,28 +143,27 @@ def create_research_system(execution_mode: str = "sequential"):
     web_agent = LlmAgent(
         name="web_mining",
         model=Config.MODEL_NAME,
-        tools=[FunctionTool(web_search_func)],
+        tools=[FunctionTool(web_batch_search_func)],
         instruction="""
         You are a specialist in web research.
         The research queries are: {queries}
         
-        For each query, use the `web_search_func` tool to find relevant articles, blog posts, or simplified explanations.
+        Call the `web_batch_search_func` tool ONCE with all of the queries as a list to find relevant articles, blog posts, or simplified explanations.
         Summarize the key information found on the web.
         Return a consolidated summary of web resources.
         """,
         output_key="web_results"
     )
 
-    mining_stage = StageAgent(
-        name="literature_mining",
-        sub_agents=[arxiv_agent, web_agent]
-    )
+    mining_agents = [arxiv_agent, web_agent]
 
-    # 3. Quality Control Stage (Parallel/Sequential)
-    quality_control_stage = StageAgent(
-        name="quality_control_stage",
-        sub_agents=[citation_auditor_agent, fraud_detector_agent, reproducibility_agent]
-    )
+    # Context compaction: one digest of the mining output per downstream agent,
+    # sized to that agent's token budget
+    compaction_agent = ContextCompactor.build("context_compaction", CONTEXT_CONSUMERS)
+
+    # 3. Quality Control Agents (Parallel/Sequential stage): tool-calling agents, or the
+    # deterministic fast path that scores in Python (QC_MODE)
+    quality_control_agents = build_quality_control_agents(Config.QC_MODE)
 
     # 4. Knowledge Graph Agent
     kg_agent = LlmAgent(
@@ -106,15 +173,22 @@ def create_research_system(execution_mode: str = "sequential"):
         You are a Knowledge Graph specialist.
         
         Analyze the gathered information:
-        ArXiv Findings: {arxiv_results}
-        Web Findings: {web_results}
+        {knowledge_graph_context}
         
-        Extract key concepts, authors, and findings.
-        Return a JSON object with 'entities' (list of strings) and 'relationships' (list of strings describing connections).
+        Extract key concepts, methods, datasets, authors, and findings.
+        Return a JSON object with 'entities' (list of short entity names) and 'relationships'
+        (list of objects {"source": entity, "relation": short verb phrase, "target": entity}).
+        Use exactly the same name for an entity everywhere.
         """,
+        # Everything it needs is in the instruction; the history would repeat the raw mining output
+        include_contents="none",
         output_key="knowledge_graph"
     )
 
+    # Graph analysis: merges the run's graph into the persistent store and finds
+    # structural gap candidates, so gap analysis does not read the whole graph
+    graph_agent = GraphAnalyzer(name="graph_analysis")
+
     # 5. Gap Analysis Agent
     gap_agent = LlmAgent(
         name="gap_analysis",
@@ -122,21 +196,20 @@ def create_research_system(execution_mode: str = "sequential"):
         instruction="""
         You are a Senior Researcher.
         
-        Analyze the existing literature and the knowledge graph concepts.
-        Knowledge Graph: {knowledge_graph}
-        Literature Context: {arxiv_results}
+        Analyze the existing literature and the structure of the knowledge graph.
+        Graph analysis (computed over every run so far): {graph_gaps}
+        Literature Context: {gap_analysis_context}
         
-        Identify 3 major research gaps, contradictions, or underexplored areas.
+        The disconnected clusters, single-link bridges and structural holes above are candidate gaps.
+        Check them against the literature and identify 3 major research gaps, contradictions, or underexplored areas.
         Return a list of gaps.
         """,
+        include_contents="none",
         output_key="gaps"
     )
 
-    # 6. Innovation Stage (Parallel/Sequential)
-    innovation_stage = StageAgent(
-        name="innovation_stage",
-        sub_agents=[domain_bridge_agent, negative_results_agent]
-    )
+    # 6. Innovation Agents (Parallel/Sequential stage)
+    innovation_agents = [domain_bridge_agent.clone(), negative_results_agent.clone()]
 
     # 7. Hypothesis Generation Agent
     hypothesis_agent = LlmAgent(
@@ -163,15 +236,21 @@ def create_research_system(execution_mode: str = "sequential"):
         
         Write a comprehensive literature review section.
         Incorporating:
-        1. Findings from literature: {arxiv_results}
+        1. Findings from literature: {writing_context}
         2. Identified Gaps: {gaps}
         3. Proposed Hypotheses: {hypotheses}
-        4. Quality Control Audits (if available)
-        5. Innovation Insights (if available)
+        4. Quality Control Audits (if available):
+        {citation_audit?}
+        {fraud_analysis?}
+        {reproducibility_report?}
+        5. Innovation Insights (if available):
+        {innovation_bridge?}
+        {negative_results?}
         
         Cite sources where possible (referring to the provided findings).
         Format in Markdown.
         """,
+        include_contents="none",
         output_key="draft"
     )
 
@@ -201,20 +280,66 @@ def create_research_system(execution_mode: str = "sequential"):
         output_key="final_report"
     )
 
-    # Main Workflow
-    workflow = SequentialAgent(
-        name="research_workflow",
-        sub_agents=[
+    if execution_mode == "dag":
+        # Every agent is a node; each starts once the agents producing its inputs are done
+        nodes = [
             query_agent,
-            mining_stage,
-            quality_control_stage,
+            *mining_agents,
+            compaction_agent,
+            *quality_control_agents,
             kg_agent,
+            graph_agent,
             gap_agent,
-            innovation_stage,
+            *innovation_agents,
             hypothesis_agent,
             writer_agent,
             eval_agent
         ]
-    )
+        if Config.CHECKPOINT_ENABLED:
+            # Compaction and graph analysis are cheap and deterministic, so they simply rerun
+            nodes = [
+                node if node is compaction_agent or node is graph_agent
+                else CheckpointedStage.wrap(node, *stage_io(node), resume=resume)
+                for node in nodes
+            ]
+
+        # Main Workflow
+        workflow = DagAgent.build("research_workflow", [(node, *stage_io(node)) for node in nodes])
+    else:
+        # Determine Agent Class based on mode
+        StageAgent = ParallelAgent if execution_mode == "parallel" else SequentialAgent
+
+        stages = [
+            query_agent,
+            StageAgent(name="literature_mining", sub_agents=mining_agents),
+            compaction_agent,
+            StageAgent(name="quality_control_stage", sub_agents=quality_control_agents),
+            kg_agent,
+            graph_agent,
+            gap_agent,
+            StageAgent(name="innovation_stage", sub_agents=innovation_agents),
+            hypothesis_agent,
+            writer_agent,
+            eval_agent
+        ]
+        if Config.CHECKPOINT_ENABLED:
+            stages = [
+                stage if stage is compaction_agent or stage is graph_agent
+                else CheckpointedStage.wrap(stage, *stage_io(stage), resume=resume)
+                for stage in stages
+            ]
+
+        # Main Workflow
+        workflow = SequentialAgent(
+            name="research_workflow",
+            sub_agents=stages
+        )
+
+    # Each agent gets the model chain of its tier (MODEL_TIERS / MODEL_ROUTES)
+    ModelRouter.from_config().apply(workflow)
+
+    # Every model call shares one RPM/TPM budget, so parallel stages cannot overrun the quota
+    if Config.RATE_LIMIT_ENABLED:
+        rate_limited_agent(workflow)
     
     return workflow
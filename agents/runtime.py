@@ -0,0 +1,55 @@
+import threading
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from scientific_research_system.agents.llm_cache import LlmCachePlugin
+from scientific_research_system.agents.session_service import DurableSessionService
+from scientific_research_system.agents.tracing import TelemetryPlugin
+from scientific_research_system.config import Config
+
+APP_NAME = "agents"
+
+_session_service = None
+_session_lock = threading.Lock()
+
+def default_plugins():
+    """
+    Runner plugins enabled by configuration.
+    """
+    plugins = []
+    # First, so model calls answered by a later plugin (cache hits) are traced too
+    if Config.TELEMETRY_ENABLED:
+        plugins.append(TelemetryPlugin())
+    if Config.LLM_CACHE_MODE != "off":
+        plugins.append(LlmCachePlugin())
+    return plugins
+
+def get_session_service():
+    """
+    Returns the session service shared by every runner in this process,
+    so sessions outlive a single run (and, with SQLite, the process).
+    """
+    global _session_service
+    if _session_service is None:
+        with _session_lock:
+            if _session_service is None:
+                if Config.SESSION_BACKEND == "memory":
+                    _session_service = InMemorySessionService()
+                else:
+                    _session_service = DurableSessionService()
+    return _session_service
+
+def create_runner(workflow, plugins=None):
+    """
+    Creates the runner shared by the CLI and the Streamlit app.
+    """
+    return Runner(
+        agent=workflow,
+        app_name=APP_NAME,
+        session_service=get_session_service(),
+        artifact_service=InMemoryArtifactService(),
+        memory_service=InMemoryMemoryService(),
+        plugins=default_plugins() if plugins is None else plugins
+    )
@@ -0,0 +1,342 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+from scientific_research_system.config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS session_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+);
+CREATE TABLE IF NOT EXISTS user_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, key)
+);
+CREATE TABLE IF NOT EXISTS app_state (
+    app_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, key)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events(app_name, user_id, session_id, seq);
+"""
+
+
+def _split_state(delta: dict) -> tuple[dict, dict, dict]:
+    """
+    Splits a state delta into app-, user- and session-scoped keys
+    (prefixes removed for app/user, temp keys dropped).
+    """
+    app, user, session = {}, {}, {}
+    for key, value in delta.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _light_copy(session: Session) -> Session:
+    """
+    Copy that shares the (immutable once appended) events but owns its containers.
+    """
+    copied = session.model_copy(deep=False)
+    copied.events = list(session.events)
+    copied.state = dict(session.state)
+    return copied
+
+
+class DurableSessionService(BaseSessionService):
+    """
+    ADK session service persisted in SQLite (WAL, safe across processes and restarts).
+
+    - Each state key is a row, so an event only writes the keys in its
+      state delta instead of re-serializing the whole session state.
+    - Events are appended one row each.
+    - Recently used sessions are kept in memory; sessions idle for longer than
+      `idle_seconds`, or beyond `max_cached`, are evicted and reloaded on demand.
+      There is no timer: idle sessions are evicted on the next cache access, so
+      at most `max_cached` sessions stay in memory while the service is unused.
+    """
+
+    def __init__(self, path: str = None, max_cached: int = None, idle_seconds: float = None):
+        self.path = path or Config.SESSION_DB_PATH
+        self.max_cached = max_cached if max_cached is not None else Config.SESSION_CACHE_SIZE
+        self.idle_seconds = idle_seconds if idle_seconds is not None else Config.SESSION_IDLE_SECONDS
+        self._local = threading.local()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process, in case we were forked).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ---------------------------------------------------------------- memory
+
+    def _cached(self, key: tuple):
+        with self._lock:
+            self._evict_idle()
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            entry[1] = time.monotonic()
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def _remember(self, key: tuple, session: Session):
+        with self._lock:
+            self._cache[key] = [session, time.monotonic()]
+            self._cache.move_to_end(key)
+            self._evict_idle()
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._cache:
+            key, (_, last_access) = next(iter(self._cache.items()))
+            if last_access >= cutoff and len(self._cache) <= self.max_cached:
+                break
+            del self._cache[key]
+
+    def cached_sessions(self) -> int:
+        """
+        Number of sessions currently held in memory.
+        """
+        with self._lock:
+            self._evict_idle()
+            return len(self._cache)
+
+    # --------------------------------------------------------------- storage
+
+    def _shared_state(self, conn, app_name: str, user_id: str) -> dict:
+        state = {}
+        for key, value in conn.execute("SELECT key, value FROM app_state WHERE app_name = ?", (app_name,)):
+            state[State.APP_PREFIX + key] = json.loads(value)
+        for key, value in conn.execute(
+            "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ):
+            state[State.USER_PREFIX + key] = json.loads(value)
+        return state
+
+    def _write_state(self, conn, app_name: str, user_id: str, session_id: str, delta: dict):
+        app, user, session = _split_state(delta)
+        conn.executemany(
+            "INSERT OR REPLACE INTO app_state(app_name, key, value) VALUES (?, ?, ?)",
+            [(app_name, k, json.dumps(v, default=str)) for k, v in app.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO user_state(app_name, user_id, key, value) VALUES (?, ?, ?, ?)",
+            [(app_name, user_id, k, json.dumps(v, default=str)) for k, v in user.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO session_state(app_name, user_id, session_id, key, value) VALUES (?, ?, ?, ?, ?)",
+            [(app_name, user_id, session_id, k, json.dumps(v, default=str)) for k, v in session.items()],
+        )
+        return session
+
+    def _load(self, app_name: str, user_id: str, session_id: str):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        state = {
+            key: json.loads(value)
+            for key, value in conn.execute(
+                "SELECT key, value FROM session_state WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+        }
+        events = [
+            Event.model_validate_json(payload)
+            for (payload,) in conn.execute(
+                "SELECT payload FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+                (app_name, user_id, session_id),
+            )
+        ]
+        return Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=state, events=events, last_update_time=row[0],
+        )
+
+    # ------------------------------------------------------------ interface
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO sessions(app_name, user_id, id, create_time, update_time) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, now, now),
+            )
+            session_state = self._write_state(conn, app_name, user_id, session_id, state or {})
+            conn.execute("COMMIT")
+        except sqlite3.IntegrityError:
+            conn.execute("ROLLBACK")
+            raise AlreadyExistsError(f"Session {session_id} already exists.")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        session = Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=dict(session_state), events=[], last_update_time=now,
+        )
+        self._remember((app_name, user_id, session_id), session)
+        copied = _light_copy(session)
+        copied.state.update(self._shared_state(conn, app_name, user_id))
+        return copied
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        session = self._cached(key)
+        if session is None:
+            session = self._load(app_name, user_id, session_id)
+            if session is None:
+                return None
+            self._remember(key, session)
+
+        copied = _light_copy(session)
+        copied.state.update(self._shared_state(self._connect(), app_name, user_id))
+        if config:
+            if config.after_timestamp is not None:
+                copied.events = [e for e in copied.events if e.timestamp >= config.after_timestamp]
+            if config.num_recent_events is not None:
+                copied.events = copied.events[-config.num_recent_events:] if config.num_recent_events else []
+        return copied
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        query = "SELECT user_id, id, update_time FROM sessions WHERE app_name = ?"
+        params = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        rows = self._connect().execute(query + " ORDER BY update_time", params)
+        return ListSessionsResponse(sessions=[
+            Session(id=sid, app_name=app_name, user_id=uid, state={}, events=[], last_update_time=updated)
+            for uid, sid, updated in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table, column in (("sessions", "id"), ("session_state", "session_id"), ("events", "session_id")):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND {column} = ?",
+                    (app_name, user_id, session_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._cache.pop((app_name, user_id, session_id), None)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict[str, Any]:
+        return {
+            key: json.loads(value)
+            for key, value in self._connect().execute(
+                "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            )
+        }
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # Applies temp state to the caller's session and strips it from the event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = conn.execute(
+                "UPDATE sessions SET update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (event.timestamp, session.app_name, session.user_id, session.id),
+            ).rowcount
+            if not updated:
+                raise ValueError(f"Session {session.id} not found.")
+            conn.execute(
+                "INSERT INTO events(app_name, user_id, session_id, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, event.timestamp,
+                 event.model_dump_json(exclude_none=True)),
+            )
+            delta = {}
+            if event.actions and event.actions.state_delta:
+                delta = self._write_state(conn, session.app_name, session.user_id, session.id,
+                                          event.actions.state_delta)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # Keep the in-memory copy in step when the caller holds a different object
+        stored = self._cached((session.app_name, session.user_id, session.id))
+        if stored is not None and stored is not session:
+            stored.events.append(event)
+            stored.state.update(delta)
+            stored.last_update_time = event.timestamp
+        return event
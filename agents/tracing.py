@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+
+from google.adk.plugins.base_plugin import BasePlugin
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+from scientific_research_system.tools.telemetry import INVOCATION_ATTRIBUTE, KIND_ATTRIBUTE, get_telemetry
+
+
+def _size(value) -> int:
+    """
+    Size in bytes of a value's JSON encoding.
+    """
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+
+class TelemetryPlugin(BasePlugin):
+    """
+    Runner plugin emitting OpenTelemetry spans for the whole workflow:
+
+    workflow (research_workflow)
+      stage (direct children of the workflow: stages or DAG nodes)
+        agent (nested agents)
+          model (one per model call: model, tier and fallbacks, prompt/completion tokens, cache hit)
+          tool  (one per tool call: argument and result sizes)
+
+    Spans are parented explicitly by agent name and function call id, since
+    parallel branches interleave on one event loop. Cache lookups are counted
+    by the caches themselves (see record_cache).
+    """
+
+    def __init__(self):
+        super().__init__(name="telemetry")
+        self.telemetry = get_telemetry()
+        self._spans = {}
+        self._tool_started = {}
+        self._lock = threading.Lock()
+
+    def _start(self, key, name: str, kind: str, parent_key, invocation_id: str, attributes: dict):
+        with self._lock:
+            parent = self._spans.get(parent_key) if parent_key else None
+        context = trace.set_span_in_context(parent) if parent else None
+        span = self.telemetry.tracer.start_span(
+            name, context=context,
+            attributes={INVOCATION_ATTRIBUTE: invocation_id, KIND_ATTRIBUTE: kind, **attributes},
+        )
+        with self._lock:
+            self._spans[key] = span
+        return span
+
+    def _end(self, key, error: Exception = None, attributes: dict = None):
+        with self._lock:
+            span = self._spans.pop(key, None)
+        if span is None:
+            return
+        if attributes:
+            span.set_attributes(attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+
+    # Agents and stages
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        invocation_id = callback_context.invocation_id
+        parent = agent.parent_agent
+        if parent is None:
+            kind = "workflow"
+        elif parent.parent_agent is None:
+            kind = "stage"
+        else:
+            kind = "agent"
+        self._start(
+            (invocation_id, agent.name), f"{kind} {agent.name}", kind,
+            (invocation_id, parent.name) if parent else None, invocation_id,
+            {"research.agent": agent.name, "research.agent_type": type(agent).__name__,
+             "research.leaf": not agent.sub_agents},
+        )
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._end((callback_context.invocation_id, agent.name))
+        return None
+
+    async def on_agent_error_callback(self, *, agent, callback_context, error):
+        self._end((callback_context.invocation_id, agent.name), error)
+
+    # Model calls
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        model = llm_request.model or ""
+        self._start(
+            (invocation_id, agent_name, "model"), f"model {model}", "model",
+            (invocation_id, agent_name), invocation_id,
+            {"research.agent": agent_name, "gen_ai.request.model": model,
+             "research.model.contents": len(llm_request.contents)},
+        )
+        return None
+
+    def _end_model(self, invocation_id: str, agent_name: str, response, error: Exception = None):
+        attributes = {}
+        # Set by RoutedModel: the agent's tier and the model of the chain that answered
+        routing = (getattr(response, "custom_metadata", None) or {}).get("model_routing")
+        tier = routing["tier"] if routing else "unrouted"
+        if routing:
+            attributes.update({"research.model.tier": tier, "gen_ai.response.model": routing["model"],
+                               "research.model.fallbacks": routing["fallbacks"]})
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            prompt = usage.prompt_token_count or 0
+            completion = usage.candidates_token_count or 0
+            attributes.update({"gen_ai.usage.input_tokens": prompt, "gen_ai.usage.output_tokens": completion})
+            self.telemetry.model_tokens.add(prompt, {"agent": agent_name, "tier": tier, "type": "prompt"})
+            self.telemetry.model_tokens.add(completion, {"agent": agent_name, "tier": tier, "type": "completion"})
+        self._end((invocation_id, agent_name, "model"), error, attributes)
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        self._end_model(callback_context.invocation_id, callback_context.agent_name, llm_response)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._end_model(callback_context.invocation_id, callback_context.agent_name, None, error)
+        return None
+
+    # Tool calls
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        invocation_id = tool_context.invocation_id
+        agent_name = tool_context.agent_name
+        self._start(
+            (invocation_id, tool_context.function_call_id), f"tool {tool.name}", "tool",
+            (invocation_id, agent_name), invocation_id,
+            {"research.agent": agent_name, "gen_ai.tool.name": tool.name,
+             "research.tool.args": len(tool_args), "research.tool.args_bytes": _size(tool_args)},
+        )
+        self._tool_started[(invocation_id, tool_context.function_call_id)] = time.perf_counter()
+        return None
+
+    def _end_tool(self, tool, tool_context, result=None, error: Exception = None):
+        key = (tool_context.invocation_id, tool_context.function_call_id)
+        started = self._tool_started.pop(key, None)
+        if started is not None:
+            self.telemetry.tool_duration.record(time.perf_counter() - started, {"tool": tool.name})
+        attributes = {"research.tool.result_bytes": _size(result)} if error is None else None
+        self._end(key, error, attributes)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._end_tool(tool, tool_context, result)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._end_tool(tool, tool_context, error=error)
+        return None
+
+    # Responses served without calling the model
+
+    async def on_event_callback(self, *, invocation_context, event):
+        if (event.custom_metadata or {}).get("llm_cache") == "hit":
+            key = (invocation_context.invocation_id, event.author, "model")
+            with self._lock:
+                span = self._spans.get(key)
+            if span is not None:
+                span.set_attribute("research.cache_hit", True)
+            # after_model_callback is not run for a short-circuited call
+            self._end_model(invocation_context.invocation_id, event.author, event)
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        # Close whatever an aborted branch left open
+        with self._lock:
+            leftover = [key for key in self._spans if key[0] == invocation_context.invocation_id]
+        for key in leftover:
+            self._end(key)
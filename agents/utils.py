@@ -1,19 +1,86 @@
-import time
-import functools
-from google.adk.agents import LlmAgent
+import asyncio
 
-def rate_limited_agent(agent: LlmAgent, delay_seconds: float = 5.0):
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.google_llm import Gemini
+from google.adk.models.registry import LLMRegistry
+from scientific_research_system.agents.model_routing import RoutedModel
+from scientific_research_system.config import Config
+from scientific_research_system.tools.context_compaction import CHARS_PER_TOKEN
+from scientific_research_system.tools.rate_limit import (
+    backoff_delay, get_rate_limiter, is_rate_limit_error, retry_after_seconds
+)
+
+
+def estimate_tokens(llm_request) -> int:
+    """
+    Estimates the prompt size of a request; the reservation is corrected
+    with the real usage reported by the model afterwards.
+    """
+    chars = 0
+    if llm_request.config and llm_request.config.system_instruction:
+        chars += len(str(llm_request.config.system_instruction))
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call or part.function_response:
+                chars += len(str(part.function_call or part.function_response))
+    return chars // CHARS_PER_TOKEN + 1
+
+
+class RateLimitedGemini(Gemini):
     """
-    Wraps an LlmAgent to inject a sleep delay before execution.
-    NOTE: This is a conceptual wrapper. ADK agents are not easily wrapped this way
-    because the runner calls internal methods.
-    
-    A better approach for ADK is to ensure Sequential execution (done)
-    and rely on the API's own rate limiting or simple pauses in the workflow if customizable.
+    Gemini model whose calls go through the shared "gemini" rate limiter
+    (RPM/TPM buckets and AIMD concurrency) and are retried on 429
+    RESOURCE_EXHAUSTED after the server's retry delay.
     """
-    # Since we cannot easily wrap the internal run method of an instantiated Agent object 
-    # without monkey-patching, and we've already switched to Sequential execution,
-    # we will rely on the sequential nature to naturally throttle the requests.
-    # If further throttling is needed, we would need to subclass LlmAgent.
-    pass
 
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        limiter = get_rate_limiter("gemini")
+        estimate = estimate_tokens(llm_request)
+        attempt = 0
+        while True:
+            await limiter.acquire_async(estimate)
+            used = None
+            yielded = False
+            error = None
+            throttled = False
+            try:
+                async for response in super().generate_content_async(llm_request, stream):
+                    if response.usage_metadata and response.usage_metadata.total_token_count:
+                        used = response.usage_metadata.total_token_count
+                    yielded = True
+                    yield response
+            except Exception as e:
+                error = e
+            finally:
+                throttled = error is not None and is_rate_limit_error(error)
+                retry_after = retry_after_seconds(error) if throttled else None
+                limiter.release(estimate, used, throttled=throttled, retry_after=retry_after)
+
+            if error is None:
+                return
+            # A partially streamed answer cannot be retried transparently
+            if not throttled or yielded or attempt >= Config.RATE_LIMIT_MAX_RETRIES:
+                raise error
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+            attempt += 1
+
+
+def rate_limited_agent(agent: BaseAgent) -> BaseAgent:
+    """
+    Routes the model calls of an agent and all of its sub-agents through the
+    shared rate limiter by swapping Gemini model names for RateLimitedGemini.
+    The Gemini models of a routed fallback chain are swapped the same way.
+    Other model types are left untouched. Returns the agent.
+    """
+    if isinstance(agent, LlmAgent) and isinstance(agent.model, str) and agent.model:
+        if issubclass(LLMRegistry.resolve(agent.model), Gemini):
+            agent.model = RateLimitedGemini(model=agent.model)
+    elif isinstance(agent, LlmAgent) and isinstance(agent.model, RoutedModel):
+        agent.model.chain = [
+            RateLimitedGemini(model=llm.model) if type(llm) is Gemini else llm for llm in agent.model.chain
+        ]
+    for sub_agent in agent.sub_agents:
+        rate_limited_agent(sub_agent)
+    return agent
@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import sys
 import asyncio
+import time
 import uuid
 from dotenv import load_dotenv
 
@@ -17,9 +18,12 @@ st.set_page_config(page_title="Autonomous Research Agent (ADK)", layout="wide",
 
 # Import ADK components
 try:
-    from google.adk.runners import InMemoryRunner
     from google.genai import types
-    from scientific_research_system.agents.research_app import create_research_system
+    from scientific_research_system.agents.progress import TokenUsage, WorkflowProgress
+    from scientific_research_system.agents.research_app import EXECUTION_MODES, create_research_system
+    from scientific_research_system.agents.runtime import APP_NAME, create_runner
+    from scientific_research_system.tools.graph_store import parse_graph
+    from scientific_research_system.tools.telemetry import get_telemetry, run_summary
     from scientific_research_system.config import Config
 except ImportError as e:
     st.error(f"Configuration Error: Could not import required modules. Ensure 'google-adk' is installed.\nError: {e}")
@@ -46,9 +50,16 @@ with st.sidebar:
     # Execution Mode Selection
     execution_mode = st.selectbox(
         "Execution Mode",
-        ["sequential", "parallel"],
+        list(EXECUTION_MODES),
         index=0,
-        help="Sequential: Slower but safer for rate limits. Parallel: Faster but may hit rate limits."
+        help="Sequential: Runs one agent at a time. Parallel: Runs independent agents concurrently; model and search calls are kept within the configured rate limits (GEMINI_RPM/GEMINI_TPM). DAG: Starts every agent as soon as its inputs are ready (e.g. knowledge graph alongside quality control)."
+    )
+
+    resume = st.checkbox(
+        "Resume previous run",
+        value=False,
+        disabled=not Config.CHECKPOINT_ENABLED,
+        help="Reuse the checkpointed stages of the last run of this topic. Only stages whose inputs or prompts changed are re-run."
     )
     
     st.divider()
@@ -60,108 +71,116 @@ topic = st.text_input("Enter Research Topic:", placeholder="e.g., 'Multi-agent s
 if st.button("🚀 Start Research", type="primary"):
     if not topic:
         st.warning("Please enter a research topic.")
-    elif not Config.GOOGLE_API_KEY and not os.environ.get("GOOGLE_API_KEY"):
+    elif not Config.GOOGLE_API_KEY and not os.environ.get("GOOGLE_API_KEY") and Config.LLM_CACHE_MODE != "replay":
         # Config might load initially, but if set via UI, we check env
         st.error("Please provide a Google API Key.")
     else:
         # Initialize ADK Workflow
         try:
             # Create workflow based on selected execution mode
-            workflow = create_research_system(execution_mode=execution_mode)
-            runner = InMemoryRunner(agent=workflow, app_name="agents")
+            workflow = create_research_system(execution_mode=execution_mode, resume=resume)
+            runner = create_runner(workflow)
             
             session_id = str(uuid.uuid4())
             user_id = "researcher"
             
             # UI Containers
+            progress = WorkflowProgress(workflow)
+            token_usage = TokenUsage()
+            # Time spent updating the page, reported next to the agents' own time
+            run_info = {"invocation_id": None, "ui_seconds": 0.0}
             progress_container = st.container()
+            stage_container = st.expander("🧭 Workflow Stages", expanded=True)
             log_container = st.expander("📜 Execution Logs", expanded=True)
-            result_container = st.container()
+            partial_container = st.expander("🧪 Intermediate Results", expanded=False)
 
             with progress_container:
-                st.info(f"Initializing agents ({execution_mode} mode)...")
-                progress_bar = st.progress(0)
+                st.info(f"{'Resuming' if resume else 'Initializing'} agents ({execution_mode} mode)...")
+                progress_bar = st.progress(0.0)
                 status_text = st.empty()
-                
-            # Run the agent
-            # ADK's InMemoryRunner runs asynchronously. 
-            # We'll display a generic spinner because we can't easily stream step-by-step progress 
-            # without a custom event listener in this version of ADK/Streamlit integration.
-            
-            with st.spinner("Agents are collaborating... This may take 1-2 minutes."):
-                # Run the workflow
-                # We pass the topic as the user message
-                try:
-                    # Create session explicitly to avoid "Session not found" in threads
-                    # Signature is: create_session(*, app_name: str, user_id: str, state: Optional[dict] = None, session_id: Optional[str] = None)
-                    # We must pass kwargs
-                    
-                    # Define an async execution function to handle the entire flow
-                    async def execute_research():
-                        # 1. Create Session
-                        await runner.session_service.create_session(
-                             app_name="agents", 
-                             user_id=user_id, 
-                             session_id=session_id
-                         )
-                        
-                        # 2. Run Workflow (debug mode is synchronous but wrapped as async in recent versions or we call it async if awaitable)
-                        # Based on previous error, run_debug IS awaitable (returns coroutine).
-                        events = await runner.run_debug(
-                            user_messages=topic,
-                            user_id=user_id,
-                            session_id=session_id,
-                            verbose=False
-                        )
-                        return events
-
-                    # Run the complete async flow
-                    events = asyncio.run(execute_research())
-                    
-                    # Display events in log container
-                    with log_container:
-                        st.write(f"Processed {len(events)} events.")
-                        for event in events:
-                            # Check event type and format accordingly
-                            event_type = type(event).__name__
-                            
-                            if event_type == "ModelEvent":
-                                st.markdown(f"**🤖 Agent Action:** `{event.agent_name}`")
-                                st.text(f"Model: {event.model}")
-                                
-                            elif event_type == "ToolEvent":
-                                st.markdown(f"**🛠️ Tool Call:** `{event.tool_name}`")
-                                # Show tool input/output if available (ADK structure varies)
-                                st.json(event.tool_args)
-                                st.text(f"Output: {str(event.tool_output)[:500]}...") # Truncate long outputs
-                                
-                            elif hasattr(event, 'agent_name'):
-                                st.markdown(f"**➡️ Step:** `{event.agent_name}`")
-                                if hasattr(event, 'state_update'):
-                                     st.json(event.state_update)
-                            else:
-                                # Fallback for unknown event types
-                                st.code(str(event))
-
-                    # Fetch final state (need another async run or include in execute_research)
-                    async def fetch_state():
-                         session = await runner.session_service.get_session(
-                            app_name="agents", 
-                            user_id=user_id, 
-                            session_id=session_id
-                        )
-                         return session.state
-                    
-                    final_state = asyncio.run(fetch_state())
 
-                    progress_bar.progress(1.0)
-                    status_text.success("Research Completed Successfully!")
-                    
-                except Exception as e:
-                    st.error(f"Error during ADK execution: {e}")
-                    import traceback
-                    st.code(traceback.format_exc())
-                    st.stop()
+            # One line per stage, updated in place as stages complete
+            with stage_container:
+                stage_slots = {name: st.empty() for name, _ in progress.stages}
+                for name, slot in stage_slots.items():
+                    slot.markdown(f"⏳ `{name}`")
+
+            def truncate(value, limit=500):
+                text = value if isinstance(value, str) else str(value)
+                return text if len(text) <= limit else text[:limit] + "..."
+
+            def render_event(event):
+                """
+                Renders one event as soon as it arrives. Nothing is kept afterwards,
+                so memory stays flat however long the run is.
+                """
+                with log_container:
+                    for call in event.get_function_calls():
+                        st.markdown(f"**🛠️ Tool Call:** `{event.author}` → `{call.name}`")
+                        st.text(truncate(call.args))
+                    for response in event.get_function_responses():
+                        st.markdown(f"**📥 Tool Result:** `{response.name}`")
+                        st.text(truncate(response.response))
+                    delta = event.actions.state_delta if event.actions else None
+                    if delta:
+                        restored = (event.custom_metadata or {}).get("checkpoint") == "restored"
+                        label = "♻️ Restored" if restored else "➡️ Step"
+                        st.markdown(f"**{label}:** `{event.author}` wrote {', '.join(f'`{k}`' for k in delta)}")
+                    elif event.is_final_response() and event.content and event.content.parts:
+                        text = "".join(part.text or "" for part in event.content.parts)
+                        if text.strip():
+                            st.markdown(f"**🤖 Agent Action:** `{event.author}`")
+                            st.text(truncate(text))
+
+                # Partial outputs are shown as soon as their stage writes them
+                if event.actions and event.actions.state_delta:
+                    with partial_container:
+                        for key, value in event.actions.state_delta.items():
+                            st.markdown(f"**`{key}`**")
+                            st.markdown(truncate(value, 2000))
+
+            async def execute_research():
+                # Create session explicitly to avoid "Session not found" in threads
+                await runner.session_service.create_session(
+                    app_name=APP_NAME,
+                    user_id=user_id,
+                    session_id=session_id
+                )
+
+                # Consume the event stream and update the UI per event
+                message = types.Content(role="user", parts=[types.Part(text=topic)])
+                async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+                    run_info["invocation_id"] = event.invocation_id
+                    rendering_started = time.perf_counter()
+                    for name in progress.update(event):
+                        stage_slots[name].markdown(f"✅ `{name}`")
+                    status_text.text(f"Running: {progress.current_agent} "
+                                     f"({len(progress.completed)}/{len(progress.stages)} stages, {progress.events} events)")
+                    progress_bar.progress(progress.fraction)
+                    token_usage.update(event)
+                    render_event(event)
+                    run_info["ui_seconds"] += time.perf_counter() - rendering_started
+
+                session = await runner.session_service.get_session(
+                    app_name=APP_NAME,
+                    user_id=user_id,
+                    session_id=session_id
+                )
+                return session.state
+
+            try:
+                final_state = asyncio.run(execute_research())
+                progress_bar.progress(1.0)
+                status_text.success(f"Research Completed Successfully! ({progress.events} events)")
+            except Exception as e:
+                st.error(f"Error during ADK execution: {e}")
+                import traceback
+                st.code(traceback.format_exc())
+                st.stop()
+
+            with st.expander("🔢 Token Usage", expanded=False):
+                st.caption("Prompt and output tokens per agent; 'context_saved' is what context compaction removed from the prompt.")
+                st.dataframe(token_usage.rows(), use_container_width=True)
 
             # Display Results in Tabs
             st.divider()
@@ -178,7 +197,7 @@ if st.button("🚀 Start Research", type="primary"):
             gaps_text = final_state.get("gaps", "No gaps found.")
             kg_data = final_state.get("knowledge_graph", {})
             
-            tab1, tab2, tab3, tab4 = st.tabs(["📝 Literature Review", "💡 Hypotheses", "🔍 Gaps", "🕸️ Knowledge Graph"])
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 Literature Review", "💡 Hypotheses", "🔍 Gaps", "🕸️ Knowledge Graph", "⏱️ Performance"])
             
             with tab1:
                 st.markdown(draft)
@@ -194,24 +213,57 @@ if st.button("🚀 Start Research", type="primary"):
             with tab4:
                 st.markdown("### Knowledge Graph Data")
                 
-                import json
-                import re
-                
-                # Handle potential markdown wrapping from LLM
-                kg_content = kg_data
-                if isinstance(kg_content, str):
-                    # Remove markdown code blocks
-                    cleaned_json = re.sub(r'```json\s*', '', kg_content)
-                    cleaned_json = re.sub(r'```\s*', '', cleaned_json)
-                    cleaned_json = cleaned_json.strip()
-                    try:
-                        kg_display = json.loads(cleaned_json)
-                        st.json(kg_display)
-                    except json.JSONDecodeError:
-                        st.warning("Could not parse JSON. Raw output:")
-                        st.text(kg_content)
+                graph = parse_graph(kg_data)
+                if graph["entities"] or graph["relations"]:
+                    st.markdown(f"**Entities:** {', '.join(graph['entities'])}")
+                    st.dataframe([
+                        {"source": source, "relation": relation, "target": target}
+                        for source, relation, target in graph["relations"]
+                    ], use_container_width=True)
                 else:
-                    st.json(kg_content)
+                    st.warning("Could not parse the knowledge graph. Raw output:")
+                    st.text(kg_data)
+                if final_state.get("graph_gaps"):
+                    st.markdown("#### Structural Gap Candidates")
+                    st.text(final_state["graph_gaps"])
+
+            with tab5:
+                st.markdown("### Timing Breakdown")
+                perf = run_summary(run_info["invocation_id"]) if Config.TELEMETRY_ENABLED and run_info["invocation_id"] else None
+                if not perf or not perf["seconds"]:
+                    st.info("Enable TELEMETRY_ENABLED to collect timings.")
+                else:
+                    model_seconds = sum(a["model_seconds"] for a in perf["agents"].values())
+                    tool_seconds = sum(a["tool_seconds"] for a in perf["agents"].values())
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("Wall time", f"{perf['seconds']:.1f}s")
+                    col2.metric("Model calls", f"{model_seconds:.1f}s")
+                    col3.metric("Tool calls", f"{tool_seconds:.1f}s")
+                    col4.metric("UI rendering", f"{run_info['ui_seconds']:.1f}s")
+                    st.caption("Model and tool time is summed over agents, so it can exceed the wall time in parallel and DAG runs.")
+
+                    st.markdown("#### Stages")
+                    st.dataframe([
+                        {**stage, "share": f"{stage['seconds'] / perf['seconds']:.0%}"} for stage in perf["stages"]
+                    ], use_container_width=True)
+                    if perf["tiers"]:
+                        st.markdown("#### Model Tiers")
+                        st.caption("Latency and cost per model tier (MODEL_TIERS / MODEL_ROUTES), priced at MODEL_PRICES.")
+                        st.dataframe([{"tier": name, **row} for name, row in perf["tiers"].items()], use_container_width=True)
+                    st.markdown("#### Agents")
+                    st.dataframe([{"agent": name, **row} for name, row in perf["agents"].items()], use_container_width=True)
+                    if perf["tools"]:
+                        st.markdown("#### Tools")
+                        st.dataframe([{"tool": name, **row} for name, row in perf["tools"].items()], use_container_width=True)
+                    cache_stats = get_telemetry().cache_stats()
+                    if cache_stats:
+                        st.markdown("#### Caches (since the app started)")
+                        st.dataframe([{"cache": name, **row} for name, row in cache_stats.items()], use_container_width=True)
+                    search_stats = get_telemetry().search_stats()
+                    if search_stats:
+                        st.markdown("#### Search Resilience (since the app started)")
+                        st.caption("Retries, hedged requests, timeouts and circuit breaker fallbacks per search backend.")
+                        st.dataframe([{"source": name, **row} for name, row in search_stats.items()], use_container_width=True)
                 
             # Download Button
             result_text = f"# {topic}\n\n## Review\n{draft}\n\n## Hypotheses\n{hypotheses_text}\n\n## Gaps\n{gaps_text}"
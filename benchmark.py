@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scientific_research_system.benchmarks.run import main
+
+if __name__ == "__main__":
+    main()
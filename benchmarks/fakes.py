@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from scientific_research_system.agents.model_routing import RoutedModel
+from scientific_research_system.tools import arxiv_tools, search_tools
+from scientific_research_system.tools.context_compaction import CHARS_PER_TOKEN
+
+_VOCABULARY = (
+    "agent model learning graph climate simulation transformer dataset benchmark policy reward "
+    "neural scientific discovery hypothesis experiment baseline evaluation retrieval citation "
+    "uncertainty causal protein molecule optimization reinforcement survey method analysis result"
+).split()
+
+# Tool call each agent makes first (if it has that tool), so the real tool code runs
+TOOL_SCRIPT = {
+    "arxiv_mining": ("arxiv_batch_search_func", {"queries": ["benchmark query one", "benchmark query two", "benchmark query three"]}),
+    "web_mining": ("web_batch_search_func", {"queries": ["benchmark query one", "benchmark query two", "benchmark query three"]}),
+    "citation_auditor": ("fetch_citation_metadata", {"paper_id": "bench-0001"}),
+    "fraud_detector": ("check_benfords_law_batch", {"tables": {
+        "table_1": [round(1.5 ** i, 2) for i in range(1, 60)],
+        "table_2": [17 * i + 3 for i in range(1, 120)],
+    }}),
+    "reproducibility_auditor": ("validate_python_env", {"dependencies": ["numpy>=1.24", "pandas", "scipy<2"]}),
+    "domain_bridge": ("canonicalize_problem", {"problem_description": "protein folding energy minimization"}),
+}
+
+
+def fake_graph(seed: str, entities: int = 40) -> str:
+    """
+    Deterministic knowledge graph JSON (entities and relation triples), like the knowledge graph agent returns.
+    """
+    rng = random.Random(hashlib.sha256(seed.encode("utf-8")).hexdigest())
+    names = sorted({" ".join(rng.sample(_VOCABULARY, 2)) for _ in range(entities)})
+    relations = [
+        {"source": a, "relation": rng.choice(["uses", "extends", "evaluates", "improves"]), "target": b}
+        for a, b in (rng.sample(names, 2) for _ in range(len(names) * 3 // 2))
+    ]
+    return "```json\n" + json.dumps({"entities": names, "relationships": relations}, indent=1) + "\n```"
+
+
+def fake_text(seed: str, tokens: int) -> str:
+    """
+    Deterministic pseudo-prose of about `tokens` tokens, numbered like a findings list.
+    """
+    rng = random.Random(hashlib.sha256(seed.encode("utf-8")).hexdigest())
+    lines = []
+    size = 0
+    item = 1
+    while size < tokens * CHARS_PER_TOKEN:
+        sentences = [
+            " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(8, 16))).capitalize() + "."
+            for _ in range(rng.randint(2, 4))
+        ]
+        line = f"{item}. Finding {item}: " + " ".join(sentences)
+        lines.append(line)
+        size += len(line) + 1
+        item += 1
+    return "\n".join(lines)
+
+
+class FakeGemini(BaseLlm):
+    """
+    Deterministic stand-in for Gemini with configurable latency and response size.
+
+    Agents listed in TOOL_SCRIPT first call their tool, then answer. The answer
+    is pseudo-text seeded by the agent name, so every run produces the same
+    prompts. Usage metadata is estimated from the characters sent and returned.
+    """
+
+    model: str = "fake-gemini"
+    agent_name: str = ""
+    latency: float = 0.2
+    seconds_per_token: float = 0.0
+    response_tokens: int = 400
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.calls += 1
+        prompt_chars = len(str(llm_request.config.system_instruction or "")) if llm_request.config else 0
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                prompt_chars += len(part.text or "") or len(str(part.function_call or part.function_response or ""))
+        last = llm_request.contents[-1].parts[0] if llm_request.contents and llm_request.contents[-1].parts else None
+
+        script = TOOL_SCRIPT.get(self.agent_name)
+        if script and script[0] in llm_request.tools_dict and not (last and last.function_response):
+            part = types.Part(function_call=types.FunctionCall(name=script[0], args=script[1]))
+            completion = 20
+        else:
+            if self.agent_name == "query_formulation":
+                text = "benchmark query one, benchmark query two, benchmark query three"
+            elif self.agent_name == "knowledge_graph":
+                text = fake_graph(self.agent_name)
+            else:
+                text = fake_text(self.agent_name, self.response_tokens)
+            part = types.Part(text=text)
+            completion = len(text) // CHARS_PER_TOKEN
+
+        await asyncio.sleep(self.latency + completion * self.seconds_per_token)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // CHARS_PER_TOKEN,
+                candidates_token_count=completion,
+                total_token_count=prompt_chars // CHARS_PER_TOKEN + completion,
+            ),
+        )
+
+
+def use_fake_model(agent: BaseAgent, **settings) -> list[FakeGemini]:
+    """
+    Replaces the model of every LlmAgent in the tree by a FakeGemini (one per
+    agent, so call counts are per agent). A routed agent keeps its tier and
+    the fake answers as the tier's first model, so the per-tier report works.
+    Returns the fakes.
+    """
+    fakes = []
+    if isinstance(agent, LlmAgent):
+        fake = FakeGemini(agent_name=agent.name, **settings)
+        if isinstance(agent.model, RoutedModel):
+            fake.model = agent.model.model
+            agent.model = RoutedModel(model=fake.model, tier=agent.model.tier, chain=[fake])
+        else:
+            agent.model = fake
+        fakes.append(fake)
+    for sub_agent in agent.sub_agents:
+        fakes += use_fake_model(sub_agent, **settings)
+    return fakes
+
+
+class FakeSearch:
+    """
+    Stand-in for the arXiv / DuckDuckGo search tools: blocks for `latency`
+    seconds (like a network call, so the thread fan-out is exercised) and returns
+    `max_results` records totalling about `result_tokens` tokens per query, in
+    the layout of the real wrappers. Records are drawn from a pool of twice
+    `max_results` documents, so queries overlap like real ones do, and the first
+    web pages mirror arXiv papers. A `tail_rate` share of the requests (drawn from
+    a seeded generator) takes `tail_latency` seconds longer, like a slow backend.
+    """
+
+    def __init__(self, source: str, latency: float = 0.3, result_tokens: int = 600, max_results: int = 5,
+                 tail_rate: float = 0.0, tail_latency: float = 0.0):
+        self.source = source
+        self.latency = latency
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self._rng = random.Random(source)
+        self.result_tokens = result_tokens
+        # The web search cache key reads api_wrapper.max_results
+        self.api_wrapper = self
+        self.max_results = max_results
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _record(self, number: int) -> str:
+        rng = random.Random(f"{self.source}:{number}")
+        title = " ".join(rng.sample(_VOCABULARY, 7)).capitalize()
+        body = fake_text(f"{self.source}:{number}", self.result_tokens // self.max_results)
+        if self.source == "arxiv":
+            return (f"Published: 2024-01-{number % 28 + 1:02d}\nTitle: {title}\nAuthors: A. Author, B. Author\n"
+                    f"arXiv ID: 2401.{number:05d}\nSummary: {body}")
+        link = f"https://arxiv.org/abs/2401.{number:05d}" if number < 2 else f"https://example.org/post-{number}"
+        return f"Title: {title}\nLink: {link}\nSnippet: {body}"
+
+    def run(self, query: str) -> str:
+        with self._lock:
+            self.calls += 1
+            slow = self._rng.random() < self.tail_rate
+        time.sleep(self.latency + (self.tail_latency if slow else 0.0))
+        rng = random.Random(hashlib.sha256(f"{self.source}:{query}".encode("utf-8")).hexdigest())
+        numbers = rng.sample(range(2 * self.max_results), self.max_results)
+        return "\n\n".join(self._record(number) for number in numbers)
+
+
+@contextmanager
+def fake_search_backends(latency: float = 0.3, result_tokens: int = 600,
+                         tail_rate: float = 0.0, tail_latency: float = 0.0):
+    """
+    Routes arXiv and web searches to FakeSearch instances for the duration of the block.
+    """
+    arxiv = FakeSearch("arxiv", latency, result_tokens, tail_rate=tail_rate, tail_latency=tail_latency)
+    web = FakeSearch("web", latency, result_tokens, tail_rate=tail_rate, tail_latency=tail_latency)
+    original = (arxiv_tools._get_arxiv_tool, search_tools._get_search)
+    arxiv_tools._get_arxiv_tool = lambda: arxiv
+    search_tools._get_search = lambda: web
+    try:
+        yield arxiv, web
+    finally:
+        arxiv_tools._get_arxiv_tool, search_tools._get_search = original
@@ -0,0 +1,141 @@
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from scientific_research_system.benchmarks.fakes import fake_text
+from scientific_research_system.tools.citation_store import CitationStore
+from scientific_research_system.tools.citation_tools import detect_temporal_anomaly
+from scientific_research_system.tools.code_tools import extract_code_blocks, validate_python_env
+from scientific_research_system.tools.forensics_tools import (
+    check_benfords_law, check_benfords_law_batch, check_p_value_batch
+)
+from scientific_research_system.tools.graph_store import KnowledgeGraph
+from scientific_research_system.tools.paper_index import PaperIndex
+
+# Each repeat runs the function enough times to take at least this long
+MIN_REPEAT_SECONDS = 0.05
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """
+    timeit-style measurement: calibrates the number of calls per repeat, then
+    reports the best and median time per call in milliseconds.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_REPEAT_SECONDS or number >= 1_000_000:
+            break
+        number *= 10
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "best_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "calls_per_repeat": number,
+    }
+
+
+def _citation_records(papers: int, refs_per_paper: int, rng) -> list[dict]:
+    days = rng.integers(0, 20 * 365, size=papers)
+    dates = (np.datetime64("2005-01-01") + days.astype("timedelta64[D]")).astype(str)
+    return [
+        {
+            "paper_id": f"p{i}",
+            "publication_date": dates[i],
+            "references": [f"p{j}" for j in rng.integers(0, papers, size=refs_per_paper)],
+        }
+        for i in range(papers)
+    ]
+
+
+def _p_value_results(count: int, rng) -> list[dict]:
+    results = []
+    for i in range(count):
+        test = ("t", "z", "F", "chi2", "r")[i % 5]
+        stat = float(rng.uniform(0.5, 4.0)) if test != "r" else float(rng.uniform(0.05, 0.6))
+        results.append({
+            "test": test, "stat": f"{stat:.2f}", "p": f"{rng.uniform(0.001, 0.2):.3f}",
+            "df1": int(rng.integers(2, 200)), "df2": int(rng.integers(10, 400)), "label": f"r{i}",
+        })
+    return results
+
+
+def _markdown_with_code(blocks: int) -> str:
+    parts = []
+    for i in range(blocks):
+        parts.append(f"Section {i} explains the method in a few words.\n")
+        parts.append(f"```python\nimport numpy as np\nx_{i} = np.arange({i})\nprint(x_{i}.sum())\n```\n")
+        if i % 5 == 0:
+            parts.append("    indented_block = True\n    print(indented_block)\n")
+    return "\n".join(parts)
+
+
+def _paper_index(papers: int, rng) -> PaperIndex:
+    vocabulary = fake_text("paper_index", 2_000).lower().replace(".", "").split()
+    index = PaperIndex(os.path.join(tempfile.mkdtemp(prefix="paper_index_"), "index.sqlite"))
+    for start in range(0, papers, 500):
+        index.add([
+            {
+                "paper_id": f"p{i}",
+                "title": " ".join(rng.choice(vocabulary, size=8)),
+                "summary": " ".join(rng.choice(vocabulary, size=150)),
+            }
+            for i in range(start, start + 500)
+        ])
+    return index
+
+
+def _knowledge_graph(entities: int, runs: int, rng) -> KnowledgeGraph:
+    """
+    Sparse graph with mostly local, heavy-tailed links, merged run by run.
+    """
+    graph = KnowledgeGraph()
+    per_run = entities * 3 // (2 * runs)
+    for run in range(runs):
+        src = rng.integers(0, entities, size=per_run)
+        dst = (src + rng.zipf(1.6, size=per_run)) % entities
+        graph.merge([], [(f"e{a}", "related_to", f"e{b}") for a, b in zip(src.tolist(), dst.tolist())], key=str(run))
+    return graph
+
+
+def micro_benchmarks(repeat: int = 5) -> dict:
+    """
+    Times the hot functions of the forensics, citation and code tools on
+    deterministic synthetic inputs.
+    """
+    rng = np.random.default_rng(0)
+    numbers = rng.lognormal(mean=3, sigma=2, size=100_000).tolist()
+    tables = {f"table_{i}": rng.lognormal(mean=2, sigma=1.5, size=2_000).tolist() for i in range(50)}
+    p_values = _p_value_results(1_000, rng)
+    records = _citation_records(20_000, 10, rng)
+    store = CitationStore.from_records(records)
+    citations = [{"paper_id": r["paper_id"], "publication_date": r["publication_date"]} for r in records[:10_000]]
+    markdown = _markdown_with_code(500)
+    index = _paper_index(20_000, rng)
+    graph = _knowledge_graph(100_000, 20, rng)
+    focus = list(range(50))
+
+    cases = {
+        "forensics.check_benfords_law[100k]": lambda: check_benfords_law(numbers),
+        "forensics.check_benfords_law_batch[50x2k]": lambda: check_benfords_law_batch(tables),
+        "forensics.check_p_value_batch[1k]": lambda: check_p_value_batch(p_values),
+        "citation.detect_temporal_anomaly[10k]": lambda: detect_temporal_anomaly("2015-06-01", citations),
+        "citation.CitationStore.from_records[20k]": lambda: CitationStore.from_records(records),
+        "citation.CitationStore.audit[200k edges]": lambda: store.audit(),
+        "code.extract_code_blocks[500 blocks]": lambda: extract_code_blocks(markdown),
+        "paper_index.search[20k papers]": lambda: index.search("graph neural transformer climate", 5),
+        "graph.gap_candidates[100k entities]": lambda: graph.gap_candidates(),
+        "graph.gap_candidates[run neighbourhood]": lambda: graph.gap_candidates(focus),
+        "code.validate_python_env": lambda: validate_python_env(["numpy>=1.24", "pandas", "torch", "scipy<2"]),
+    }
+    return {name: measure(fn, repeat) for name, fn in cases.items()}
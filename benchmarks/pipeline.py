@@ -0,0 +1,129 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+from google.genai import types
+from scientific_research_system.agents.progress import TokenUsage
+from scientific_research_system.agents.research_app import create_research_system
+from scientific_research_system.agents.runtime import APP_NAME, create_runner
+from scientific_research_system.benchmarks.fakes import fake_search_backends, use_fake_model
+from scientific_research_system.config import Config
+from scientific_research_system.tools.telemetry import get_telemetry, run_summary
+
+BENCHMARK_TOPIC = "Offline benchmark topic"
+USER_ID = "benchmark"
+
+# Every run must do the full work: no caches, checkpoints, rate limits, disk sessions or persistent graph
+BENCHMARK_CONFIG = {
+    "CACHE_ENABLED": False,
+    "LLM_CACHE_MODE": "off",
+    "CHECKPOINT_ENABLED": False,
+    "RATE_LIMIT_ENABLED": False,
+    "SESSION_BACKEND": "memory",
+    "TELEMETRY_ENABLED": True,
+    "KNOWLEDGE_GRAPH_PERSIST": False,
+}
+
+
+@contextmanager
+def benchmark_config(**overrides):
+    """
+    Temporarily overrides Config attributes.
+    """
+    saved = {name: getattr(Config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+async def _run_once(mode: str, llm: dict) -> dict:
+    workflow = create_research_system(execution_mode=mode)
+    fakes = use_fake_model(workflow, **llm)
+    runner = create_runner(workflow)
+    session_id = f"benchmark_{uuid.uuid4().hex[:8]}"
+    await runner.session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+    tokens = TokenUsage()
+    invocation_id = None
+    message = types.Content(role="user", parts=[types.Part(text=BENCHMARK_TOPIC)])
+    started = time.perf_counter()
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=message):
+        invocation_id = event.invocation_id
+        tokens.update(event)
+    wall = time.perf_counter() - started
+
+    session = await runner.session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    await runner.session_service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    rows = tokens.rows()
+    summary = run_summary(invocation_id)
+    return {
+        "wall_seconds": wall,
+        "stages": {stage["stage"]: stage["seconds"] for stage in summary["stages"]},
+        "tiers": {
+            name: {"calls": tier["calls"], "mean_seconds": round(tier["mean_seconds"], 4),
+                   "cost_usd": tier["cost_usd"], "models": tier["models"]}
+            for name, tier in summary["tiers"].items()
+        },
+        "llm_calls": sum(fake.calls for fake in fakes),
+        "prompt_tokens": sum(row["prompt"] for row in rows),
+        "completion_tokens": sum(row["output"] for row in rows),
+        "completed": "final_report" in (session.state if session else {}),
+    }
+
+
+def benchmark_pipeline(mode: str, repeat: int = 3, llm: dict = None, search: dict = None) -> dict:
+    """
+    Runs the whole workflow `repeat` times in `mode` against the fake model and
+    search backends, plus one extra run under tracemalloc for the peak memory
+    (kept separate because tracing allocations slows everything down).
+    """
+    llm = llm or {}
+    search = search or {}
+    runs = []
+    events_before = get_telemetry().search_stats()
+    with benchmark_config(**BENCHMARK_CONFIG), fake_search_backends(**search) as (arxiv, web):
+        for _ in range(repeat):
+            runs.append(asyncio.run(_run_once(mode, llm)))
+        tracemalloc.start()
+        try:
+            asyncio.run(_run_once(mode, llm))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        search_calls = (arxiv.calls + web.calls) // (repeat + 1)
+    # Retries, hedges and fallbacks of the search requests, over all runs
+    search_events = {
+        source: {event: count - events_before.get(source, {}).get(event, 0) for event, count in counts.items()}
+        for source, counts in get_telemetry().search_stats().items()
+    }
+
+    walls = [run["wall_seconds"] for run in runs]
+    stage_names = runs[0]["stages"]
+    return {
+        "wall_seconds": {
+            "median": round(statistics.median(walls), 4),
+            "min": round(min(walls), 4),
+            "max": round(max(walls), 4),
+        },
+        "stage_seconds": {
+            name: round(statistics.median(run["stages"].get(name, 0.0) for run in runs), 4)
+            for name in stage_names
+        },
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+        "llm_calls": runs[0]["llm_calls"],
+        # Fake token counts priced as the routed models (MODEL_PRICES)
+        "model_tiers": runs[0]["tiers"],
+        "estimated_cost_usd": round(sum(tier["cost_usd"] for tier in runs[0]["tiers"].values()), 6),
+        "search_calls": search_calls,
+        "search_events": search_events,
+        "prompt_tokens": runs[0]["prompt_tokens"],
+        "completion_tokens": runs[0]["completion_tokens"],
+        "completed": all(run["completed"] for run in runs),
+    }
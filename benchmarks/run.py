@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from scientific_research_system.agents.quality_control import QC_MODES
+from scientific_research_system.agents.research_app import EXECUTION_MODES
+from scientific_research_system.benchmarks.micro import micro_benchmarks
+from scientific_research_system.benchmarks.pipeline import benchmark_config, benchmark_pipeline
+from scientific_research_system.config import Config
+
+# Metrics compared against a baseline: (section, path to the value). Lower is better.
+PIPELINE_METRICS = (
+    ("wall_seconds", "median"),
+    ("peak_memory_mb",),
+    ("llm_calls",),
+    ("prompt_tokens",),
+)
+
+
+def _lookup(entry: dict, path: tuple):
+    for key in path:
+        if not isinstance(entry, dict) or key not in entry:
+            return None
+        entry = entry[key]
+    return entry
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists every metric that got worse than the baseline by more than `tolerance`
+    (a fraction, e.g. 0.2 = 20%).
+    """
+    regressions = []
+    checks = [
+        (f"pipeline.{mode}.{'.'.join(path)}", ("pipeline", mode, *path))
+        for mode in results.get("pipeline", {}) for path in PIPELINE_METRICS
+    ] + [
+        (f"micro.{name}.median_ms", ("micro", name, "median_ms")) for name in results.get("micro", {})
+    ]
+    for label, path in checks:
+        new, old = _lookup(results, path), _lookup(baseline, path)
+        if new is None or not old:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{label}: {old} -> {new} (+{(new / old - 1):.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks: the full workflow against fake Gemini/arXiv/web backends, "
+                    "plus micro-benchmarks of the forensics, citation and code tools."
+    )
+    parser.add_argument("--modes", nargs="+", choices=EXECUTION_MODES, default=list(EXECUTION_MODES),
+                        help="Execution modes to benchmark (default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per mode.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake model call.")
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.0,
+                        help="Extra fake model latency per generated token.")
+    parser.add_argument("--response-tokens", type=int, default=400, help="Tokens per fake model answer.")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per fake search request.")
+    parser.add_argument("--search-tokens", type=int, default=600, help="Tokens per fake search result.")
+    parser.add_argument("--search-tail-rate", type=float, default=0.0,
+                        help="Share of fake search requests that are slow (exercises hedging).")
+    parser.add_argument("--search-tail-latency", type=float, default=2.0,
+                        help="Extra seconds taken by a slow fake search request.")
+    parser.add_argument("--qc-mode", choices=QC_MODES, default=Config.QC_MODE,
+                        help="Quality control mode of the benchmarked workflow (default: QC_MODE).")
+    parser.add_argument("--skip-pipeline", action="store_true", help="Only run the micro-benchmarks.")
+    parser.add_argument("--skip-micro", action="store_true", help="Only run the pipeline benchmarks.")
+    parser.add_argument("--output", default=None,
+                        help="Results JSON path (default: benchmark_results/benchmark_<timestamp>.json).")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown versus the baseline before failing (fraction).")
+    args = parser.parse_args(argv)
+
+    llm = {
+        "latency": args.llm_latency,
+        "seconds_per_token": args.llm_seconds_per_token,
+        "response_tokens": args.response_tokens,
+    }
+    search = {
+        "latency": args.search_latency,
+        "result_tokens": args.search_tokens,
+        "tail_rate": args.search_tail_rate,
+        "tail_latency": args.search_tail_latency,
+    }
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"repeat": args.repeat, "qc_mode": args.qc_mode, "llm": llm, "search": search},
+        "pipeline": {},
+        "micro": {},
+    }
+
+    if not args.skip_pipeline:
+        for mode in args.modes:
+            with benchmark_config(QC_MODE=args.qc_mode):
+                result = benchmark_pipeline(mode, args.repeat, llm, search)
+            results["pipeline"][mode] = result
+            print(f"{mode:12s} wall {result['wall_seconds']['median']:7.2f}s  "
+                  f"peak {result['peak_memory_mb']:7.1f} MB  "
+                  f"{result['llm_calls']} LLM calls  {result['prompt_tokens']} prompt tokens  "
+                  f"~${result['estimated_cost_usd']:.4f}")
+    if not args.skip_micro:
+        results["micro"] = micro_benchmarks()
+        for name, timing in results["micro"].items():
+            print(f"{name:45s} {timing['median_ms']:10.3f} ms")
+
+    output = args.output or os.path.join(
+        "benchmark_results", f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults: {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,17 +16,185 @@ class Config:
     # Model Configuration
     MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.5-flash-lite")
     
-    # Execution Mode: 'parallel' or 'sequential'
+    # Model routing (agents/model_routing.py): tiers are fallback chains ("tier=model|fallback,...";
+    # unset tiers use MODEL_NAME) and routes send agents, stages or name patterns to a tier or a model
+    # ("writing=strong,*_narrator=fast"). MODEL_ROUTING_PATH is an optional JSON file
+    # {"tiers": {...}, "routes": {...}}; the variables override its entries.
+    MODEL_TIERS = os.getenv("MODEL_TIERS", "")
+    MODEL_ROUTES = os.getenv("MODEL_ROUTES", "")
+    MODEL_ROUTING_PATH = os.getenv("MODEL_ROUTING_PATH", "")
+    # USD per million prompt/completion tokens ("model=prompt/completion,..."), for the per-tier cost report
+    MODEL_PRICES = os.getenv(
+        "MODEL_PRICES",
+        "gemini-2.5-flash-lite=0.10/0.40,gemini-2.5-flash=0.30/2.50,gemini-2.5-pro=1.25/10.00,"
+        "gemini-2.0-flash=0.10/0.40,gemini-2.0-flash-lite=0.075/0.30",
+    )
+    
+    # Execution Mode: 'parallel', 'sequential' or 'dag' (dependency-aware scheduling)
     EXECUTION_MODE = os.getenv("EXECUTION_MODE", "sequential").lower()
+    # Maximum number of agents running at once in 'dag' mode
+    DAG_MAX_CONCURRENCY = int(os.getenv("DAG_MAX_CONCURRENCY", "4"))
+    # Topics processed concurrently by the batch CLI (batch.py)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+    
+    # Context compaction: downstream agents get the largest digest of the mining
+    # output that fits their token budget ("agent=tokens,..."); disabled = raw results
+    CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() == "true"
+    CONTEXT_BUDGETS = os.getenv("CONTEXT_BUDGETS", "knowledge_graph=4000,gap_analysis=3000,writing=6000")
     
     # Application Settings
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "5"))
 
+    # Shared rate limits (0 disables a limit). Model calls and search calls are
+    # throttled process-wide and retried on 429 after the server's retry delay
+    # (search calls by the resilience policy below when it is enabled).
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    GEMINI_RPM = float(os.getenv("GEMINI_RPM", "15"))
+    GEMINI_TPM = float(os.getenv("GEMINI_TPM", "250000"))
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+    ARXIV_RPM = float(os.getenv("ARXIV_RPM", "20"))
+    WEB_RPM = float(os.getenv("WEB_RPM", "30"))
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+    RATE_LIMIT_MAX_BACKOFF = float(os.getenv("RATE_LIMIT_MAX_BACKOFF", "60"))
+
+    # Tool Result Cache (shared SQLite file, safe across processes)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_PATH = os.getenv(
+        "CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tool_cache.sqlite"),
+    )
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+    # TTLs in seconds: arXiv listings change slowly, web results go stale faster
+    ARXIV_CACHE_TTL = int(os.getenv("ARXIV_CACHE_TTL", str(7 * 24 * 3600)))
+    WEB_CACHE_TTL = int(os.getenv("WEB_CACHE_TTL", str(24 * 3600)))
+
+    # Concurrent Search Fan-out
+    SEARCH_MAX_IN_FLIGHT = int(os.getenv("SEARCH_MAX_IN_FLIGHT", "4"))
+    SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "30"))
+    # Minimum spacing between requests issued by one arXiv client (per worker thread)
+    ARXIV_DELAY_SECONDS = float(os.getenv("ARXIV_DELAY_SECONDS", "3.0"))
+
+    # Resilience of each search request (tools/resilience.py): a deadline per query covering
+    # retries and hedges, retries with jittered exponential backoff (SEARCH_RETRY_BASE * 2^n),
+    # hedging for the sources in SEARCH_HEDGE (a duplicate request once one is slower than the
+    # source's SEARCH_HEDGE_PERCENTILE latency) and a circuit breaker that opens after
+    # CIRCUIT_FAILURE_THRESHOLD consecutive failures (0 disables it) for CIRCUIT_RESET_SECONDS.
+    # While a backend is unavailable, stale cache entries (up to CACHE_STALE_TTL past expiry)
+    # or partial results are returned.
+    SEARCH_RESILIENCE_ENABLED = os.getenv("SEARCH_RESILIENCE_ENABLED", "true").lower() == "true"
+    ARXIV_DEADLINE = float(os.getenv("ARXIV_DEADLINE", "25"))
+    WEB_DEADLINE = float(os.getenv("WEB_DEADLINE", "15"))
+    SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", "2"))
+    SEARCH_RETRY_BASE = float(os.getenv("SEARCH_RETRY_BASE", "0.5"))
+    SEARCH_HEDGE = os.getenv("SEARCH_HEDGE", "web")
+    SEARCH_HEDGE_PERCENTILE = float(os.getenv("SEARCH_HEDGE_PERCENTILE", "95"))
+    SEARCH_HEDGE_MIN_DELAY = float(os.getenv("SEARCH_HEDGE_MIN_DELAY", "0.5"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", str(7 * 24 * 3600)))
+
+    # Local BM25 index of every paper arXiv has returned (tools/paper_index.py)
+    PAPER_INDEX_ENABLED = os.getenv("PAPER_INDEX_ENABLED", "true").lower() == "true"
+    PAPER_INDEX_PATH = os.getenv(
+        "PAPER_INDEX_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "paper_index.sqlite"),
+    )
+    # Local-first mining: answer arXiv queries from the index when it has at least
+    # LOCAL_SEARCH_MIN_HITS papers matching LOCAL_SEARCH_MIN_COVERAGE of the query terms
+    ARXIV_LOCAL_FIRST = os.getenv("ARXIV_LOCAL_FIRST", "false").lower() == "true"
+    LOCAL_SEARCH_MIN_HITS = int(os.getenv("LOCAL_SEARCH_MIN_HITS", "5"))
+    LOCAL_SEARCH_MIN_COVERAGE = float(os.getenv("LOCAL_SEARCH_MIN_COVERAGE", "0.6"))
+
+    # Drop search results repeated across queries or sources: exact arXiv ID/URL matches
+    # and MinHash near duplicates (estimated Jaccard >= DEDUP_THRESHOLD) of both title and abstract
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+
+    # Quality control: 'llm' (auditor agents call the tools in a model loop), 'deterministic'
+    # (tools run directly, scores computed in Python, no model call) or 'narrated'
+    # (deterministic scores plus at most one model call per auditor to write up the findings)
+    QC_MODE = os.getenv("QC_MODE", "llm").lower()
+
+    # Local citation dump (JSONL or Parquet) backing the citation auditor
+    CITATION_DB_PATH = os.getenv("CITATION_DB_PATH", "")
+
+    # Local full-text corpus (append-only memory-mapped text + section index), see tools/corpus_store.py
+    CORPUS_DIR = os.getenv(
+        "CORPUS_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "corpus"),
+    )
+    # The only directory extract_code_blocks_from_file may read (the model picks the path)
+    CODE_FILES_ROOT = os.getenv("CODE_FILES_ROOT", CORPUS_DIR)
+
+    # Persistent knowledge graph merged from every run; gap analysis gets graph-algorithm
+    # gap candidates (disconnected clusters, bridges, structural holes) computed from it
+    KNOWLEDGE_GRAPH_PERSIST = os.getenv("KNOWLEDGE_GRAPH_PERSIST", "true").lower() == "true"
+    KNOWLEDGE_GRAPH_PATH = os.getenv(
+        "KNOWLEDGE_GRAPH_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "knowledge_graph.npz"),
+    )
+
+    # Offline dependency resolution for the reproducibility auditor:
+    # a JSON snapshot or a directory of wheel METADATA files
+    PACKAGE_INDEX_PATH = os.getenv("PACKAGE_INDEX_PATH", "")
+    TARGET_PYTHON = os.getenv("TARGET_PYTHON", "3.11")
+    RESOLVER_CACHE_TTL = int(os.getenv("RESOLVER_CACHE_TTL", str(30 * 24 * 3600)))
+
+    # Domain ontology used by the domain bridge (canonicalize_problem)
+    ONTOLOGY_PATH = os.getenv(
+        "ONTOLOGY_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools", "data", "ontology.json"),
+    )
+    # Minimum TF-IDF cosine similarity for a fuzzy ontology match
+    ONTOLOGY_FUZZY_THRESHOLD = float(os.getenv("ONTOLOGY_FUZZY_THRESHOLD", "0.35"))
+
+    # LLM Response Cache: 'off', 'cache', 'record' or 'replay' (offline playback of a recorded run)
+    LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off").lower()
+    LLM_CACHE_PATH = os.getenv(
+        "LLM_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite"),
+    )
+    # Recordings ('record'/'replay') live in their own file, out of reach of the cache's LRU eviction
+    LLM_RECORDING_PATH = os.getenv(
+        "LLM_RECORDING_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_recording.sqlite"),
+    )
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Per-stage workflow checkpoints, used to resume a run from the first incomplete stage
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+    CHECKPOINT_PATH = os.getenv(
+        "CHECKPOINT_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "checkpoints.sqlite"),
+    )
+
+    # OpenTelemetry spans/metrics for stages, agents, model and tool calls.
+    # Exporter: 'none' (in-app summary only), 'console', 'file' (JSONL at TELEMETRY_PATH) or 'otlp'
+    TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+    TELEMETRY_EXPORTER = os.getenv("TELEMETRY_EXPORTER", "none").lower()
+    TELEMETRY_PATH = os.getenv(
+        "TELEMETRY_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "telemetry.jsonl"),
+    )
+    TELEMETRY_METRIC_INTERVAL = int(os.getenv("TELEMETRY_METRIC_INTERVAL", "60"))
+
+    # Session storage: 'sqlite' (durable, survives restarts) or 'memory'
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite").lower()
+    SESSION_DB_PATH = os.getenv(
+        "SESSION_DB_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "sessions.sqlite"),
+    )
+    # Sessions kept in memory; idle ones are evicted (on the next cache access) and
+    # reloaded from SQLite on demand
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "16"))
+    SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "600"))
+
     @classmethod
     def validate(cls):
         """Validates critical configuration."""
-        if not cls.GOOGLE_API_KEY:
+        if not cls.GOOGLE_API_KEY and cls.LLM_CACHE_MODE != "replay":
             print("Warning: GOOGLE_API_KEY not found in environment variables.")
 
 # Expose variables directly for backward compatibility if needed, 
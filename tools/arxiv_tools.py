@@ -1,6 +1,169 @@
+import re
+import threading
+
+import arxiv
 from langchain_community.tools import ArxivQueryRun
 from langchain_community.utilities import ArxivAPIWrapper
 from langchain_core.tools import tool
+from scientific_research_system.config import Config
+from scientific_research_system.tools.cache import cached_tool_call
+from scientific_research_system.tools.concurrency import (
+    fan_out, format_batch, get_http_session, split_queries
+)
+from scientific_research_system.tools.dedup import Deduplicator, deduplicate_outcomes
+from scientific_research_system.tools.paper_index import get_paper_index
+from scientific_research_system.tools.resilience import BackendUnavailable, resilient_call
+from scientific_research_system.tools.telemetry import record_cache, record_search_event
+
+ARXIV_DOC_CHARS_MAX = 2000
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+_arxiv_tool = None
+_clients = threading.local()
+
+def _get_arxiv_client() -> arxiv.Client:
+    """
+    Returns this thread's arxiv.Client. Clients are per thread because they
+    track the time of their last request, but all of them share one pooled
+    HTTP session (with a default timeout) instead of opening their own.
+    Failed requests are retried by the resilience layer, not by the client.
+    """
+    client = getattr(_clients, "client", None)
+    if client is None:
+        client = arxiv.Client(
+            page_size=Config.MAX_SEARCH_RESULTS,
+            delay_seconds=Config.ARXIV_DELAY_SECONDS,
+            num_retries=0 if Config.SEARCH_RESILIENCE_ENABLED else 3
+        )
+        client._session = get_http_session()
+        _clients.client = client
+    return client
+
+def format_paper(paper_id: str, published, title: str, authors: str, summary: str) -> str:
+    """
+    One paper in the layout of ArxivAPIWrapper.run plus its arXiv ID, for both local and network results.
+    """
+    return f"Published: {published}\nTitle: {title}\nAuthors: {authors}\narXiv ID: {paper_id}\nSummary: {summary}"
+
+class PooledArxivAPIWrapper(ArxivAPIWrapper):
+    """
+    ArxivAPIWrapper that fetches through the shared arxiv clients above
+    and only asks the API for `top_k_results` entries per page. Every paper
+    it returns is added to the local paper index (PAPER_INDEX_ENABLED).
+    """
+
+    def _fetch_results(self, query: str):
+        if self.is_arxiv_identifier(query):
+            search = arxiv.Search(id_list=query.split(), max_results=self.top_k_results)
+        else:
+            search = arxiv.Search(
+                query[: self.ARXIV_MAX_QUERY_LENGTH], max_results=self.top_k_results
+            )
+        results = list(_get_arxiv_client().results(search))
+        if Config.PAPER_INDEX_ENABLED and results:
+            get_paper_index().add([
+                {
+                    "paper_id": _VERSION_SUFFIX.sub("", result.get_short_id()),
+                    "published": str(result.updated.date()),
+                    "title": result.title,
+                    "authors": ", ".join(a.name for a in result.authors),
+                    "summary": result.summary,
+                }
+                for result in results
+            ])
+        return results
+
+    def run(self, query: str) -> str:
+        """
+        Same as ArxivAPIWrapper.run, but every entry also carries its arXiv ID
+        (used to drop papers repeated across queries).
+        """
+        try:
+            results = self._fetch_results(query)
+        except self.arxiv_exceptions as ex:
+            return f"Arxiv exception: {ex}"
+        docs = [
+            format_paper(
+                _VERSION_SUFFIX.sub("", result.get_short_id()), result.updated.date(), result.title,
+                ", ".join(a.name for a in result.authors), result.summary
+            )
+            for result in results
+        ]
+        if docs:
+            return "\n\n".join(docs)[: self.doc_content_chars_max]
+        return "No good Arxiv Result was found"
+
+def _get_arxiv_tool() -> ArxivQueryRun:
+    """
+    Returns a shared ArxivQueryRun instead of building a new client per call.
+    """
+    global _arxiv_tool
+    if _arxiv_tool is None:
+        arxiv_wrapper = PooledArxivAPIWrapper(
+            top_k_results=Config.MAX_SEARCH_RESULTS,
+            doc_content_chars_max=ARXIV_DOC_CHARS_MAX
+        )
+        _arxiv_tool = ArxivQueryRun(api_wrapper=arxiv_wrapper)
+    return _arxiv_tool
+
+def _arxiv_failed(result: str) -> bool:
+    # The wrapper reports failures as strings
+    return result.startswith("Arxiv exception")
+
+def _arxiv_throttled(result: str) -> bool:
+    # The wrapper turns arxiv.HTTPError into a string; arXiv throttles with 429 or 503
+    return _arxiv_failed(result) and ("HTTP 429" in result or "HTTP 503" in result)
+
+def _local_matches(query: str) -> list[dict]:
+    return [
+        paper for paper in get_paper_index().search(query, Config.MAX_SEARCH_RESULTS)
+        if paper["coverage"] >= Config.LOCAL_SEARCH_MIN_COVERAGE
+    ]
+
+def _format_local(papers: list[dict]) -> str:
+    docs = [format_paper(p["paper_id"], p["published"], p["title"], p["authors"], p["summary"]) for p in papers]
+    return "\n\n".join(docs)[:ARXIV_DOC_CHARS_MAX]
+
+def local_arxiv_search(query: str):
+    """
+    Answers an arXiv query from the local paper index when it has enough good
+    matches: at least LOCAL_SEARCH_MIN_HITS papers containing LOCAL_SEARCH_MIN_COVERAGE
+    of the query's terms. Returns None (go to the network) otherwise.
+    """
+    matches = _local_matches(query)
+    hit = len(matches) >= min(Config.LOCAL_SEARCH_MIN_HITS, Config.MAX_SEARCH_RESULTS)
+    record_cache("paper_index", "arxiv", hit)
+    return _format_local(matches) if hit else None
+
+def arxiv_search_cached(query: str) -> str:
+    """
+    Runs one arXiv query through the tool cache (and, on a miss, the shared arXiv
+    rate limit and the arXiv retry/circuit breaker policy). With ARXIV_LOCAL_FIRST,
+    the local paper index is tried before either. While arXiv is unavailable, an
+    expired cache entry or whatever the paper index matches is returned instead.
+    """
+    if Config.ARXIV_LOCAL_FIRST and Config.PAPER_INDEX_ENABLED:
+        local = local_arxiv_search(query)
+        if local is not None:
+            return local
+    try:
+        return cached_tool_call(
+            "arxiv",
+            query,
+            lambda: resilient_call("arxiv", lambda: _get_arxiv_tool().run(query), _arxiv_failed, _arxiv_throttled),
+            ttl=Config.ARXIV_CACHE_TTL,
+            # Never cache failures
+            cacheable=lambda result: not _arxiv_failed(result),
+            top_k=Config.MAX_SEARCH_RESULTS,
+            doc_chars_max=ARXIV_DOC_CHARS_MAX,
+            layout="records"
+        )
+    except BackendUnavailable as e:
+        matches = _local_matches(query) if Config.PAPER_INDEX_ENABLED else []
+        if not matches:
+            raise
+        record_search_event("arxiv", "partial")
+        return f"[{e}; {len(matches)} papers from the local index]\n\n" + _format_local(matches)
 
 @tool
 def search_arxiv(query: str) -> str:
@@ -8,7 +171,25 @@ def search_arxiv(query: str) -> str:
     Searches arXiv for scientific papers based on the query.
     Returns abstracts and metadata of relevant papers.
     """
-    arxiv_wrapper = ArxivAPIWrapper(top_k_results=5, doc_content_chars_max=2000)
-    tool = ArxivQueryRun(api_wrapper=arxiv_wrapper)
-    return tool.run(query)
+    try:
+        return arxiv_search_cached(query)
+    except BackendUnavailable as e:
+        return f"[search failed: {e}]"
+
+def arxiv_batch_search(queries, deduplicator: Deduplicator = None) -> str:
+    """
+    Runs all queries concurrently and merges the results, without the papers
+    already returned for an earlier query (or earlier in the run, if a shared
+    `deduplicator` is given).
+    """
+    outcomes = fan_out(arxiv_search_cached, split_queries(queries))
+    report = deduplicate_outcomes(outcomes, "arxiv", deduplicator)
+    return format_batch(outcomes) + report
 
+@tool
+def search_arxiv_batch(queries: list[str]) -> str:
+    """
+    Searches arXiv for every query concurrently and returns the merged results,
+    one section per query. Papers repeated across queries are listed once.
+    """
+    return arxiv_batch_search(queries)
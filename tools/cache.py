@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from scientific_research_system.config import Config
+from scientific_research_system.tools.resilience import BackendUnavailable
+from scientific_research_system.tools.telemetry import record_cache, record_search_event
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a search query so trivially different spellings share a cache entry.
+    Lower-cases, strips surrounding quotes/whitespace and collapses inner whitespace.
+    """
+    return " ".join(str(query).strip().strip("\"'").lower().split())
+
+
+def make_cache_key(source: str, query: str, **params) -> str:
+    """
+    Builds a stable cache key from the source name, the normalized query and
+    any parameters that change the size/shape of the result (e.g. top_k).
+    """
+    payload = json.dumps([source, normalize_query(query), params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """
+    Persistent, process-safe cache for tool results backed by SQLite.
+
+    - Entries expire after a per-source TTL (seconds). Expired entries are kept
+      for another CACHE_STALE_TTL seconds, to answer while a backend is down.
+    - The store is bounded to `max_entries`; the least recently used entries
+      are evicted first.
+    - Hit/miss counters are kept per source in the same database so that every
+      process sharing the file (Streamlit workers, CLI runs) reports the same numbers.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, stale_ttl: float = None):
+        self.path = path or Config.CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else Config.CACHE_MAX_ENTRIES
+        self.stale_ttl = stale_ttl if stale_ttl is not None else Config.CACHE_STALE_TTL
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process, in case we were forked).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS counters (
+                source TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                evictions INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def _bump(self, conn: sqlite3.Connection, source: str, column: str, amount: int = 1):
+        conn.execute("INSERT OR IGNORE INTO counters(source) VALUES (?)", (source,))
+        conn.execute(f"UPDATE counters SET {column} = {column} + ? WHERE source = ?", (amount, source))
+
+    def get(self, source: str, key: str):
+        """
+        Returns the cached value or None if missing/expired.
+        Updates the LRU timestamp and the hit/miss counters.
+        """
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < now:
+            if row is not None and row[1] + self.stale_ttl < now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._bump(conn, source, "misses")
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self._bump(conn, source, "hits")
+        return json.loads(row[0])
+
+    def get_stale(self, key: str):
+        """
+        Returns the stored value even if it has expired (but is within CACHE_STALE_TTL),
+        or None. Used when the source cannot be reached; counters are not touched.
+        """
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] + self.stale_ttl < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, source: str, key: str, value, ttl: float):
+        """
+        Stores a JSON-serializable value for `ttl` seconds and enforces the size bound.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries(key, source, value, created_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, source, json.dumps(value), now, now + ttl, now),
+        )
+        self._evict(conn, source)
+
+    def _evict(self, conn: sqlite3.Connection, source: str):
+        conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time() - self.stale_ttl,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._bump(conn, source, "evictions", overflow)
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss/eviction counters and live entry counts per source.
+        """
+        conn = self._connect()
+        result = {}
+        for source, hits, misses, evictions in conn.execute(
+            "SELECT source, hits, misses, evictions FROM counters"
+        ):
+            total = hits + misses
+            result[source] = {
+                "hits": hits,
+                "misses": misses,
+                "evictions": evictions,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "entries": 0,
+            }
+        for source, count in conn.execute("SELECT source, COUNT(*) FROM entries GROUP BY source"):
+            result.setdefault(source, {"hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0})
+            result[source]["entries"] = count
+        return result
+
+    def clear(self, source: str = None):
+        """
+        Removes all entries (or only those of one source) and resets counters.
+        """
+        conn = self._connect()
+        if source:
+            conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+            conn.execute("DELETE FROM counters WHERE source = ?", (source,))
+        else:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """
+    Returns the process-wide ToolCache (created lazily from Config).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ToolCache()
+    return _cache
+
+
+def cached_tool_call(source: str, query: str, fetch, ttl: float, cacheable=None, **params):
+    """
+    Returns the cached result for (source, query, params) or calls `fetch()`
+    and stores its result. Caching is skipped entirely when CACHE_ENABLED is off.
+    `cacheable(result)` can reject results that must not be stored (e.g. error strings).
+    If `fetch()` finds the backend unavailable, an expired entry is returned instead, if any.
+    """
+    if not Config.CACHE_ENABLED:
+        return fetch()
+
+    cache = get_tool_cache()
+    key = make_cache_key(source, query, **params)
+    cached = cache.get(source, key)
+    record_cache("tool", source, hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    try:
+        result = fetch()
+    except BackendUnavailable:
+        stale = cache.get_stale(key)
+        if stale is None:
+            raise
+        record_search_event(source, "stale")
+        return stale
+    if result is not None and (cacheable is None or cacheable(result)):
+        cache.set(source, key, result, ttl)
+    return result
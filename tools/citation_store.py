@@ -0,0 +1,325 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from scientific_research_system.config import Config
+
+NAT = np.datetime64("NaT", "D")
+
+
+def _to_date(value) -> np.datetime64:
+    """
+    Parses a YYYY-MM-DD (or YYYY / YYYY-MM) string into datetime64[D]; NaT if missing.
+    """
+    if value is None or value == "":
+        return NAT
+    return np.datetime64(str(value)[:10], "D")
+
+
+class CitationStore:
+    """
+    Columnar citation graph for corpus-scale temporal audits.
+
+    Papers are interned to integer indices. Publication dates live in one
+    datetime64[D] array, and references are stored in CSR form (`indptr`, `indices`).
+    Edges point from the citing paper to the cited paper. Updates after the
+    initial build go to a small overlay of replaced reference lists, so only
+    the edges that changed are re-checked. `compact()` folds the overlay back into CSR.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.titles: list[str] = []
+        self._index: dict[str, int] = {}
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+        self._overrides: dict[int, np.ndarray] = {}
+        self._reverse = None
+        self._anomalies = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ build
+
+    @classmethod
+    def from_records(cls, records) -> "CitationStore":
+        """
+        Builds a store from dicts with `paper_id`, `publication_date`, optional
+        `title`, and `references` (a list of paper IDs or of dicts of the same shape).
+        """
+        store = cls()
+        dates = []
+        titles = []
+        refs_per_paper: dict[int, list[int]] = {}
+
+        def intern(paper_id, date=None, title=None):
+            idx = store._index.get(paper_id)
+            if idx is None:
+                idx = len(store.ids)
+                store._index[paper_id] = idx
+                store.ids.append(paper_id)
+                dates.append(None)
+                titles.append("")
+            if date and dates[idx] is None:
+                dates[idx] = date
+            if title and not titles[idx]:
+                titles[idx] = title
+            return idx
+
+        for record in records:
+            src = intern(str(record["paper_id"]), record.get("publication_date"), record.get("title"))
+            targets = refs_per_paper.setdefault(src, [])
+            for ref in record.get("references") or []:
+                if isinstance(ref, dict):
+                    targets.append(intern(str(ref["paper_id"]), ref.get("publication_date"), ref.get("title")))
+                else:
+                    targets.append(intern(str(ref)))
+
+        n = len(store.ids)
+        store.titles = titles
+        store.dates = np.array([_to_date(d) for d in dates], dtype="datetime64[D]")
+        counts = np.zeros(n, dtype=np.int64)
+        for src, targets in refs_per_paper.items():
+            counts[src] = len(targets)
+        store.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        store.indices = np.empty(store.indptr[-1], dtype=np.int64)
+        for src, targets in refs_per_paper.items():
+            store.indices[store.indptr[src]:store.indptr[src + 1]] = targets
+        return store
+
+    @classmethod
+    def load(cls, path: str) -> "CitationStore":
+        """
+        Loads a JSONL dump (one paper per line) or a Parquet file with the columns
+        paper_id, publication_date, title and references.
+        """
+        if path.endswith(".parquet"):
+            try:
+                import pandas as pd
+            except ImportError:
+                raise ImportError("Loading Parquet citation dumps requires pandas and pyarrow.")
+            frame = pd.read_parquet(path)
+            records = frame.to_dict(orient="records")
+            for record in records:
+                refs = record.get("references")
+                record["references"] = list(refs) if refs is not None else []
+                date = record.get("publication_date")
+                record["publication_date"] = None if date is None else str(date)[:10]
+            return cls.from_records(records)
+
+        def read_lines():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+        return cls.from_records(read_lines())
+
+    # ---------------------------------------------------------------- queries
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, paper_id):
+        return paper_id in self._index
+
+    def references_of(self, idx: int) -> np.ndarray:
+        """
+        Indices of the papers cited by paper `idx` (overlay first, then CSR).
+        """
+        if idx in self._overrides:
+            return self._overrides[idx]
+        if idx + 1 >= len(self.indptr):
+            return np.empty(0, dtype=np.int64)
+        return self.indices[self.indptr[idx]:self.indptr[idx + 1]]
+
+    def paper(self, idx: int) -> dict:
+        date = self.dates[idx]
+        return {
+            "title": self.titles[idx],
+            "paper_id": self.ids[idx],
+            "publication_date": None if np.isnat(date) else str(date),
+        }
+
+    def citations(self, paper_id: str) -> list[dict]:
+        """
+        Citation metadata (title, paper_id, publication_date) for one paper.
+        """
+        idx = self._index.get(paper_id)
+        if idx is None:
+            return []
+        return [self.paper(int(j)) for j in self.references_of(idx)]
+
+    def _edges(self):
+        """
+        All current edges as (src, dst) arrays, with overlay edges replacing the CSR rows they override.
+        """
+        n_base = len(self.indptr) - 1
+        src = np.repeat(np.arange(n_base, dtype=np.int64), np.diff(self.indptr))
+        dst = self.indices
+        if self._overrides:
+            keep = ~np.isin(src, np.fromiter(self._overrides, dtype=np.int64))
+            extra_src = [np.full(len(v), k, dtype=np.int64) for k, v in self._overrides.items()]
+            src = np.concatenate([src[keep]] + extra_src)
+            dst = np.concatenate([dst[keep]] + list(self._overrides.values()))
+        return src, dst
+
+    def _time_travel_mask(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        citing = self.dates[src]
+        cited = self.dates[dst]
+        return (cited > citing) & ~np.isnat(citing) & ~np.isnat(cited)
+
+    def audit(self, paper_ids: list[str] = None) -> dict:
+        """
+        Flags every time-travelling edge (cited paper published after the citing paper)
+        across the whole graph in one vectorized pass, optionally restricted to
+        the references of `paper_ids`.
+        """
+        with self._lock:
+            src, dst = self._edges()
+            bad = self._time_travel_mask(src, dst)
+            if self._anomalies is None:
+                self._anomalies = set(zip(src[bad].tolist(), dst[bad].tolist()))
+            if paper_ids is not None:
+                wanted = np.array([self._index[p] for p in paper_ids if p in self._index], dtype=np.int64)
+                scope = np.isin(src, wanted)
+                src, dst, bad = src[scope], dst[scope], bad[scope]
+            return self._report(src, dst, bad)
+
+    def _report(self, src, dst, bad) -> dict:
+        undated = np.isnat(self.dates[src]) | np.isnat(self.dates[dst])
+        return {
+            "papers": len(self.ids),
+            "edges_checked": int(len(src)),
+            "undated_edges": int(undated.sum()),
+            "anomalies": int(bad.sum()),
+            "src": src[bad],
+            "dst": dst[bad],
+        }
+
+    def anomalies(self) -> list[tuple[str, str]]:
+        """
+        Current (citing_id, cited_id) anomalies, kept up to date by `update_paper`.
+        """
+        with self._lock:
+            if self._anomalies is None:
+                self.audit()
+            return sorted((self.ids[s], self.ids[d]) for s, d in self._anomalies)
+
+    # ---------------------------------------------------------------- updates
+
+    def _intern(self, paper_id: str, date=None, title: str = None) -> int:
+        idx = self._index.get(paper_id)
+        if idx is None:
+            idx = len(self.ids)
+            self._index[paper_id] = idx
+            self.ids.append(paper_id)
+            self.titles.append(title or "")
+            self.dates = np.append(self.dates, _to_date(date))
+            self._reverse = None
+        return idx
+
+    def _incoming(self, idx: int) -> np.ndarray:
+        """
+        Indices of papers citing `idx` (reverse CSR built lazily, plus the overlay).
+        """
+        if self._reverse is None:
+            n_base = len(self.indptr) - 1
+            src = np.repeat(np.arange(n_base, dtype=np.int64), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            rev_indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=len(self.ids)), out=rev_indptr[1:])
+            self._reverse = (rev_indptr, src[order])
+        rev_indptr, rev_src = self._reverse
+        citing = rev_src[rev_indptr[idx]:rev_indptr[idx + 1]] if idx + 1 < len(rev_indptr) else rev_src[:0]
+        if self._overrides:
+            overridden = np.fromiter(self._overrides, dtype=np.int64)
+            citing = citing[~np.isin(citing, overridden)]
+            extra = [k for k, v in self._overrides.items() if np.any(v == idx)]
+            citing = np.concatenate([citing, np.array(extra, dtype=np.int64)])
+        return citing
+
+    def update_paper(self, paper_id: str, publication_date: str = None, references: list = None,
+                     title: str = None) -> list[tuple[str, str]]:
+        """
+        Adds or updates one paper and re-checks only the affected edges: its own
+        references, plus the papers citing it when its date changes.
+        Returns the anomalies found among the re-checked edges.
+        """
+        with self._lock:
+            if self._anomalies is None:
+                self.audit()
+            idx = self._intern(paper_id, publication_date, title)
+            if title:
+                self.titles[idx] = title
+
+            touched_src = []
+            touched_dst = []
+            if publication_date is not None:
+                self.dates[idx] = _to_date(publication_date)
+                citing = self._incoming(idx)
+                touched_src.append(citing)
+                touched_dst.append(np.full(len(citing), idx, dtype=np.int64))
+
+            if references is not None:
+                # Drop the previous outgoing edges of this paper from the anomaly set
+                for dst in self.references_of(idx).tolist():
+                    self._anomalies.discard((idx, dst))
+                targets = []
+                for ref in references:
+                    if isinstance(ref, dict):
+                        targets.append(self._intern(str(ref["paper_id"]), ref.get("publication_date"), ref.get("title")))
+                    else:
+                        targets.append(self._intern(str(ref)))
+                self._overrides[idx] = np.array(targets, dtype=np.int64)
+            if references is not None or publication_date is not None:
+                outgoing = self.references_of(idx)
+                touched_src.append(np.full(len(outgoing), idx, dtype=np.int64))
+                touched_dst.append(outgoing)
+
+            if not touched_src:
+                return []
+            src = np.concatenate(touched_src)
+            dst = np.concatenate(touched_dst)
+            bad = self._time_travel_mask(src, dst)
+            for s, d, is_bad in zip(src.tolist(), dst.tolist(), bad.tolist()):
+                if is_bad:
+                    self._anomalies.add((s, d))
+                else:
+                    self._anomalies.discard((s, d))
+            return [(self.ids[s], self.ids[d]) for s, d in zip(src[bad].tolist(), dst[bad].tolist())]
+
+    def compact(self):
+        """
+        Folds the update overlay back into contiguous CSR arrays.
+        """
+        with self._lock:
+            src, dst = self._edges()
+            order = np.argsort(src, kind="stable")
+            counts = np.bincount(src, minlength=len(self.ids))
+            self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            self.indices = dst[order]
+            self._overrides = {}
+            self._reverse = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_citation_store():
+    """
+    Returns the store loaded from Config.CITATION_DB_PATH, or None when no dump is configured.
+    """
+    global _store
+    path = Config.CITATION_DB_PATH
+    if not path or not os.path.exists(path):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CitationStore.load(path)
+    return _store
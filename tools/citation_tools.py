@@ -1,11 +1,20 @@
-import datetime
+import numpy as np
 from google.adk.tools.function_tool import FunctionTool
+from scientific_research_system.tools.citation_store import get_citation_store
+
+# Cap on flagged edges listed in a graph audit response (counts are always exact)
+MAX_REPORTED_ANOMALIES = 50
 
 def fetch_citation_metadata(paper_id: str):
     """
-    Mocks fetching citation metadata for a given paper ID.
+    Fetches citation metadata for a given paper ID from the local citation store
+    (CITATION_DB_PATH). Falls back to mock data when no store is configured.
     Returns a list of citations with publication dates.
     """
+    store = get_citation_store()
+    if store is not None:
+        return store.citations(paper_id)
+
     # Mock data: Simulating a paper published in 2023
     # We include some citations that are "from the future" (time travel paradox)
     
@@ -23,21 +32,42 @@ def detect_temporal_anomaly(paper_date_str: str, citations: list[dict]):
     Detects citations that were published after the source paper.
     paper_date_str format: YYYY-MM-DD
     """
-    anomalies = []
     try:
-        paper_date = datetime.datetime.strptime(paper_date_str, "%Y-%m-%d").date()
-        
-        for cit in citations:
-            cit_date_str = cit.get("publication_date")
-            if cit_date_str:
-                cit_date = datetime.datetime.strptime(cit_date_str, "%Y-%m-%d").date()
-                if cit_date > paper_date:
-                    anomalies.append(cit)
-                    
+        paper_date = np.datetime64(paper_date_str, "D")
+        # Parse all citation dates at once; citations without a date are never flagged
+        cit_dates = np.array(
+            [cit.get("publication_date") or "NaT" for cit in citations], dtype="datetime64[D]"
+        )
     except ValueError as e:
         return [f"Error parsing dates: {e}"]
-        
-    return anomalies
+
+    flagged = np.flatnonzero(cit_dates > paper_date)
+    return [citations[i] for i in flagged]
+
+def audit_citation_graph(paper_ids: list[str] = None):
+    """
+    Audits the whole local citation graph (or only the reference lists of `paper_ids`)
+    for time-travelling citations, i.e. references published after the citing paper.
+    Returns counts and a sample of flagged (citing, cited) pairs.
+    """
+    store = get_citation_store()
+    if store is None:
+        return {"error": "No citation store configured (set CITATION_DB_PATH)."}
+
+    report = store.audit(paper_ids)
+    flagged = [
+        {"citing": store.paper(int(s)), "cited": store.paper(int(d))}
+        for s, d in zip(report["src"][:MAX_REPORTED_ANOMALIES], report["dst"][:MAX_REPORTED_ANOMALIES])
+    ]
+    checked = report["edges_checked"] - report["undated_edges"]
+    return {
+        "papers": report["papers"],
+        "edges_checked": report["edges_checked"],
+        "undated_edges": report["undated_edges"],
+        "anomalies": report["anomalies"],
+        "integrity_score": round(100 * (1 - report["anomalies"] / checked), 2) if checked else 100.0,
+        "flagged_citations": flagged
+    }
 
 # ADK Tool Wrappers
 # Note: FunctionTool in this ADK version infers name/description from the function itself (docstring/name).
@@ -49,3 +79,6 @@ detect_anomaly_tool = FunctionTool(
     func=detect_temporal_anomaly
 )
 
+audit_graph_tool = FunctionTool(
+    func=audit_citation_graph
+)
@@ -1,29 +1,223 @@
+import mmap
+import os
 import re
+from typing import NamedTuple, Optional
 from google.adk.tools.function_tool import FunctionTool
+from scientific_research_system.config import Config
+from scientific_research_system.tools.dependency_resolver import requirement_name, resolve_requirements
+
+# Opening fence: up to 3 spaces, then ``` or ~~~ (3+) and an optional info string.
+# Backtick fences may not contain backticks in their info string (CommonMark).
+_FENCE_OPEN = re.compile(r"^ {0,3}(?P<fence>`{3,}(?=[^`]*$)|~{3,})(?P<info>.*)$")
+_FENCE_CLOSE = re.compile(r"^ {0,3}(?P<fence>`{3,}|~{3,})[ \t]*$")
+# A fence opened and closed on one line: ```python z = 3```
+_FENCE_INLINE = re.compile(r"^ {0,3}(?P<fence>`{3,})(?P<body>[^`]+)(?P=fence)[ \t]*$")
+# Leading words of a one-line fence taken as its language tag rather than code
+_INLINE_LANGUAGES = {
+    "python", "python3", "py", "r", "julia", "matlab", "bash", "sh", "shell",
+    "c", "cpp", "c++", "java", "javascript", "js", "sql", "text",
+}
+_INDENTED = re.compile(r"^(?: {4}|\t)")
+# Only lines starting with one of these can open, close or continue a block;
+# prose lines are rejected with a cheap startswith() before any regex runs
+_MARKER_CHARS = (" ", "\t", "`", "~")
+# One line of a bytes-like buffer (regexes scan memoryviews without copying them)
+_BUFFER_LINE = re.compile(rb"[^\n]*\n|[^\n]+")
+
+class CodeBlock(NamedTuple):
+    """
+    A code block found in a document. Offsets are character offsets for str and
+    text-mode files, and byte offsets for bytes, mmap, memoryview and binary files.
+    """
+    start: int
+    end: int
+    language: Optional[str]
+    code: str
+    kind: str  # "fenced" or "indented"
+
+def _iter_lines(source):
+    """
+    Yields (offset, line) pairs without materializing a second copy of the text.
+    Accepts str, bytes/bytearray/mmap, memoryview slices (e.g. of the corpus
+    store's mmap) or any (text or binary) file object.
+    """
+    if isinstance(source, str):
+        pos, size = 0, len(source)
+        while pos < size:
+            end = source.find("\n", pos)
+            end = size if end == -1 else end + 1
+            yield pos, source[pos:end]
+            pos = end
+    elif isinstance(source, (bytes, bytearray, mmap.mmap)):
+        pos, size = 0, len(source)
+        while pos < size:
+            end = source.find(b"\n", pos)
+            end = size if end == -1 else end + 1
+            yield pos, source[pos:end].decode("utf-8", errors="replace")
+            pos = end
+    elif isinstance(source, memoryview):
+        for match in _BUFFER_LINE.finditer(source):
+            yield match.start(), match.group().decode("utf-8", errors="replace")
+    else:
+        pos = 0
+        for line in source:
+            if isinstance(line, bytes):
+                yield pos, line.decode("utf-8", errors="replace")
+            else:
+                yield pos, line
+            pos += len(line)
+
+def _language(info: str) -> Optional[str]:
+    """
+    Normalizes a fence info string ("python title=x", "{.r}", "C++") to a language tag.
+    """
+    info = info.strip()
+    if not info:
+        return None
+    return info.split()[0].strip("{}.").lower() or None
+
+def iter_code_blocks(source, include_indented: bool = True):
+    """
+    Streams code blocks out of a document, one line at a time.
+    Recognises ``` and ~~~ fences with any language tag and (optionally)
+    indented blocks. Yields CodeBlock tuples so callers can stop early.
+    Unclosed fences run to the end of the document.
+    """
+    fence = None          # (fence char, fence length) of the open fenced block
+    block_start = 0
+    language = None
+    lines = []
+    indented = None       # lines of the open indented block
+    indented_end = 0
+    pending_blank = []
+    prev_blank = True
+
+    for offset, raw in _iter_lines(source):
+        line = raw.rstrip("\r\n")
+
+        if fence is not None:
+            close = line.startswith(_MARKER_CHARS) and _FENCE_CLOSE.match(line)
+            if close and close.group("fence")[0] == fence[0] and len(close.group("fence")) >= fence[1]:
+                yield CodeBlock(block_start, offset + len(raw), language, "\n".join(lines), "fenced")
+                fence = None
+                prev_blank = True
+            else:
+                lines.append(line)
+            continue
+
+        if not line.startswith(_MARKER_CHARS) and indented is None:
+            prev_blank = not line
+            continue
+
+        blank = not line.strip()
+        if indented is not None:
+            if blank:
+                pending_blank.append("")
+                continue
+            if _INDENTED.match(line):
+                indented.extend(pending_blank)
+                pending_blank = []
+                indented.append(line[1:] if line.startswith("\t") else line[4:])
+                indented_end = offset + len(raw)
+                continue
+            yield CodeBlock(block_start, indented_end, None, "\n".join(indented), "indented")
+            indented = None
+            pending_blank = []
+            prev_blank = False
+
+        inline = line.startswith(_MARKER_CHARS) and _FENCE_INLINE.match(line)
+        if inline:
+            language, _, code = inline.group("body").strip().partition(" ")
+            if language.lower() not in _INLINE_LANGUAGES or not code.strip():
+                language, code = None, inline.group("body")
+            yield CodeBlock(offset, offset + len(raw), _language(language or ""), code.strip(), "fenced")
+            prev_blank = True
+            continue
+
+        opening = _FENCE_OPEN.match(line)
+        if opening:
+            marker = opening.group("fence")
+            fence = (marker[0], len(marker))
+            language = _language(opening.group("info"))
+            block_start = offset
+            lines = []
+            continue
+
+        if include_indented and prev_blank and not blank and _INDENTED.match(line):
+            indented = [line[1:] if line.startswith("\t") else line[4:]]
+            block_start = offset
+            indented_end = offset + len(raw)
+            continue
+
+        prev_blank = blank
+
+    if fence is not None:
+        yield CodeBlock(block_start, offset + len(raw), language, "\n".join(lines), "fenced")
+    elif indented is not None:
+        yield CodeBlock(block_start, indented_end, None, "\n".join(indented), "indented")
 
 def extract_code_blocks(text: str):
     """
-    Extracts Python code blocks from text using Regex.
-    Looks for markdown style code blocks ```python ... ``` or just ``` ... ```.
+    Extracts code blocks from text.
+    Looks for markdown style fenced blocks (``` or ~~~, any language tag) and indented blocks.
     """
-    # Regex for code blocks
-    # Matches ```python code ``` or ``` code ```
-    pattern = r"```(?:python)?(.*?)```"
-    matches = re.findall(pattern, text, re.DOTALL)
-    return [m.strip() for m in matches]
+    return [block.code.strip() for block in iter_code_blocks(text)]
 
-def validate_python_env(dependencies: list[str]):
+def _allowed_path(path: str) -> Optional[str]:
     """
-    Mocks validation of Python dependencies.
-    Returns True if dependencies are compatible, False otherwise.
+    Resolves `path` (relative paths against CODE_FILES_ROOT) and returns it only
+    if it lies inside CODE_FILES_ROOT, so the model cannot read arbitrary files.
     """
-    # Simple mock logic: Fail if conflicting libraries are present
-    deps_str = " ".join(dependencies).lower()
-    
-    if "tensorflow" in deps_str and "pytorch" in deps_str:
+    root = os.path.realpath(Config.CODE_FILES_ROOT)
+    resolved = os.path.realpath(os.path.join(root, path))
+    return resolved if os.path.commonpath([root, resolved]) == root else None
+
+def extract_code_blocks_from_file(path: str, max_blocks: int = 50, language: str = None):
+    """
+    Extracts code blocks from a (possibly very large) text file without loading it into memory.
+    The file must be inside CODE_FILES_ROOT (relative paths are resolved against it).
+    Optionally keeps only blocks tagged with `language`. Stops after `max_blocks` blocks.
+    Returns dicts with byte offsets, language, kind and code.
+    """
+    resolved = _allowed_path(path)
+    if resolved is None:
+        return {"error": f"Path '{path}' is outside the allowed directory ({Config.CODE_FILES_ROOT})."}
+    if not os.path.isfile(resolved):
+        return {"error": f"File '{path}' not found."}
+    results = []
+    with open(resolved, "rb") as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped
+            return results
+        with source:
+            for block in iter_code_blocks(source):
+                if language and block.language != language.lower():
+                    continue
+                results.append(block._asdict())
+                if len(results) >= max_blocks:
+                    break
+    return results
+
+def validate_python_env(dependencies: list[str], python_version: str = None):
+    """
+    Validates Python dependencies (PEP 508 specifiers, e.g. "torch>=2.0", "numpy<2; python_version<'3.12'")
+    by resolving them offline against the local package index (PACKAGE_INDEX_PATH).
+    Returns the resolved versions, or a conflict report naming the clashing constraints.
+    Without an index, only specifier syntax and well-known conflicts are checked.
+    """
+    resolution = resolve_requirements(dependencies, python_version)
+    if resolution is not None:
+        return resolution
+
+    # No local index: fall back to known framework clashes
+    names = {requirement_name(dep) for dep in dependencies}
+
+    if "tensorflow" in names and "torch" in names:
         return {"valid": False, "error": "Potential conflict: TensorFlow and PyTorch in same environment."}
     
-    if "numpy" in deps_str and "pandas" in deps_str:
+    if "numpy" in names and "pandas" in names:
         return {"valid": True, "message": "Standard data stack detected."}
         
     return {"valid": True, "message": "Dependencies appear compatible."}
@@ -33,6 +227,10 @@ extract_code_tool = FunctionTool(
     func=extract_code_blocks
 )
 
+extract_code_file_tool = FunctionTool(
+    func=extract_code_blocks_from_file
+)
+
 validate_env_tool = FunctionTool(
     func=validate_python_env
 )
@@ -0,0 +1,132 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scientific_research_system.config import Config
+
+_executor = None
+_attempt_executor = None
+_session = None
+_lock = threading.Lock()
+
+
+class TimeoutSession(requests.Session):
+    """
+    requests.Session that applies a default timeout to every request.
+    Third-party clients (e.g. arxiv.Client) never pass one themselves.
+    """
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared, bounded thread pool used to fan out search requests.
+    Its size is the global max-in-flight limit for search calls.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.SEARCH_MAX_IN_FLIGHT,
+                    thread_name_prefix="search"
+                )
+    return _executor
+
+
+def get_attempt_executor() -> ThreadPoolExecutor:
+    """
+    Returns the pool that runs individual search requests for tools/resilience.py.
+    It is separate from the fan-out pool (whose workers wait on these requests) and
+    has room for a hedge per request plus requests abandoned at their deadline.
+    """
+    global _attempt_executor
+    if _attempt_executor is None:
+        with _lock:
+            if _attempt_executor is None:
+                _attempt_executor = ThreadPoolExecutor(
+                    max_workers=Config.SEARCH_MAX_IN_FLIGHT * 3,
+                    thread_name_prefix="search-attempt"
+                )
+    return _attempt_executor
+
+
+def get_http_session() -> requests.Session:
+    """
+    Returns a process-wide HTTP session with a connection pool sized to the
+    max-in-flight limit, so concurrent requests reuse keep-alive connections.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = TimeoutSession(timeout=Config.SEARCH_TIMEOUT)
+                adapter = HTTPAdapter(
+                    pool_connections=Config.SEARCH_MAX_IN_FLIGHT,
+                    pool_maxsize=Config.SEARCH_MAX_IN_FLIGHT
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def split_queries(queries) -> list[str]:
+    """
+    Accepts a list of queries or the comma-separated string emitted by
+    query_formulation and returns unique, non-empty queries in order.
+    """
+    if isinstance(queries, str):
+        queries = queries.split(",")
+    seen = set()
+    result = []
+    for q in queries:
+        q = str(q).strip().strip("\"'").strip()
+        if q and q.lower() not in seen:
+            seen.add(q.lower())
+            result.append(q)
+    return result
+
+
+def fan_out(fn, queries: list[str], timeout: float = None) -> list[dict]:
+    """
+    Runs fn(query) for every query on the shared pool and waits for all of them
+    (up to `timeout` seconds overall). Returns one dict per query, in input order,
+    with either a `result` or an `error`.
+    """
+    timeout = timeout if timeout is not None else Config.SEARCH_TIMEOUT
+    futures = [get_executor().submit(fn, q) for q in queries]
+    wait(futures, timeout=timeout)
+
+    outcomes = []
+    for query, future in zip(queries, futures):
+        if not future.done():
+            future.cancel()
+            outcomes.append({"query": query, "error": f"timed out after {timeout}s"})
+        elif future.exception() is not None:
+            outcomes.append({"query": query, "error": str(future.exception())})
+        else:
+            outcomes.append({"query": query, "result": future.result()})
+    return outcomes
+
+
+def format_batch(outcomes: list[dict]) -> str:
+    """
+    Merges per-query outcomes into a single tool response.
+    """
+    sections = []
+    for outcome in outcomes:
+        body = outcome.get("result")
+        if body is None:
+            body = f"[search failed: {outcome['error']}]"
+        sections.append(f"### Query: {outcome['query']}\n{body}")
+    return "\n\n".join(sections)
@@ -0,0 +1,270 @@
+import json
+import math
+import re
+from collections import Counter
+
+# Rough characters-per-token ratio, shared with the model rate limiter
+CHARS_PER_TOKEN = 4
+
+# Digest granularities, largest first. "raw" is the sources verbatim, "full" drops
+# repeated sentences, "brief" keeps the header (title, ID, ...) and a cut lead
+# sentence of every paragraph/item, and "summary" and "detailed" add the
+# highest-scoring other sentences to the full leads up to a share of "full".
+# Every level contains the levels below it, so no level drops a paper.
+DIGEST_LEVELS = ("raw", "full", "detailed", "summary", "brief")
+LEVEL_RATIOS = {"summary": 0.25, "detailed": 0.5}
+BRIEF_SENTENCE_CHARS = 200
+# Author lists longer than this are cut to "first authors et al." below "full"
+MAX_HEADER_AUTHORS = 3
+
+# Sentences sharing this share of their word shingles with a kept one are repeats
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+# Metadata lines of a search record ("Title: ...", "arXiv ID: ...") that form its header
+_HEADER_FIELD = re.compile(
+    r"^(?:(?:[-*•]|\d+[.)])\s+)?(?:Published|Updated|Title|Authors?|arXiv ID|Link|URL|DOI|Venue|Journal|Source):",
+    re.IGNORECASE,
+)
+_AUTHORS = re.compile(r"^((?:(?:[-*•]|\d+[.)])\s+)?Authors?:\s*)(.*)$", re.IGNORECASE)
+# Paper identifiers that must survive when a lead sentence is cut
+_IDENTIFIER = re.compile(
+    r"\barXiv(?: ID)?:?\s*(?:[a-z\-]+/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?|\b(?:doi:\s*)?10\.\d{4,9}/\S+|https?://\S+",
+    re.IGNORECASE,
+)
+_ITEM_START = re.compile(r"^\s*(?:[-*•]|\d+[.)]|#+)\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their "
+    "this to was were which with we our these those using used can also than such".split()
+)
+
+
+def estimate_text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1 if text else 0
+
+
+def _as_text(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def split_units(text: str) -> list[tuple[list[str], list[str]]]:
+    """
+    Splits text into units (paragraphs, list items, headings, search records).
+    Each unit is (header lines, sentences): the header is the leading metadata
+    lines of a search record (title, authors, arXiv ID, link), empty otherwise.
+    """
+    units = []
+    for block in re.split(r"\n\s*\n", text):
+        current = []
+        for line in block.splitlines():
+            if not line.strip():
+                continue
+            # Every list item or heading starts a unit of its own, except the
+            # metadata fields of a record written as a list
+            in_header = _HEADER_FIELD.match(line) and all(_HEADER_FIELD.match(l) for l in current)
+            if _ITEM_START.match(line) and current and not in_header:
+                units.append(current)
+                current = []
+            current.append(line.strip())
+        if current:
+            units.append(current)
+    split = []
+    for lines in units:
+        header = 0
+        while header < len(lines) and _HEADER_FIELD.match(lines[header]):
+            header += 1
+        sentences = [s.strip() for s in _SENTENCE_END.split(" ".join(lines[header:])) if s.strip()]
+        split.append((lines[:header], sentences))
+    return split
+
+
+def _compact_header(lines: list[str]) -> str:
+    """
+    Header lines on one line, with long author lists cut to the first authors.
+    """
+    compact = []
+    for line in lines:
+        authors = _AUTHORS.match(line)
+        if authors:
+            names = [n.strip() for n in authors.group(2).split(",") if n.strip()]
+            if len(names) > MAX_HEADER_AUTHORS:
+                line = f"{authors.group(1)}{', '.join(names[:MAX_HEADER_AUTHORS])} et al."
+        compact.append(line)
+    return " ".join(compact)
+
+
+def _cut(text: str, limit: int) -> str:
+    """
+    `text` cut to about `limit` characters; identifiers in the cut part are kept.
+    """
+    if len(text) <= limit:
+        return text
+    kept = text[:limit].rstrip()
+    lost = [m.group(0) for m in _IDENTIFIER.finditer(text) if m.end() > len(kept)]
+    return kept + "..." + (f" ({'; '.join(lost)})" if lost else "")
+
+
+def _shingles(words: list[str]) -> frozenset:
+    if len(words) < 3:
+        return frozenset(words)
+    return frozenset(zip(words, words[1:], words[2:]))
+
+
+class _Sentence:
+    """
+    A sentence, or the header of a unit (position -1, `text` verbatim and
+    `compact` with the author list cut). Position 0 is the unit's lead.
+    """
+    __slots__ = ("source", "unit", "position", "text", "compact", "words", "tokens", "score")
+
+    def __init__(self, source, unit, position, text, words, compact=None):
+        self.source = source
+        self.unit = unit
+        self.position = position
+        self.text = text
+        self.compact = compact or text
+        self.words = words
+        self.tokens = estimate_text_tokens(self.compact)
+        self.score = 0.0
+
+
+def _deduplicated(sources: dict[str, str]) -> list[_Sentence]:
+    """
+    Sentences of all sources in order, without exact or near-duplicate repeats
+    (also across sources, e.g. a web summary restating an arXiv abstract).
+    """
+    kept = []
+    seen_exact = set()
+    kept_shingles = []
+    # Inverted index shingle -> kept sentences, so each sentence is only
+    # compared with the kept sentences it shares a shingle with
+    index = {}
+    for source, text in sources.items():
+        for unit_id, (header, unit) in enumerate(split_units(text)):
+            header_text = " ".join(header)
+            if header and header_text not in seen_exact:
+                seen_exact.add(header_text)
+                kept.append(_Sentence(source, unit_id, -1, header_text, _WORD.findall(header_text.lower()),
+                                      _compact_header(header)))
+            for position, sentence in enumerate(unit):
+                words = _WORD.findall(sentence.lower())
+                key = " ".join(words)
+                if not key or key in seen_exact:
+                    continue
+                shingles = _shingles(words)
+                overlaps = Counter(i for s in shingles for i in index.get(s, ()))
+                if any(
+                    count / len(shingles | kept_shingles[i]) >= NEAR_DUPLICATE_THRESHOLD
+                    for i, count in overlaps.items()
+                ):
+                    continue
+                seen_exact.add(key)
+                for s in shingles:
+                    index.setdefault(s, []).append(len(kept_shingles))
+                kept_shingles.append(shingles)
+                kept.append(_Sentence(source, unit_id, position, sentence, words))
+    return kept
+
+
+def _score(sentences: list[_Sentence]):
+    """
+    Centroid scoring: a sentence scores by how many of the corpus' frequent
+    content words it contains, normalized by its length.
+    """
+    frequencies = Counter(
+        w for s in sentences for w in set(s.words) if w not in _STOPWORDS and len(w) > 2
+    )
+    for s in sentences:
+        content = {w for w in s.words if w in frequencies}
+        s.score = sum(math.log1p(frequencies[w]) for w in content) / math.sqrt(len(s.words) + 1)
+
+
+def _render(sources: dict[str, str], sentences: list[_Sentence], labels: dict[str, str], compact: bool = True) -> str:
+    """
+    Kept sentences in their original order, one line per unit, under a heading per
+    source. Headers are written compact unless `compact` is False.
+    """
+    sections = []
+    for source in sources:
+        lines = {}
+        for s in sentences:
+            if s.source == source:
+                lines.setdefault(s.unit, []).append(s.compact if compact else s.text)
+        if lines:
+            body = "\n".join(" ".join(parts) for parts in lines.values())
+            sections.append(f"### {labels.get(source, source)}\n{body}")
+    return "\n\n".join(sections)
+
+
+def _select(sentences: list[_Sentence], budget: int, chosen: list[_Sentence]) -> list[_Sentence]:
+    """
+    `chosen` plus the other sentences by score while they fit in `budget` tokens;
+    returned in document order.
+    """
+    taken = {id(s) for s in chosen}
+    used = sum(s.tokens for s in chosen)
+    chosen = list(chosen)
+    for s in sorted(sentences, key=lambda s: -s.score):
+        if id(s) in taken or used + s.tokens > budget:
+            continue
+        chosen.append(s)
+        used += s.tokens
+    order = {id(s): i for i, s in enumerate(sentences)}
+    return sorted(chosen, key=lambda s: order[id(s)])
+
+
+def build_digests(sources: dict, labels: dict[str, str] = None) -> dict[str, str]:
+    """
+    Builds every digest level for the given {name: text} sources.
+    """
+    labels = labels or {}
+    texts = {name: _as_text(value) for name, value in sources.items() if value}
+    digests = {
+        "raw": "\n\n".join(f"### {labels.get(name, name)}\n{text}" for name, text in texts.items())
+    }
+    sentences = _deduplicated(texts)
+    _score(sentences)
+    digests["full"] = _render(texts, sentences, labels, compact=False)
+    full_tokens = sum(estimate_text_tokens(s.text) for s in sentences)
+
+    # Every unit keeps its header and lead; each level adds sentences to the one below
+    chosen = [s for s in sentences if s.position <= 0]
+    for level, ratio in sorted(LEVEL_RATIOS.items(), key=lambda item: item[1]):
+        chosen = _select(sentences, int(full_tokens * ratio), chosen)
+        digests[level] = _render(texts, chosen, labels)
+
+    brief = [
+        s if s.position < 0 else _Sentence(s.source, s.unit, 0, _cut(s.text, BRIEF_SENTENCE_CHARS), s.words)
+        for s in sentences if s.position <= 0
+    ]
+    digests["brief"] = _render(texts, brief, labels)
+    return digests
+
+
+def select_digest(digests: dict[str, str], budget: int = None) -> tuple[str, str]:
+    """
+    The largest digest fitting in `budget` tokens, as (level, text). Without a
+    budget the raw text is used; if even the brief digest is too large, it is
+    cut at the last line that fits.
+    """
+    if not budget:
+        return "raw", digests["raw"]
+    for level in DIGEST_LEVELS:
+        if estimate_text_tokens(digests[level]) <= budget:
+            return level, digests[level]
+    brief = digests["brief"][: budget * CHARS_PER_TOKEN]
+    cut = brief.rfind("\n")
+    return "truncated", brief[:cut] if cut > 0 else brief
+
+
+def parse_budgets(spec: str) -> dict[str, int]:
+    """
+    Parses "agent=tokens,agent=tokens" into a dict.
+    """
+    budgets = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            budgets[name.strip()] = int(value)
+    return budgets
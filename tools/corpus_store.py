@@ -0,0 +1,340 @@
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from scientific_research_system.config import Config
+
+BLOB_FILE = "corpus.blob"
+INDEX_FILE = "corpus.sqlite"
+# Text before the first recognised heading (title, authors, often the abstract)
+FRONT_SECTION = "front"
+
+_KNOWN_SECTIONS = (
+    "abstract", "introduction", "background", "related work", "preliminaries", "method", "methods",
+    "methodology", "approach", "model", "experiments", "experimental setup", "evaluation", "results",
+    "discussion", "limitations", "conclusion", "conclusions", "acknowledgements", "acknowledgments",
+    "references", "bibliography", "appendix", "supplementary material",
+)
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(?P<name>.+?)\s*#*\s*$")
+_NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*|[IVX]+)\.?\s+(?P<name>[A-Z][A-Za-z0-9 ,:&/()-]{2,60})$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _section_name(line: str):
+    """
+    The normalized section name if `line` is a heading, else None.
+    """
+    line = line.strip()
+    if not line or len(line) > 80:
+        return None
+    match = _MARKDOWN_HEADING.match(line) or _NUMBERED_HEADING.match(line)
+    name = match.group("name") if match else line
+    normalized = " ".join(_NON_WORD.sub(" ", name.lower()).split())
+    if match or normalized in _KNOWN_SECTIONS:
+        return normalized or None
+    return None
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """
+    Splits a paper into (section name, text) pairs at its headings. Repeated
+    names get a numeric suffix so every (paper, section) key is unique.
+    """
+    sections = []
+    name = FRONT_SECTION
+    lines = []
+    for line in text.splitlines(keepends=True):
+        heading = _section_name(line)
+        if heading:
+            if lines:
+                sections.append((name, "".join(lines)))
+            name = heading
+            lines = [line]
+        else:
+            lines.append(line)
+    if lines:
+        sections.append((name, "".join(lines)))
+
+    seen = {}
+    unique = []
+    for name, body in sections:
+        seen[name] = seen.get(name, 0) + 1
+        unique.append((name if seen[name] == 1 else f"{name}_{seen[name]}", body))
+    return unique
+
+
+def extract_pdf_text(path: str) -> str:
+    """
+    Plain text of a PDF, page by page.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("Ingesting PDFs requires pypdf (pip install pypdf).")
+    reader = PdfReader(path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+class CorpusStore:
+    """
+    Local full-text corpus: an append-only blob of UTF-8 text, memory-mapped for
+    reading, plus an SQLite index of byte ranges by paper and section.
+
+    Readers get zero-copy `memoryview` slices of the mapping, so tools can scan
+    full papers (regexes work directly on buffers) without loading the corpus
+    into memory. Re-ingesting a changed paper appends the new text and repoints
+    its index rows; identical text is not stored twice.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or Config.CORPUS_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.blob_path = os.path.join(self.directory, BLOB_FILE)
+        self.index_path = os.path.join(self.directory, INDEX_FILE)
+        open(self.blob_path, "ab").close()
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._map_lock = threading.Lock()
+        self._mmap = None
+        self._mapped_size = 0
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                paper_id TEXT PRIMARY KEY,
+                title TEXT,
+                source TEXT,
+                sha256 TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                added_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sections (
+                paper_id TEXT NOT NULL,
+                ord INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (paper_id, ord)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS sections_by_name ON sections(paper_id, name)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ------------------------------------------------------------------ write
+
+    def add(self, paper_id: str, text: str, title: str = None, source: str = None) -> dict:
+        """
+        Ingests the full text of one paper. Returns its index entry.
+        """
+        sections = split_sections(text)
+        encoded = [(name, body.encode("utf-8")) for name, body in sections]
+        data = b"".join(body for _, body in encoded)
+        digest = hashlib.sha256(data).hexdigest()
+        if title is None:
+            title = next((line.strip() for line in text.splitlines() if line.strip()), paper_id)[:300]
+
+        with self._write_lock:
+            conn = self._connect()
+            # The exclusive transaction also serializes appends across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT sha256 FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()
+                if row is not None and row[0] == digest:
+                    conn.execute("COMMIT")
+                    return self.paper(paper_id)
+                with open(self.blob_path, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(data)
+                conn.execute(
+                    "INSERT OR REPLACE INTO papers(paper_id, title, source, sha256, offset, length, added_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (paper_id, title, source, digest, offset, len(data), time.time()),
+                )
+                conn.execute("DELETE FROM sections WHERE paper_id = ?", (paper_id,))
+                position = offset
+                for ord_, (name, body) in enumerate(encoded):
+                    conn.execute(
+                        "INSERT INTO sections(paper_id, ord, name, offset, length) VALUES (?, ?, ?, ?, ?)",
+                        (paper_id, ord_, name, position, len(body)),
+                    )
+                    position += len(body)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.paper(paper_id)
+
+    def add_file(self, path: str, paper_id: str = None) -> dict:
+        """
+        Ingests a PDF or a plain-text/Markdown file; the paper ID defaults to the file name.
+        """
+        paper_id = paper_id or os.path.splitext(os.path.basename(path))[0]
+        if path.lower().endswith(".pdf"):
+            text = extract_pdf_text(path)
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        return self.add(paper_id, text, source=os.path.abspath(path))
+
+    # ------------------------------------------------------------------- read
+
+    def _buffer(self, end: int) -> memoryview:
+        """
+        A view of the mapped blob covering at least `end` bytes, remapping when
+        the file has grown. Superseded mappings stay alive while views of them exist.
+        """
+        if end > self._mapped_size:
+            with self._map_lock:
+                if end > self._mapped_size:
+                    size = os.path.getsize(self.blob_path)
+                    if size:
+                        with open(self.blob_path, "rb") as f:
+                            self._mmap = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                        self._mapped_size = size
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap)
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def __contains__(self, paper_id):
+        return self._connect().execute(
+            "SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone() is not None
+
+    def paper(self, paper_id: str):
+        """
+        Index entry of a paper (title, source, size and sections), or None.
+        """
+        row = self._connect().execute(
+            "SELECT paper_id, title, source, length FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"paper_id": row[0], "title": row[1], "source": row[2], "bytes": row[3],
+                "sections": self.sections(paper_id)}
+
+    def sections(self, paper_id: str) -> list[dict]:
+        return [
+            {"name": name, "bytes": length}
+            for name, length in self._connect().execute(
+                "SELECT name, length FROM sections WHERE paper_id = ? ORDER BY ord", (paper_id,)
+            )
+        ]
+
+    def view(self, paper_id: str, section: str = None):
+        """
+        Zero-copy view of a paper (or of one section), or None if unknown.
+        """
+        if section:
+            row = self._connect().execute(
+                "SELECT offset, length FROM sections WHERE paper_id = ? AND name = ?", (paper_id, section)
+            ).fetchone()
+        else:
+            row = self._connect().execute(
+                "SELECT offset, length FROM papers WHERE paper_id = ?", (paper_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        offset, length = row
+        return self._buffer(offset + length)[offset:offset + length]
+
+    def text(self, paper_id: str, section: str = None, start: int = 0, max_bytes: int = None):
+        """
+        Decoded text of a paper or section, optionally only `max_bytes` from byte `start`.
+        """
+        view = self.view(paper_id, section)
+        if view is None:
+            return None
+        end = len(view) if max_bytes is None else min(len(view), start + max_bytes)
+        return bytes(view[start:end]).decode("utf-8", errors="ignore")
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Papers whose ID or title contains every word of `query`.
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+        clause = " AND ".join(["(lower(title) LIKE ? OR lower(paper_id) LIKE ?)"] * len(words))
+        params = [p for w in words for p in (f"%{w}%", f"%{w}%")]
+        rows = self._connect().execute(
+            f"SELECT paper_id, title, length FROM papers WHERE {clause} ORDER BY added_at DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [{"paper_id": p, "title": t, "bytes": n} for p, t, n in rows]
+
+    def stats(self) -> dict:
+        papers, live = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM papers").fetchone()
+        blob = os.path.getsize(self.blob_path)
+        return {"papers": papers, "text_bytes": live, "blob_bytes": blob, "superseded_bytes": blob - live}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_corpus_store():
+    """
+    Returns the store in Config.CORPUS_DIR, or None until something has been ingested there.
+    """
+    global _store
+    if not os.path.exists(os.path.join(Config.CORPUS_DIR, INDEX_FILE)):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CorpusStore()
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local full-text corpus (CORPUS_DIR).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Ingest PDF, text or Markdown files (or directories of them).")
+    ingest.add_argument("paths", nargs="+")
+    commands.add_parser("stats", help="Show corpus size.")
+    search = commands.add_parser("search", help="Find papers by ID or title words.")
+    search.add_argument("query")
+    args = parser.parse_args(argv)
+
+    store = CorpusStore()
+    if args.command == "ingest":
+        files = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                files += sorted(
+                    os.path.join(path, name) for name in os.listdir(path)
+                    if name.lower().endswith((".pdf", ".txt", ".md"))
+                )
+            else:
+                files.append(path)
+        for path in files:
+            entry = store.add_file(path)
+            print(f"{entry['paper_id']}: {entry['bytes']} bytes, "
+                  f"sections: {', '.join(s['name'] for s in entry['sections'])}")
+    elif args.command == "search":
+        for entry in store.search(args.query):
+            print(f"{entry['paper_id']}\t{entry['title']}")
+    print(store.stats())
@@ -0,0 +1,235 @@
+import bisect
+import re
+
+from google.adk.tools.function_tool import FunctionTool
+from scientific_research_system.tools.code_tools import iter_code_blocks
+from scientific_research_system.tools.corpus_store import get_corpus_store
+from scientific_research_system.tools.forensics_tools import (
+    MIN_BENFORD_SAMPLE, check_benfords_law, check_p_value_batch
+)
+
+# Default size of a section excerpt returned to the model
+DEFAULT_EXCERPT_BYTES = 4000
+# Cap on statistics / references listed in a response (counts are always exact)
+MAX_REPORTED_ITEMS = 50
+_REFERENCE_SECTIONS = ("references", "bibliography")
+
+# APA-style test results, scanned directly over the mapped bytes:
+# t(28) = 2.20, p = .036 / F(2, 57) = 3.91, p < .05 / r(48) = .31, p = .03 / z = 1.96, p = .05 / χ2(1) = 4.2, p = .04
+_STAT_RESULT = re.compile(
+    rb"(?P<test>\bt|\bF|\br|\bz|\xcf\x87(?:2|\xc2\xb2)|\bchi2|\bchi-square)\s*"
+    rb"(?:\(\s*(?P<df1>\d+(?:\.\d+)?)\s*(?:,\s*(?P<df2>\d+(?:\.\d+)?)\s*)?(?:,\s*N\s*=\s*\d+\s*)?\))?\s*"
+    rb"=\s*(?P<stat>-?\d*\.?\d+)\s*,\s*(?:ns\s*,\s*)?p\s*(?P<comparison>[<>=])\s*(?P<p>0?\.\d+|1(?:\.0+)?)"
+)
+# Numbers reported in the body (not part of a word, identifier or date range)
+_NUMBER = re.compile(rb"(?<![\w.,])(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?(?!\.?\w)")
+_ARXIV_ID = re.compile(rb"\b(?:arXiv:\s*)?(\d{4}\.\d{4,5}(?:v\d+)?)\b")
+_DOI = re.compile(rb"\b(10\.\d{4,9}/[^\s\"<>,;]+[^\s\"<>,;.)])")
+# Numbers that name or date something rather than measure it: "Table 2", "Fig. 3b", "Section 4.1",
+# "Eq. (5)", citation marks "[12, 14-16]", dates "2024-01-31" and arXiv IDs / DOIs
+_NOT_MEASURED = re.compile(
+    rb"\b(?:Table|Tab|Figure|Fig|Section|Sec|Eq|Equation|Appendix|App|Algorithm|Alg|Chapter|Step|"
+    rb"Theorem|Lemma|Corollary|Definition|Proposition|Line|Page|pp?|Vol|No)\.?\s*\(?\d+(?:\.\d+)*"
+    rb"|\[\s*\d+(?:\s*(?:[,-]|\xe2\x80\x93)\s*\d+)*\s*\]"
+    rb"|\b\d{4}[-/]\d{1,2}(?:[-/]\d{1,2})?\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    rb"|\b(?:arXiv:\s*)?\d{4}\.\d{4,5}(?:v\d+)?\b|\b10\.\d{4,9}/\S+",
+    re.IGNORECASE,
+)
+# Whole integers in this range are read as years
+_YEARS = range(1900, 2100)
+
+
+def _missing(paper_id: str, section: str = None):
+    store = get_corpus_store()
+    if store is None:
+        return store, {"error": "No local corpus (ingest papers with `python corpus.py ingest`)."}
+    if paper_id not in store:
+        return store, {"error": f"Paper '{paper_id}' is not in the local corpus."}
+    if section and store.view(paper_id, section) is None:
+        return store, {"error": f"Paper '{paper_id}' has no section '{section}'.",
+                       "sections": [s["name"] for s in store.sections(paper_id)]}
+    return store, None
+
+
+def _test_name(raw: bytes) -> str:
+    return raw.decode() if raw in (b"t", b"F", b"r", b"z") else "chi2"
+
+
+def extract_test_results(buffer, label: str = "") -> list[dict]:
+    """
+    APA-style test results in a text buffer (bytes or memoryview), as `check_p_value_batch` inputs.
+    Each result is labelled `<label>@<byte offset>`.
+    """
+    results = []
+    for match in _STAT_RESULT.finditer(buffer):
+        result = {
+            "test": _test_name(match.group("test")),
+            "stat": match.group("stat").decode(),
+            "p": match.group("p").decode(),
+            "comparison": match.group("comparison").decode(),
+            "label": f"{label}@{match.start()}",
+        }
+        if match.group("df1"):
+            result["df1"] = float(match.group("df1"))
+        if match.group("df2"):
+            result["df2"] = float(match.group("df2"))
+        results.append(result)
+    return results
+
+
+def extract_measurements(buffer) -> list[float]:
+    """
+    Positive numbers reported as measurements in a text buffer (bytes or memoryview),
+    the population Benford's law applies to. Years, dates, identifiers, labels
+    (table, figure, section, equation numbers), citation marks and the numbers
+    inside APA-style test results (degrees of freedom, statistics, p-values) are left out.
+    """
+    spans = sorted(
+        [m.span() for m in _NOT_MEASURED.finditer(buffer)] + [m.span() for m in _STAT_RESULT.finditer(buffer)]
+    )
+    starts = [start for start, _ in spans]
+    numbers = []
+    for match in _NUMBER.finditer(buffer):
+        i = bisect.bisect_right(starts, match.start()) - 1
+        if i >= 0 and match.start() < spans[i][1]:
+            continue
+        raw = match.group()
+        value = float(raw.replace(b",", b""))
+        if value <= 0 or (b"." not in raw and int(value) in _YEARS):
+            continue
+        numbers.append(value)
+    return numbers
+
+
+def search_local_corpus(query: str, limit: int = 10):
+    """
+    Finds papers in the local full-text corpus whose ID or title contains every word of `query`.
+    Returns paper IDs, titles and sizes.
+    """
+    store = get_corpus_store()
+    if store is None:
+        return {"error": "No local corpus (ingest papers with `python corpus.py ingest`)."}
+    return store.search(query, limit)
+
+
+def list_paper_sections(paper_id: str):
+    """
+    Lists the sections of a paper in the local corpus with their sizes in bytes.
+    """
+    store, error = _missing(paper_id)
+    return error or store.paper(paper_id)
+
+
+def read_paper_section(paper_id: str, section: str = None, start: int = 0, max_bytes: int = DEFAULT_EXCERPT_BYTES):
+    """
+    Reads part of a paper (or of one `section`) from the local corpus: `max_bytes` bytes from byte `start`.
+    `next_start` is set when there is more text to read.
+    """
+    store, error = _missing(paper_id, section)
+    if error:
+        return error
+    size = len(store.view(paper_id, section))
+    text = store.text(paper_id, section, start, max_bytes)
+    end = min(size, start + max_bytes)
+    return {"paper_id": paper_id, "section": section, "start": start, "bytes": size, "text": text,
+            "next_start": end if end < size else None}
+
+
+def extract_paper_code(paper_id: str, section: str = None, language: str = None, max_blocks: int = 50):
+    """
+    Extracts code blocks from a paper in the local corpus (optionally one section / one language).
+    Returns dicts with byte offsets, language, kind and code.
+    """
+    store, error = _missing(paper_id, section)
+    if error:
+        return error
+    results = []
+    for block in iter_code_blocks(store.view(paper_id, section)):
+        if language and block.language != language.lower():
+            continue
+        results.append(block._asdict())
+        if len(results) >= max_blocks:
+            break
+    return results
+
+
+def check_paper_statistics(paper_id: str, alpha: float = 0.05):
+    """
+    Runs the statistical forensics on the full text of a paper in the local corpus:
+    every APA-style result (e.g. "t(28) = 2.20, p = .036") is checked with
+    `check_p_value_batch`, and the measurements reported outside the references
+    (see `extract_measurements`) go through Benford's law once there are at least
+    MIN_BENFORD_SAMPLE of them. Nothing needs to be pasted into the prompt.
+    """
+    store, error = _missing(paper_id)
+    if error:
+        return error
+
+    results = []
+    numbers = []
+    for entry in store.sections(paper_id):
+        if entry["name"] in _REFERENCE_SECTIONS:
+            continue
+        view = store.view(paper_id, entry["name"])
+        results += extract_test_results(view, entry["name"])
+        numbers += extract_measurements(view)
+
+    p_values = check_p_value_batch(results, alpha)
+    p_values["results"] = p_values["results"][:MAX_REPORTED_ITEMS]
+    if len(numbers) >= MIN_BENFORD_SAMPLE:
+        benford = check_benfords_law(numbers)
+    else:
+        benford = {"result": "insufficient data", "sample_size": len(numbers),
+                   "message": f"Fewer than {MIN_BENFORD_SAMPLE} reported measurements; Benford's law not applied."}
+    return {
+        "paper_id": paper_id,
+        "p_values": p_values,
+        "benford": benford,
+    }
+
+
+def extract_paper_references(paper_id: str):
+    """
+    Lists the arXiv IDs and DOIs cited in the references section of a paper in the local corpus.
+    """
+    store, error = _missing(paper_id)
+    if error:
+        return error
+    section = next((s["name"] for s in store.sections(paper_id) if s["name"] in _REFERENCE_SECTIONS), None)
+    if section is None:
+        return {"error": f"Paper '{paper_id}' has no references section.",
+                "sections": [s["name"] for s in store.sections(paper_id)]}
+    view = store.view(paper_id, section)
+    arxiv_ids = list(dict.fromkeys(m.group(1).decode() for m in _ARXIV_ID.finditer(view)))
+    dois = list(dict.fromkeys(m.group(1).decode("utf-8", errors="replace") for m in _DOI.finditer(view)))
+    return {
+        "paper_id": paper_id,
+        "arxiv_ids": arxiv_ids[:MAX_REPORTED_ITEMS],
+        "dois": dois[:MAX_REPORTED_ITEMS],
+        "total": len(arxiv_ids) + len(dois),
+    }
+
+# ADK Tools
+search_corpus_tool = FunctionTool(
+    func=search_local_corpus
+)
+
+list_sections_tool = FunctionTool(
+    func=list_paper_sections
+)
+
+read_section_tool = FunctionTool(
+    func=read_paper_section
+)
+
+extract_paper_code_tool = FunctionTool(
+    func=extract_paper_code
+)
+
+paper_statistics_tool = FunctionTool(
+    func=check_paper_statistics
+)
+
+paper_references_tool = FunctionTool(
+    func=extract_paper_references
+)
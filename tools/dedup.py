@@ -0,0 +1,261 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from scientific_research_system.config import Config
+from scientific_research_system.tools.paper_index import tokenize
+from scientific_research_system.tools.telemetry import record_dedup
+
+# MinHash signature length and LSH banding: 16 bands of 8 rows make pairs with
+# a Jaccard similarity above ~0.7 collide in at least one band with high probability
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+# Titles shorter than this (in terms) are too generic to match on, and titles
+# must be nearly identical: related papers often differ by a single word, so
+# titles are compared as word bigrams rather than as a bag of words
+MIN_TITLE_TERMS = 4
+TITLE_THRESHOLD = 0.85
+# Invocations whose registries are kept (the mining tools of one run share a registry)
+MAX_REGISTRIES = 64
+# A source's results are only matched against its own and earlier sources, so the
+# arXiv results never depend on whether the web search of a run finished first
+SOURCE_PRECEDENCE = ("arxiv", "web")
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+# Records produced by the arXiv and web search wrappers
+_RECORD_START = re.compile(r"\n\n(?=Published: |Title: )")
+_FIELD = re.compile(r"^(Published|Title|Authors|arXiv ID|Link): ?(.*)$", re.MULTILINE)
+_BODY = re.compile(r"^(?:Summary|Snippet): ?", re.MULTILINE)
+_ARXIV_LINK = re.compile(r"arxiv\.org/(?:abs|pdf|html)/([a-z\-]+/\d{7}|\d{4}\.\d{4,5})", re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+# "[2401.00001] Title", "Title - arXiv", "Title | Site name"
+_TITLE_DECORATION = re.compile(r"^\[[^\]]*\]\s*|\s+[-|\u2013]\s+[^-|\u2013]{1,40}$")
+
+
+def minhash(shingles: set) -> np.ndarray:
+    """
+    MinHash signature of a set of strings (CRC32 + universal hashing, vectorized).
+    """
+    values = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    values %= np.uint64(_PRIME)
+    return ((np.outer(values, _A) + _B) % np.uint64(_PRIME)).min(axis=0)
+
+
+def _shingles(terms: list[str], size: int) -> set:
+    if len(terms) < size:
+        return {" ".join(terms)} if terms else set()
+    return {" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+def _paper_key(fields: dict):
+    """
+    Exact identity of a record: its arXiv ID (also recognised in links), else its normalized URL.
+    """
+    if fields.get("arXiv ID"):
+        return "arxiv:" + _VERSION_SUFFIX.sub("", fields["arXiv ID"].strip())
+    link = fields.get("Link", "")
+    match = _ARXIV_LINK.search(link)
+    if match:
+        return "arxiv:" + match.group(1)
+    if link:
+        link = re.sub(r"^https?://(www\.)?", "", link.strip().lower()).split("#")[0].rstrip("/")
+        return "url:" + link
+    return None
+
+
+def split_records(text: str) -> list[str]:
+    """
+    Splits a search tool response into its records (one per paper or web page).
+    """
+    return _RECORD_START.split(text.strip()) if text else []
+
+
+def _fields(record: str) -> tuple[dict, str]:
+    """
+    Header fields of a record, and its abstract / snippet (which may span lines).
+    """
+    body = _BODY.search(record)
+    header = record[:body.start()] if body else record
+    return dict(_FIELD.findall(header)), record[body.end():] if body else ""
+
+
+class _LshIndex:
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = {}
+
+    def query(self, signature: np.ndarray) -> set:
+        """
+        Items whose stored signature has an estimated Jaccard similarity of at least the threshold.
+        """
+        if signature is None:
+            return set()
+        seen = set()
+        matches = set()
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+            for candidate in self.buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+                    matches.add(candidate)
+        return matches
+
+    def add(self, item: int, signature: np.ndarray):
+        self.signatures[item] = signature
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+            self.buckets.setdefault(key, []).append(item)
+
+
+class _Registry:
+    """
+    The records kept so far for one source.
+    """
+
+    def __init__(self, threshold: float):
+        self.keys = set()
+        # (key, has title, has abstract) of each kept record
+        self.records = []
+        self.titles = _LshIndex(max(threshold, TITLE_THRESHOLD))
+        self.abstracts = _LshIndex(threshold)
+
+    def match(self, key, title, body):
+        if key and key in self.keys:
+            return "exact"
+        title_matches = self.titles.query(title)
+        body_matches = self.abstracts.query(body)
+        for candidate in sorted(title_matches | body_matches):
+            other_key, other_title, other_body = self.records[candidate]
+            # Two different arXiv IDs are two papers, however alike they read
+            if key and other_key and key.startswith("arxiv:") and other_key.startswith("arxiv:"):
+                continue
+            # Both fields must match; a field missing on either side cannot disagree
+            if (candidate in title_matches or title is None or not other_title) and \
+                    (candidate in body_matches or body is None or not other_body):
+                return "near"
+        return None
+
+    def add(self, key, title, body):
+        item = len(self.records)
+        self.records.append((key, title is not None, body is not None))
+        if key:
+            self.keys.add(key)
+        if title is not None:
+            self.titles.add(item, title)
+        if body is not None:
+            self.abstracts.add(item, body)
+
+
+class Deduplicator:
+    """
+    Streaming duplicate filter for search results: a record is dropped when its
+    arXiv ID / URL was already seen, or when both its title (word bigrams) and
+    its abstract are near duplicates (MinHash + LSH, estimated Jaccard >= `threshold`)
+    of the same kept record; a field only one of the two records has is not
+    compared. Records with different arXiv IDs are never near duplicates.
+    Each record costs one signature per field and a constant number of bucket
+    lookups, so filtering is linear in the number of records.
+    """
+
+    def __init__(self, threshold: float = None):
+        self.threshold = threshold if threshold is not None else Config.DEDUP_THRESHOLD
+        self.registries = {}
+        self._lock = threading.Lock()
+
+    def check(self, record: str, source: str):
+        """
+        "exact" or "near" if `record` duplicates a record kept for `source` or an
+        earlier source (SOURCE_PRECEDENCE); otherwise keeps it and returns None.
+        """
+        fields, body_text = _fields(record)
+        key = _paper_key(fields)
+        title_terms = tokenize(_TITLE_DECORATION.sub("", fields.get("Title", "")))
+        body_terms = tokenize(body_text)
+        title = minhash(_shingles(title_terms, 2)) if len(title_terms) >= MIN_TITLE_TERMS else None
+        body = minhash(_shingles(body_terms, 3)) if len(body_terms) >= 3 else None
+
+        rank = SOURCE_PRECEDENCE.index(source) if source in SOURCE_PRECEDENCE else len(SOURCE_PRECEDENCE)
+        with self._lock:
+            for earlier in SOURCE_PRECEDENCE[:rank] + (source,):
+                registry = self.registries.get(earlier)
+                duplicate = registry.match(key, title, body) if registry else None
+                if duplicate:
+                    return duplicate
+            self.registries.setdefault(source, _Registry(self.threshold)).add(key, title, body)
+        return None
+
+    def filter(self, text: str, source: str) -> tuple[str, dict]:
+        """
+        Removes duplicate records from one search response. Returns the
+        remaining text and a report of what was removed.
+        """
+        records = split_records(text)
+        report = {"documents": 0, "exact_duplicates": 0, "near_duplicates": 0, "chars_removed": 0}
+        # Error / "no results" messages are passed through untouched
+        if not records or not _FIELD.search(records[0]):
+            return text, report
+        kept = []
+        for record in records:
+            report["documents"] += 1
+            duplicate = self.check(record, source)
+            if duplicate is None:
+                kept.append(record)
+            else:
+                report[f"{duplicate}_duplicates"] += 1
+                report["chars_removed"] += len(record) + 2
+        return "\n\n".join(kept) or "(all results duplicate earlier results)", report
+
+
+def deduplicate_outcomes(outcomes: list[dict], source: str, deduplicator: Deduplicator = None) -> str:
+    """
+    Removes duplicate records from the results of a search fan-out (in query
+    order, so the output is deterministic), in place. Returns a one-line report
+    to append to the tool response, or "" when nothing was removed.
+    """
+    if not Config.DEDUP_ENABLED:
+        return ""
+    deduplicator = deduplicator or Deduplicator()
+    total = {"documents": 0, "exact_duplicates": 0, "near_duplicates": 0, "chars_removed": 0}
+    for outcome in outcomes:
+        if outcome.get("result") is None:
+            continue
+        outcome["result"], report = deduplicator.filter(outcome["result"], source)
+        for name in total:
+            total[name] += report[name]
+    record_dedup(source, total)
+    removed = total["exact_duplicates"] + total["near_duplicates"]
+    if not removed:
+        return ""
+    return (f"\n\n[Duplicates removed: {removed} of {total['documents']} documents "
+            f"({total['exact_duplicates']} exact, {total['near_duplicates']} near-duplicate), "
+            f"{total['chars_removed']} characters]")
+
+
+_registries = OrderedDict()
+_registries_lock = threading.Lock()
+
+
+def get_deduplicator(invocation_id: str) -> Deduplicator:
+    """
+    The deduplicator shared by every search tool call of one run, so papers
+    repeated across queries and across the arXiv and web results are dropped.
+    """
+    with _registries_lock:
+        deduplicator = _registries.get(invocation_id)
+        if deduplicator is None:
+            deduplicator = _registries[invocation_id] = Deduplicator()
+            while len(_registries) > MAX_REGISTRIES:
+                _registries.popitem(last=False)
+        else:
+            _registries.move_to_end(invocation_id)
+        return deduplicator
@@ -0,0 +1,368 @@
+import email.parser
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from packaging.markers import default_environment
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from scientific_research_system.config import Config
+from scientific_research_system.tools.cache import cached_tool_call
+
+# Common names used in papers that differ from the distribution name on PyPI
+PACKAGE_ALIASES = {
+    "pytorch": "torch",
+    "sklearn": "scikit-learn",
+    "cv2": "opencv-python",
+    "opencv": "opencv-python",
+    "pil": "pillow",
+    "tf": "tensorflow",
+}
+
+# Upper bound on backtracking steps before a resolution is reported as too complex
+MAX_RESOLUTION_ROUNDS = 20000
+
+# Loose "name 1.2.3" / "name v1.2" mentions as written in papers
+_LOOSE_VERSION = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s+v?(\d+(?:\.\d+)*)$")
+# Leading package name of a spec that does not parse ("TensorFlow 2.x")
+_LEADING_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+# Python version as the model may write it: "3.8", "Python 3.10.4", "py3.11"
+_PYTHON_VERSION = re.compile(r"^(?:python|py)?\s*v?(\d+\.\d+(?:\.\d+)?)\+?$", re.I)
+
+
+def normalize_python_version(text: str):
+    """
+    "Python 3.8" -> "3.8". Returns None for anything that is not a major.minor[.micro] version ("3.x").
+    """
+    match = _PYTHON_VERSION.match(str(text).strip())
+    return match.group(1) if match else None
+
+
+def parse_requirement(text: str) -> Requirement:
+    """
+    Parses a requirement specifier (PEP 508), also accepting loose forms such as
+    "PyTorch 1.9" and common import-name aliases.
+    """
+    text = text.strip()
+    loose = _LOOSE_VERSION.match(text)
+    if loose:
+        text = f"{loose.group(1)}=={loose.group(2)}"
+    req = Requirement(text)
+    alias = PACKAGE_ALIASES.get(canonicalize_name(req.name))
+    if alias:
+        req.name = alias
+    return req
+
+
+def requirement_name(text: str):
+    """
+    Canonical (alias-resolved) package name of a specifier. Specs that do not
+    parse fall back to their leading name token; returns None if there is none.
+    """
+    try:
+        return canonicalize_name(parse_requirement(text).name)
+    except InvalidRequirement:
+        match = _LEADING_NAME.match(text)
+        if not match:
+            return None
+        name = canonicalize_name(match.group(1))
+        return PACKAGE_ALIASES.get(name, name)
+
+
+class PackageIndex:
+    """
+    Local package metadata: canonical name -> {Version: (requires_dist, requires_python)}.
+    Loaded from a JSON snapshot or from a directory of wheel METADATA files.
+    """
+
+    def __init__(self, packages: dict, fingerprint: str = ""):
+        self.packages = packages
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def load(cls, path: str) -> "PackageIndex":
+        if os.path.isdir(path):
+            return cls._from_metadata_dir(path)
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        packages = {}
+        for name, versions in snapshot.items():
+            entries = packages.setdefault(canonicalize_name(name), {})
+            for version, meta in versions.items():
+                cls._add(entries, version, meta.get("requires_dist") or [], meta.get("requires_python"))
+        return cls(packages, cls._fingerprint(path))
+
+    @classmethod
+    def _from_metadata_dir(cls, path: str) -> "PackageIndex":
+        parser = email.parser.HeaderParser()
+        packages = {}
+        for root, _, files in os.walk(path):
+            for filename in files:
+                if filename != "METADATA" and not filename.endswith(".metadata"):
+                    continue
+                with open(os.path.join(root, filename), "r", encoding="utf-8", errors="replace") as f:
+                    message = parser.parse(f)
+                if not message.get("Name") or not message.get("Version"):
+                    continue
+                entries = packages.setdefault(canonicalize_name(message["Name"]), {})
+                cls._add(
+                    entries,
+                    message["Version"],
+                    message.get_all("Requires-Dist") or [],
+                    message.get("Requires-Python"),
+                )
+        return cls(packages, cls._fingerprint(path))
+
+    @staticmethod
+    def _add(entries: dict, version: str, requires_dist: list, requires_python: str):
+        try:
+            parsed = Version(version)
+        except InvalidVersion:
+            return
+        requirements = []
+        for spec in requires_dist:
+            try:
+                requirements.append(Requirement(spec))
+            except InvalidRequirement:
+                continue
+        entries[parsed] = (requirements, SpecifierSet(requires_python or ""))
+
+    @staticmethod
+    def _fingerprint(path: str) -> str:
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def versions(self, name: str) -> list:
+        """
+        Known versions of a package, newest first.
+        """
+        return sorted(self.packages.get(name, {}), reverse=True)
+
+
+class ResolutionConflict(Exception):
+    def __init__(self, name: str, constraints: list, available: list):
+        super().__init__(name)
+        self.name = name
+        self.constraints = constraints
+        self.available = available
+
+
+class Resolver:
+    """
+    Small backtracking resolver over a PackageIndex.
+    Picks the newest version of each package that satisfies every constraint
+    collected so far, plus the package's Requires-Python for the target interpreter.
+    """
+
+    def __init__(self, index: PackageIndex, python_version: str):
+        self.index = index
+        self.python_version = Version(python_version)
+        self.environment = default_environment()
+        self.environment["python_version"] = ".".join(python_version.split(".")[:2])
+        self.environment["python_full_version"] = python_version
+        self.rounds = 0
+
+    def _applies(self, req: Requirement, extras: set) -> bool:
+        if req.marker is None:
+            return True
+        for extra in extras or {""}:
+            if req.marker.evaluate({**self.environment, "extra": extra}):
+                return True
+        return False
+
+    def _candidates(self, name: str, constraints: list) -> list:
+        specifier = SpecifierSet()
+        for spec, _ in constraints:
+            specifier &= spec
+        return [
+            v for v in self.index.versions(name)
+            if specifier.contains(v) and
+            self.python_version in self.index.packages[name][v][1]
+        ]
+
+    def resolve(self, requirements: list) -> dict:
+        constraints = {}
+        extras = {}
+        for req in requirements:
+            if not self._applies(req, set()):
+                continue
+            name = canonicalize_name(req.name)
+            constraints.setdefault(name, []).append((req.specifier, "<root>"))
+            extras.setdefault(name, set()).update(req.extras)
+        return self._solve({}, constraints, extras)
+
+    def _solve(self, pinned: dict, constraints: dict, extras: dict) -> dict:
+        self.rounds += 1
+        if self.rounds > MAX_RESOLUTION_ROUNDS:
+            raise RuntimeError("resolution too complex (round limit reached)")
+
+        pending = [name for name in constraints if name not in pinned]
+        if not pending:
+            return pinned
+
+        # Most constrained package first keeps backtracking shallow
+        options = {name: self._candidates(name, constraints[name]) for name in pending}
+        name = min(pending, key=lambda n: len(options[n]))
+        if not options[name]:
+            raise ResolutionConflict(name, constraints[name], self.index.versions(name))
+
+        last_conflict = None
+        for version in options[name]:
+            requires, _ = self.index.packages[name][version]
+            next_constraints = {k: list(v) for k, v in constraints.items()}
+            next_extras = {k: set(v) for k, v in extras.items()}
+            parent = f"{name}=={version}"
+            clashes = False
+            for req in requires:
+                if not self._applies(req, extras.get(name, set())):
+                    continue
+                dep = canonicalize_name(req.name)
+                next_constraints.setdefault(dep, []).append((req.specifier, parent))
+                next_extras.setdefault(dep, set()).update(req.extras)
+                # A new constraint may rule out a version pinned earlier
+                if dep in pinned and not req.specifier.contains(pinned[dep]):
+                    clashes = True
+            if clashes:
+                continue
+            try:
+                return self._solve({**pinned, name: version}, next_constraints, next_extras)
+            except ResolutionConflict as conflict:
+                last_conflict = conflict
+        raise last_conflict or ResolutionConflict(name, constraints[name], self.index.versions(name))
+
+
+_index = None
+_index_lock = threading.Lock()
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+MEMO_SIZE = 1024
+
+
+def get_package_index():
+    """
+    Returns the index loaded from Config.PACKAGE_INDEX_PATH, or None when none is configured.
+    """
+    global _index
+    path = Config.PACKAGE_INDEX_PATH
+    if not path or not os.path.exists(path):
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PackageIndex.load(path)
+    return _index
+
+
+def requirement_set_hash(requirements: list, python_version: str, fingerprint: str = "") -> str:
+    """
+    Hash of the normalized requirement set: order, case and whitespace do not matter.
+    """
+    normalized = sorted(
+        f"{canonicalize_name(r.name)}{'[' + ','.join(sorted(r.extras)) + ']' if r.extras else ''}"
+        f"{r.specifier}{';' + str(r.marker) if r.marker else ''}"
+        for r in requirements
+    )
+    payload = json.dumps([normalized, python_version, fingerprint])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def resolve_requirements(dependencies: list[str], python_version: str = None) -> dict:
+    """
+    Resolves requirement specifiers against the local package index.
+    Results are memoized in-process and in the tool cache, keyed by the
+    hash of the normalized requirement set.
+    Specifiers that do not parse are left out of the resolution and listed under "invalid".
+    Returns None without a package index (the caller falls back to heuristics).
+    """
+    index = get_package_index()
+    if index is None:
+        return None
+
+    requested = python_version or Config.TARGET_PYTHON
+    python_version = normalize_python_version(requested)
+    if python_version is None:
+        return {"valid": False, "error": f"Invalid Python version '{requested}'. Use e.g. '3.10'."}
+    requirements = []
+    invalid = []
+    for dep in dependencies:
+        try:
+            requirements.append(parse_requirement(dep))
+        except InvalidRequirement as e:
+            invalid.append({"requirement": dep, "error": str(e)})
+    if invalid and not requirements:
+        return {"valid": False, "error": "Invalid requirement specifiers.", "invalid": invalid}
+
+    result = _memoized_resolve(index, requirements, python_version)
+    if invalid:
+        # Copy so the memoized result is not changed
+        result = dict(result, invalid=invalid)
+        field = "message" if result["valid"] else "error"
+        result[field] = f"{result[field]} {len(invalid)} specifier(s) could not be parsed and were not checked."
+    return result
+
+
+def _memoized_resolve(index: PackageIndex, requirements: list, python_version: str) -> dict:
+    key = requirement_set_hash(requirements, python_version, index.fingerprint)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    result = cached_tool_call(
+        "resolver", key, lambda: _resolve(index, requirements, python_version),
+        ttl=Config.RESOLVER_CACHE_TTL
+    )
+    with _memo_lock:
+        _memo[key] = result
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
+
+
+def _resolve(index: PackageIndex, requirements: list, python_version: str) -> dict:
+    resolver = Resolver(index, python_version)
+    try:
+        pinned = resolver.resolve(requirements)
+    except ResolutionConflict as conflict:
+        specifier = SpecifierSet()
+        for spec, _ in conflict.constraints:
+            specifier &= spec
+        python_blocked = [
+            str(v) for v in conflict.available
+            if specifier.contains(v) and Version(python_version) not in index.packages[conflict.name][v][1]
+        ]
+        if python_blocked:
+            error = (f"'{conflict.name}' {', '.join(python_blocked[:5])} matches the constraints "
+                     f"but does not support Python {python_version}.")
+        elif conflict.available:
+            error = f"No version of '{conflict.name}' satisfies all constraints."
+        else:
+            error = f"Package '{conflict.name}' is not in the local package index."
+        return {
+            "valid": False,
+            "error": error,
+            "conflict": {
+                "package": conflict.name,
+                "constraints": [
+                    {"specifier": str(spec) or "*", "required_by": parent}
+                    for spec, parent in conflict.constraints
+                ],
+                "available_versions": [str(v) for v in conflict.available[:20]],
+            },
+            "python_version": python_version,
+        }
+    except RuntimeError as e:
+        return {"valid": False, "error": str(e), "python_version": python_version}
+
+    return {
+        "valid": True,
+        "resolved": {name: str(version) for name, version in sorted(pinned.items())},
+        "python_version": python_version,
+        "message": f"Resolved {len(pinned)} packages.",
+    }
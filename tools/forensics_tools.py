@@ -1,86 +1,390 @@
-import math
+import re
+
+import numpy as np
+import scipy.stats as stats
 from google.adk.tools.function_tool import FunctionTool
 
-def check_benfords_law(numbers: list[float]):
+# Digit tests supported by the Benford engine: (first digit value, number of bins)
+BENFORD_TESTS = {
+    "first": (1, 9),        # first digit 1-9
+    "second": (0, 10),      # second digit 0-9
+    "first_two": (10, 90),  # first two digits 10-99
+}
+
+# Nigrini's MAD conformity thresholds: close / acceptable / marginal
+MAD_THRESHOLDS = {
+    "first": (0.006, 0.012, 0.015),
+    "second": (0.008, 0.010, 0.012),
+    "first_two": (0.0012, 0.0018, 0.0022),
+}
+
+# Below this many digits the tests have little power; results are flagged
+MIN_BENFORD_SAMPLE = 50
+
+def _benford_expected(test: str) -> np.ndarray:
     """
-    Checks if a list of numbers follows Benford's Law (first digit distribution).
-    Returns a risk score (0-100) indicating deviation.
+    Theoretical Benford probabilities for the given digit test.
     """
-    if not numbers:
-        return {"risk_score": 0, "message": "No data provided."}
-        
-    # Extract first digits
-    first_digits = []
-    for n in numbers:
-        try:
-            s = str(float(n)).replace('.', '').lstrip('0')
-            if s:
-                first_digits.append(int(s[0]))
-        except ValueError:
-            continue
-            
-    if not first_digits:
-         return {"risk_score": 0, "message": "No valid numbers found."}
-
-    total = len(first_digits)
-    counts = {d: first_digits.count(d) for d in range(1, 10)}
-    
-    # Theoretical Benford probabilities
-    benford_probs = {d: math.log10(1 + 1/d) for d in range(1, 10)}
-    
-    # Calculate Chi-square like deviation
-    deviation_sum = 0
-    for d in range(1, 10):
-        observed = counts[d] / total
-        expected = benford_probs[d]
-        deviation_sum += abs(observed - expected)
-        
-    # Normalize deviation to a score (simplified)
-    # Max possible deviation sum is around 1.0-ish roughly. 
-    # Let's say > 0.3 is suspicious.
-    risk_score = min(100, int(deviation_sum * 200))
-    
+    if test == "first":
+        d = np.arange(1, 10)
+        return np.log10(1 + 1 / d)
+    if test == "first_two":
+        d = np.arange(10, 100)
+        return np.log10(1 + 1 / d)
+    # Second digit: marginalize the first-two-digit law over the first digit
+    d1 = np.arange(1, 10)[:, None]
+    d2 = np.arange(0, 10)[None, :]
+    return np.log10(1 + 1 / (10 * d1 + d2)).sum(axis=0)
+
+_EXPECTED = {test: _benford_expected(test) for test in BENFORD_TESTS}
+
+def _to_array(numbers) -> np.ndarray:
+    """
+    Converts input to a float64 array, dropping values that cannot be parsed.
+    """
+    try:
+        return np.asarray(numbers, dtype=np.float64).ravel()
+    except (TypeError, ValueError):
+        values = []
+        for n in numbers:
+            try:
+                values.append(float(str(n).replace(",", "")))
+            except ValueError:
+                continue
+        return np.asarray(values, dtype=np.float64)
+
+def leading_digits(values: np.ndarray, test: str = "first") -> np.ndarray:
+    """
+    Extracts the digits used by `test` arithmetically (log10/floor, no string munging).
+    Zeros, NaNs and infinities are dropped.
+    """
+    x = np.abs(values)
+    x = x[np.isfinite(x) & (x > 0)]
+    if x.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Scale every value into [10, 100) so its integer part is the first two digits
+    exponent = np.floor(np.log10(x))
+    scaled = x * np.power(10.0, 1 - exponent)
+    # Correct log10 round-off at decade boundaries (e.g. 1000 -> 9.999...)
+    scaled = np.where(scaled >= 100, scaled / 10, scaled)
+    scaled = np.where(scaled < 10, scaled * 10, scaled)
+    first_two = np.clip(np.floor(scaled + 1e-9), 10, 99).astype(np.int64)
+
+    if test == "first":
+        return first_two // 10
+    if test == "second":
+        return first_two % 10
+    return first_two
+
+def _benford_statistics(counts: np.ndarray, test: str) -> dict:
+    """
+    Computes chi-square, MAD and KS statistics for a vector of digit counts.
+    """
+    expected = _EXPECTED[test]
+    total = int(counts.sum())
+    observed = counts / total
+    bins = len(expected)
+
+    chi_square = float(total * np.sum((observed - expected) ** 2 / expected))
+    chi_p = float(stats.chi2.sf(chi_square, bins - 1))
+
+    mad = float(np.mean(np.abs(observed - expected)))
+    close, acceptable, marginal = MAD_THRESHOLDS[test]
+    if mad <= close:
+        conformity = "close conformity"
+    elif mad <= acceptable:
+        conformity = "acceptable conformity"
+    elif mad <= marginal:
+        conformity = "marginal conformity"
+    else:
+        conformity = "nonconformity"
+
+    # KS on the cumulative digit distribution (conservative for discrete data)
+    ks = float(np.max(np.abs(np.cumsum(observed) - np.cumsum(expected))))
+    ks_p = float(stats.kstwo.sf(ks, total))
+
+    # MAD at the nonconformity threshold maps to a risk score of 50
+    risk_score = int(round(100 * min(1.0, mad / (2 * marginal))))
+
+    first_digit = BENFORD_TESTS[test][0]
     return {
         "risk_score": risk_score,
-        "distribution": counts,
+        "test": test,
+        "sample_size": total,
+        "distribution": {int(first_digit + i): int(c) for i, c in enumerate(counts)},
+        "chi_square": round(chi_square, 4),
+        "chi_square_p_value": chi_p,
+        "mad": round(mad, 6),
+        "mad_conformity": conformity,
+        "ks_statistic": round(ks, 6),
+        "ks_p_value": ks_p,
+        "small_sample": total < MIN_BENFORD_SAMPLE,
         "message": "High deviation detected" if risk_score > 50 else "Natural distribution"
     }
 
-def check_p_value_consistency(stat: float, p_val: float, sample_size: int = 100):
+def check_benfords_law(numbers: list[float], test: str = "first"):
     """
-    Checks consistency between a test statistic (Z/t) and P-value.
-    Assumes two-tailed Z-test for simplicity if not specified.
+    Checks if a list of numbers follows Benford's Law.
+    test: "first" (first digit), "second" (second digit) or "first_two" (first two digits).
+    Returns a risk score (0-100) plus chi-square, MAD and KS statistics with p-values.
     """
-    try:
-        import scipy.stats as stats
-        
-        # Calculate expected p-value from stat (assuming Z-test for simplicity)
-        # Two-tailed
-        expected_p = 2 * (1 - stats.norm.cdf(abs(stat)))
-        
-        difference = abs(expected_p - p_val)
-        
-        # Allow some floating point or rounding margin (e.g., reported p < 0.05)
-        consistent = difference < 0.05
-        
-        return {
-            "consistent": consistent,
-            "reported_p": p_val,
-            "calculated_p": round(expected_p, 4),
-            "difference": difference
-        }
-        
-    except ImportError:
-        return {"error": "scipy not installed, cannot calculate exact p-values."}
-    except Exception as e:
-        return {"error": str(e)}
+    if test not in BENFORD_TESTS:
+        return {"error": f"Unknown test '{test}'. Use one of {list(BENFORD_TESTS)}."}
+    if numbers is None or len(numbers) == 0:
+        return {"risk_score": 0, "message": "No data provided."}
+
+    digits = leading_digits(_to_array(numbers), test)
+    if digits.size == 0:
+        return {"risk_score": 0, "message": "No valid numbers found."}
+
+    first_digit, bins = BENFORD_TESTS[test]
+    counts = np.bincount(digits - first_digit, minlength=bins)
+    return _benford_statistics(counts, test)
+
+def check_benfords_law_batch(tables: dict[str, list[float]], test: str = "first"):
+    """
+    Scores many numeric tables against Benford's Law in one call.
+    tables: mapping of table name -> list of numbers.
+    Returns per-table results and the names of tables showing high deviation.
+    Tables with fewer than MIN_BENFORD_SAMPLE digits are never flagged: their
+    scores are noise, so they are listed under `small_sample_tables` instead.
+    """
+    if test not in BENFORD_TESTS:
+        return {"error": f"Unknown test '{test}'. Use one of {list(BENFORD_TESTS)}."}
+    first_digit, bins = BENFORD_TESTS[test]
+
+    names = list(tables)
+    digit_arrays = [leading_digits(_to_array(tables[name]), test) for name in names]
+    sizes = np.array([d.size for d in digit_arrays], dtype=np.int64)
+
+    # One bincount over all tables: offset each table's digits into its own row
+    if sizes.sum():
+        table_ids = np.repeat(np.arange(len(names)), sizes)
+        flat = np.concatenate(digit_arrays) - first_digit + table_ids * bins
+        counts = np.bincount(flat, minlength=len(names) * bins).reshape(len(names), bins)
+    else:
+        counts = np.zeros((len(names), bins), dtype=np.int64)
+
+    results = {}
+    for i, name in enumerate(names):
+        if sizes[i] == 0:
+            results[name] = {"risk_score": 0, "message": "No valid numbers found."}
+        else:
+            results[name] = _benford_statistics(counts[i], test)
+
+    small = [name for name, r in results.items() if r.get("small_sample")]
+    flagged = [name for name, r in results.items() if r["risk_score"] > 50 and not r.get("small_sample")]
+    return {
+        "test": test,
+        "tables_scored": len(names),
+        "values_scored": int(sizes.sum()),
+        "flagged_tables": flagged,
+        "small_sample_tables": small,
+        "results": results
+    }
+
+# Test types understood by the p-value checker and their aliases
+P_VALUE_TESTS = {
+    "z": "z", "t": "t", "f": "f", "r": "r",
+    "chi2": "chi2", "chi²": "chi2", "chisq": "chi2", "chi-square": "chi2", "x2": "chi2",
+}
+
+# Reported p-value with its comparison, as written in papers: "<.05", "p < .001", "= 0.049"
+_P_VALUE = re.compile(r"^\s*(?:p\s*)?(<=|>=|[<>=≤≥])?\s*(.+?)\s*$", re.IGNORECASE)
+_COMPARISONS = {"<=": "<", "≤": "<", ">=": ">", "≥": ">"}
+
+def _split_p(value, comparison):
+    """
+    Splits a reported p-value string into (value, comparison); a leading
+    operator in the string takes precedence over `comparison`.
+    """
+    if not isinstance(value, str):
+        return value, comparison
+    match = _P_VALUE.match(value)
+    if not match:
+        return value, comparison
+    operator, number = match.groups()
+    return number, _COMPARISONS.get(operator, operator) if operator else comparison
+
+def _decimals(value) -> int:
+    """
+    Number of decimals a value was reported with ("2.20" -> 2, 0.036 -> 3).
+    """
+    text = value if isinstance(value, str) else repr(float(value))
+    text = text.strip().lower()
+    if "e" in text:
+        return 6
+    return len(text.split(".")[1]) if "." in text else 0
+
+def _computed_p(test: str, stat: np.ndarray, df1: np.ndarray, df2: np.ndarray) -> np.ndarray:
+    """
+    Two-tailed p-values for z/t/r and upper-tail p-values for F/chi² in one SciPy call.
+    """
+    if test == "z":
+        return 2 * stats.norm.sf(np.abs(stat))
+    if test == "t":
+        return 2 * stats.t.sf(np.abs(stat), df1)
+    if test == "r":
+        r = np.clip(np.abs(stat), 0, 1 - 1e-12)
+        return 2 * stats.t.sf(r * np.sqrt(df1 / (1 - r ** 2)), df1)
+    if test == "f":
+        return stats.f.sf(stat, df1, df2)
+    return stats.chi2.sf(stat, df1)
+
+def check_p_value_batch(results: list[dict], alpha: float = 0.05):
+    """
+    Statcheck-style consistency check for many reported test results at once.
+    Each result is a dict with:
+    - `test`: "z", "t", "F", "chi2" or "r"
+    - `stat`: reported test statistic (string keeps its reported precision, e.g. "2.20")
+    - `p`: reported p-value, and optional `comparison` ("=", "<" or ">"; default "=").
+      A string may carry the comparison itself ("<.05", "< .001", "p = .049").
+    - `df1` / `df2`: degrees of freedom (t, r and chi² use df1; F uses both).
+      If missing, `n` (sample size) gives df1 = n - 1 for t and n - 2 for r.
+    - `one_tailed`: optional bool, halves the computed p for z/t/r
+    - `label`: optional identifier echoed back in the output
+    Rounding of the statistic and of the p-value is taken into account. A result is
+    a decision error when the inconsistency flips significance at `alpha`.
+    """
+    if not results:
+        return {"checked": 0, "inconsistencies": 0, "decision_errors": 0, "results": []}
+
+    count = len(results)
+    tests = np.empty(count, dtype=object)
+    stat = np.full(count, np.nan)
+    stat_dec = np.zeros(count, dtype=np.int64)
+    p_rep = np.full(count, np.nan)
+    p_dec = np.zeros(count, dtype=np.int64)
+    df1 = np.full(count, np.nan)
+    df2 = np.full(count, np.nan)
+    comparison = np.empty(count, dtype=object)
+    one_tailed = np.zeros(count, dtype=bool)
+    errors = [None] * count
+
+    for i, item in enumerate(results):
+        test = P_VALUE_TESTS.get(str(item.get("test", "z")).strip().lower())
+        comparison[i] = str(item.get("comparison", "=")).strip() or "="
+        try:
+            if test is None:
+                raise ValueError(f"unknown test type '{item.get('test')}'")
+            stat[i] = float(item["stat"])
+            stat_dec[i] = _decimals(item["stat"])
+            p_value, comparison[i] = _split_p(item["p"], comparison[i])
+            p_rep[i] = float(p_value)
+            p_dec[i] = _decimals(p_value)
+            if item.get("df1") is not None:
+                df1[i] = float(item["df1"])
+            elif item.get("n") is not None and test in ("t", "r"):
+                df1[i] = float(item["n"]) - (1 if test == "t" else 2)
+            if item.get("df2") is not None:
+                df2[i] = float(item["df2"])
+            if test in ("t", "r", "chi2", "f") and np.isnan(df1[i]):
+                raise ValueError(f"{test} test requires df1 (or n)")
+            if test == "f" and np.isnan(df2[i]):
+                raise ValueError("F test requires df1 and df2")
+        except (KeyError, TypeError, ValueError) as e:
+            errors[i] = str(e)
+            test = None
+        tests[i] = test
+        one_tailed[i] = bool(item.get("one_tailed", False))
+
+    # The statistic was rounded to stat_dec decimals: bound the true p-value
+    half_step = 0.5 * np.power(10.0, -stat_dec)
+    stat_abs = np.abs(stat)
+    stat_low = np.maximum(stat_abs - half_step, 0)
+    stat_high = stat_abs + half_step
+
+    p_calc = np.full(count, np.nan)
+    p_min = np.full(count, np.nan)
+    p_max = np.full(count, np.nan)
+    for test in set(t for t in tests if t is not None):
+        idx = np.flatnonzero(tests == test)
+        k = idx.size
+        values = _computed_p(
+            test,
+            np.concatenate([stat_abs[idx], stat_low[idx], stat_high[idx]]),
+            np.tile(df1[idx], 3),
+            np.tile(df2[idx], 3),
+        )
+        # p decreases as the statistic grows
+        p_calc[idx], p_max[idx], p_min[idx] = values[:k], values[k:2 * k], values[2 * k:]
+
+    halve = one_tailed & np.isin(tests, ["z", "t", "r"])
+    p_calc[halve] /= 2
+    p_min[halve] /= 2
+    p_max[halve] /= 2
+
+    # The reported p-value was itself rounded to p_dec decimals
+    p_step = 0.5 * np.power(10.0, -p_dec)
+    is_lt = comparison == "<"
+    is_gt = comparison == ">"
+    is_eq = ~(is_lt | is_gt)
+    consistent = (
+        (is_eq & (p_rep + p_step >= p_min) & (p_rep - p_step <= p_max))
+        | (is_lt & (p_min < p_rep))
+        | (is_gt & (p_max > p_rep))
+    )
+    reported_sig = ~is_gt & (p_rep <= alpha)
+    computed_sig = p_calc <= alpha
+    decision_error = ~consistent & (reported_sig != computed_sig)
+
+    output = []
+    for i, item in enumerate(results):
+        entry = {"label": item.get("label", i)}
+        if errors[i]:
+            entry["error"] = errors[i]
+        else:
+            entry.update({
+                "test": tests[i],
+                "reported_p": float(p_rep[i]),
+                "comparison": comparison[i],
+                "calculated_p": round(float(p_calc[i]), 6),
+                "calculated_p_range": [round(float(p_min[i]), 6), round(float(p_max[i]), 6)],
+                "consistent": bool(consistent[i]),
+                "decision_error": bool(decision_error[i]),
+            })
+        output.append(entry)
+
+    valid = np.array([e is None for e in errors])
+    return {
+        "checked": int(valid.sum()),
+        "inconsistencies": int((~consistent & valid).sum()),
+        "decision_errors": int((decision_error & valid).sum()),
+        "results": output
+    }
+
+def check_p_value_consistency(stat: float, p_val: float, sample_size: int = 100,
+                              test_type: str = "z", df1: float = None, df2: float = None):
+    """
+    Checks consistency between a single test statistic and its P-value.
+    test_type: "z", "t", "F", "chi2" or "r". For t and r tests the degrees of
+    freedom default to sample_size - 1 and sample_size - 2 respectively.
+    Prefer `check_p_value_batch` when a paper reports several results.
+    """
+    report = check_p_value_batch(
+        [{"test": test_type, "stat": stat, "p": p_val, "df1": df1, "df2": df2, "n": sample_size}]
+    )
+    result = report["results"][0]
+    if "error" in result:
+        return {"error": result["error"]}
+    result["difference"] = abs(result["calculated_p"] - p_val)
+    return result
 
 # ADK Tools
 benford_tool = FunctionTool(
     func=check_benfords_law
 )
 
+benford_batch_tool = FunctionTool(
+    func=check_benfords_law_batch
+)
+
 p_value_tool = FunctionTool(
     func=check_p_value_consistency
 )
 
+p_value_batch_tool = FunctionTool(
+    func=check_p_value_batch
+)
+
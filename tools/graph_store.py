@@ -0,0 +1,511 @@
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from scientific_research_system.config import Config
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Report sizes: candidates of each kind and entities listed per candidate
+MAX_CANDIDATES = 5
+MAX_LISTED_ENTITIES = 5
+# Brokers need at least this many neighbours to span a structural hole
+MIN_BROKER_DEGREE = 3
+
+_FENCE = re.compile(r"```(?:json)?\s*|```")
+_ARROW = re.compile(r"^(?P<src>.+?)\s*(?:-+\[(?P<rel1>[^\]]+)\]-*>|-{2,}(?P<rel2>[^->][^>]*?)-+>|->|=>|→)\s*(?P<dst>.+)$")
+_SPACES = re.compile(r"\s+")
+
+
+def entity_key(name: str) -> str:
+    """
+    Interning key of an entity: case- and whitespace-insensitive.
+    """
+    return _SPACES.sub(" ", str(name)).strip().strip("\"'.").lower()
+
+
+def _relation(item):
+    """
+    (source, relation, target) from a relationship given as an object, a list or an "A -[rel]-> B" string.
+    """
+    if isinstance(item, dict):
+        src = item.get("source") or item.get("from") or item.get("subject")
+        dst = item.get("target") or item.get("to") or item.get("object")
+        rel = item.get("relation") or item.get("type") or item.get("predicate") or "related_to"
+        return (str(src), str(rel), str(dst)) if src and dst else None
+    if isinstance(item, (list, tuple)) and len(item) in (2, 3):
+        return (str(item[0]), "related_to", str(item[1])) if len(item) == 2 else tuple(str(x) for x in item)
+    if isinstance(item, str):
+        match = _ARROW.match(item.strip())
+        if match:
+            rel = match.group("rel1") or match.group("rel2") or "related_to"
+            return match.group("src").strip(), rel.strip(), match.group("dst").strip()
+    return None
+
+
+def parse_graph(value) -> dict:
+    """
+    Entities and (source, relation, target) triples from the knowledge graph
+    agent's output: a dict or JSON text, possibly wrapped in a Markdown fence.
+    Relationships that cannot be read as triples are counted in `unparsed`.
+    """
+    data = value
+    if isinstance(value, str):
+        text = _FENCE.sub("", value).strip()
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if start != -1 else {}
+        except json.JSONDecodeError:
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    entities = []
+    for item in data.get("entities") or []:
+        name = item.get("name") if isinstance(item, dict) else item
+        if name:
+            entities.append(str(name))
+    relations = []
+    unparsed = 0
+    for item in data.get("relationships") or data.get("relations") or []:
+        triple = _relation(item)
+        if triple:
+            relations.append(triple)
+        else:
+            unparsed += 1
+    return {"entities": entities, "relations": relations, "unparsed": unparsed}
+
+
+@contextmanager
+def _file_lock(path: str):
+    """
+    Exclusive lock on `<path>.lock`, held across processes (the app, the batch CLI, ...).
+    """
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class KnowledgeGraph:
+    """
+    Persistent knowledge graph accumulated over research runs.
+
+    Entities and relation types are interned to integer IDs. Edges are kept in
+    columnar arrays (source, target, relation, weight), where the weight counts
+    the runs that reported the edge. Each run's graph is merged incrementally:
+    known entities and edges are reused and only new ones are appended. Graph
+    analytics work on a symmetric CSR adjacency matrix that is built lazily
+    and dropped when the graph changes.
+
+    Several processes may share one graph file: runs merged since the last
+    save are kept and, on save, replayed onto the file's current contents
+    under a file lock, so no process overwrites another's runs.
+    """
+
+    def __init__(self):
+        self.labels: list[str] = []
+        self._index: dict[str, int] = {}
+        self.relations: list[str] = []
+        self._relation_index: dict[str, int] = {}
+        self.src = np.empty(0, dtype=np.int64)
+        self.dst = np.empty(0, dtype=np.int64)
+        self.rel = np.empty(0, dtype=np.int64)
+        self.weight = np.empty(0, dtype=np.int64)
+        self._edge_index: dict[tuple[int, int, int], int] = {}
+        self.runs = 0
+        # Digests of the run graphs already merged, so a resumed run is not counted twice
+        self.merged: set[str] = set()
+        # (entities, relations, key) of the runs merged since the last save or load
+        self._unsaved: list[tuple] = []
+        self._adjacency = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, name):
+        return entity_key(name) in self._index
+
+    def _intern(self, name: str) -> int:
+        key = entity_key(name)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = len(self.labels)
+            self._index[key] = idx
+            self.labels.append(_SPACES.sub(" ", str(name)).strip())
+        return idx
+
+    def _intern_relation(self, relation: str) -> int:
+        key = entity_key(relation) or "related_to"
+        idx = self._relation_index.get(key)
+        if idx is None:
+            idx = len(self.relations)
+            self._relation_index[key] = idx
+            self.relations.append(key)
+        return idx
+
+    # ------------------------------------------------------------------ merge
+
+    def merge(self, entities: list[str], relations: list[tuple[str, str, str]], key: str = None) -> dict:
+        """
+        Merges one run's entities and (source, relation, target) triples.
+        Returns the entity IDs the run mentioned and what was new. A graph
+        with an already merged `key` only has its entities looked up.
+        """
+        with self._lock:
+            if key is not None and key in self.merged:
+                mentioned = [self._index[k] for k in map(entity_key, entities) if k in self._index]
+                for source, _, target in relations:
+                    mentioned += [self._index[k] for k in map(entity_key, (source, target)) if k in self._index]
+                return {"entities": sorted(set(mentioned)), "new_entities": 0, "new_edges": 0}
+            if key is not None:
+                self.merged.add(key)
+            self._unsaved.append((list(entities), list(relations), key))
+            known = len(self.labels)
+            touched = [self._intern(name) for name in entities if entity_key(name)]
+            new_src, new_dst, new_rel = [], [], []
+            bumped = []
+            for source, relation, target in relations:
+                if not entity_key(source) or not entity_key(target):
+                    continue
+                s, d = self._intern(source), self._intern(target)
+                if s == d:
+                    continue
+                touched += [s, d]
+                edge_key = (s, d, self._intern_relation(relation))
+                edge = self._edge_index.get(edge_key)
+                if edge is None:
+                    self._edge_index[edge_key] = len(self.src) + len(new_src)
+                    new_src.append(s)
+                    new_dst.append(d)
+                    new_rel.append(edge_key[2])
+                elif edge < len(self.src):
+                    bumped.append(edge)
+            if bumped:
+                # An edge reported twice in one run still counts once
+                np.add.at(self.weight, np.unique(bumped), 1)
+            if new_src:
+                self.src = np.concatenate([self.src, new_src])
+                self.dst = np.concatenate([self.dst, new_dst])
+                self.rel = np.concatenate([self.rel, new_rel])
+                self.weight = np.concatenate([self.weight, np.ones(len(new_src), dtype=np.int64)])
+            self.runs += 1
+            self._adjacency = None
+            return {
+                "entities": sorted(set(touched)),
+                "new_entities": len(self.labels) - known,
+                "new_edges": len(new_src),
+            }
+
+    # ------------------------------------------------------------ persistence
+
+    def save(self, path: str):
+        """
+        Writes the graph to an .npz file (atomically, via a temporary file).
+        If the file already exists, the runs merged here since the last save are
+        merged into its current contents first (runs another process saved meanwhile
+        are kept), and this graph is updated to the result.
+        """
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with _file_lock(path):
+                if os.path.exists(path):
+                    current = KnowledgeGraph.load(path)
+                    for entities, relations, key in self._unsaved:
+                        current.merge(entities, relations, key)
+                    self._adopt(current)
+                self._write(path)
+                self._unsaved = []
+
+    def _adopt(self, other: "KnowledgeGraph"):
+        """
+        Takes over the contents of `other`, keeping the IDs of this graph's entities
+        and relation types (IDs handed out by merge() stay valid).
+        """
+        combined = KnowledgeGraph()
+        for label in self.labels + other.labels:
+            combined._intern(label)
+        for relation in self.relations + other.relations:
+            combined._intern_relation(relation)
+        ids = np.array([combined._index[entity_key(label)] for label in other.labels], dtype=np.int64)
+        rels = np.array([combined._relation_index[relation] for relation in other.relations], dtype=np.int64)
+        self.labels, self._index = combined.labels, combined._index
+        self.relations, self._relation_index = combined.relations, combined._relation_index
+        self.src, self.dst, self.rel = ids[other.src], ids[other.dst], rels[other.rel]
+        self.weight = other.weight.copy()
+        self._edge_index = {
+            key: i for i, key in enumerate(zip(self.src.tolist(), self.dst.tolist(), self.rel.tolist()))
+        }
+        self.runs = other.runs
+        self.merged = set(other.merged)
+        self._adjacency = None
+
+    def _write(self, path: str):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                labels=np.array(self.labels, dtype=str),
+                relations=np.array(self.relations, dtype=str),
+                src=self.src, dst=self.dst, rel=self.rel, weight=self.weight,
+                runs=np.array(self.runs),
+                merged=np.array(sorted(self.merged), dtype=str),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "KnowledgeGraph":
+        graph = cls()
+        with np.load(path) as data:
+            graph.labels = data["labels"].tolist()
+            graph._index = {entity_key(label): i for i, label in enumerate(graph.labels)}
+            graph.relations = data["relations"].tolist()
+            graph._relation_index = {name: i for i, name in enumerate(graph.relations)}
+            graph.src, graph.dst, graph.rel, graph.weight = (
+                data["src"], data["dst"], data["rel"], data["weight"]
+            )
+            graph.runs = int(data["runs"])
+            graph.merged = set(data["merged"].tolist())
+        graph._edge_index = {
+            key: i for i, key in enumerate(zip(graph.src.tolist(), graph.dst.tolist(), graph.rel.tolist()))
+        }
+        return graph
+
+    # -------------------------------------------------------------- analytics
+
+    def adjacency(self) -> sparse.csr_matrix:
+        """
+        Symmetric entity adjacency (CSR); parallel edges and relation types are summed into one weight.
+        """
+        with self._lock:
+            if self._adjacency is None:
+                n = len(self.labels)
+                matrix = sparse.coo_matrix(
+                    (np.concatenate([self.weight, self.weight]).astype(np.float64),
+                     (np.concatenate([self.src, self.dst]), np.concatenate([self.dst, self.src]))),
+                    shape=(n, n),
+                ).tocsr()
+                matrix.sum_duplicates()
+                self._adjacency = matrix
+            return self._adjacency
+
+    def neighborhood(self, nodes) -> np.ndarray:
+        """
+        Sorted IDs of `nodes` and their direct neighbours.
+        """
+        matrix = self.adjacency()
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if not len(nodes):
+            return nodes
+        neighbours = matrix[nodes].indices
+        return np.unique(np.concatenate([nodes, neighbours]))
+
+    def gap_candidates(self, focus=None, limit: int = MAX_CANDIDATES) -> dict:
+        """
+        Deterministic research-gap candidates around `focus` (entity IDs, e.g. the
+        current run's; default: the whole graph):
+
+        - `islands`: clusters with no connection to the largest cluster.
+        - `bridges`: single edges that are the only link between two clusters of 2+ entities.
+        - `structural_holes`: brokers whose neighbours are not linked to each other
+          (lowest Burt constraint), with one missing link between two of those neighbours.
+        """
+        with self._lock:
+            matrix = self.adjacency()
+            nodes = np.arange(len(self.labels)) if focus is None else self.neighborhood(focus)
+            sub = matrix[nodes][:, nodes].tocsr()
+        count = len(nodes)
+        report = {
+            "entities": len(self.labels), "edges": int(len(self.src)), "runs": self.runs,
+            "subgraph_entities": count, "subgraph_edges": int(sub.nnz // 2),
+            "islands": [], "bridges": [], "structural_holes": [],
+        }
+        if not count:
+            return report
+        binary = (sub > 0).astype(np.float64).tocsr()
+        degree = np.diff(binary.indptr)
+
+        components, labels = connected_components(binary, directed=False)
+        sizes = np.bincount(labels, minlength=components)
+        order = np.argsort(-sizes, kind="stable")
+        report["components"] = int(components)
+        for component in order[1:]:
+            if len(report["islands"]) >= limit or sizes[component] < 2:
+                break
+            members = np.flatnonzero(labels == component)
+            report["islands"].append({
+                "size": int(sizes[component]),
+                "entities": self._top(nodes[members], degree[members]),
+            })
+
+        report["bridges"] = self._bridges(binary, nodes, labels, sizes, degree, limit)
+        report["structural_holes"] = self._structural_holes(sub, binary, nodes, degree, limit)
+        return report
+
+    def _top(self, ids, scores, limit: int = MAX_LISTED_ENTITIES) -> list[str]:
+        order = np.lexsort((ids, -np.asarray(scores)))[:limit]
+        return [self.labels[int(ids[i])] for i in order]
+
+    def _bridges(self, binary, nodes, labels, sizes, degree, limit) -> list[dict]:
+        """
+        Bridges (Tarjan, iterative DFS) whose removal splits off at least two entities
+        on both sides. The thinnest links between the largest clusters come first.
+        """
+        indptr, indices = binary.indptr, binary.indices
+        count = len(nodes)
+        order = np.full(count, -1, dtype=np.int64)
+        low = np.zeros(count, dtype=np.int64)
+        subtree = np.ones(count, dtype=np.int64)
+        found = []
+        counter = 0
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack = [(root, -1, indptr[root])]
+            while stack:
+                node, parent, position = stack[-1]
+                if position < indptr[node + 1]:
+                    stack[-1] = (node, parent, position + 1)
+                    child = indices[position]
+                    if child == parent:
+                        continue
+                    if order[child] == -1:
+                        order[child] = low[child] = counter
+                        counter += 1
+                        stack.append((child, node, indptr[child]))
+                    else:
+                        low[node] = min(low[node], order[child])
+                    continue
+                stack.pop()
+                if parent != -1:
+                    low[parent] = min(low[parent], low[node])
+                    subtree[parent] += subtree[node]
+                    if low[node] > order[parent]:
+                        inner = int(subtree[node])
+                        outer = int(sizes[labels[node]]) - inner
+                        if inner >= 2 and outer >= 2:
+                            found.append((min(inner, outer), parent, node, outer, inner))
+        found.sort(key=lambda item: (-item[0], int(nodes[item[1]]), int(nodes[item[2]])))
+        return [
+            {
+                "link": [self.labels[int(nodes[a])], self.labels[int(nodes[b])]],
+                "degrees": [int(degree[a]), int(degree[b])],
+                "cluster_sizes": [size_a, size_b],
+            }
+            for _, a, b, size_a, size_b in found[:limit]
+        ]
+
+    def _structural_holes(self, weighted, binary, nodes, degree, limit) -> list[dict]:
+        """
+        Burt's constraint c_i = sum_j (p_ij + sum_q p_iq p_qj)^2 over the neighbours j
+        of i, with p the row-normalized tie weights. Low constraint means the
+        broker's contacts are otherwise unconnected.
+        """
+        candidates = np.flatnonzero(degree >= MIN_BROKER_DEGREE)
+        if not len(candidates):
+            return []
+        strength = np.asarray(weighted.sum(axis=1)).ravel()
+        strength[strength == 0] = 1
+        p = sparse.diags(1 / strength) @ weighted
+        indirect = (p @ p).multiply(binary)
+        constraint = np.asarray((p + indirect).power(2).sum(axis=1)).ravel()
+        # Ties among each node's neighbours (triangles), to count the unlinked pairs
+        triangles = np.asarray((binary @ binary).multiply(binary).sum(axis=1)).ravel() / 2
+
+        ranked = candidates[np.lexsort((nodes[candidates], constraint[candidates]))][:limit]
+        holes = []
+        for i in ranked:
+            neighbours = binary.indices[binary.indptr[i]:binary.indptr[i + 1]]
+            neighbours = neighbours[np.lexsort((nodes[neighbours], -degree[neighbours]))]
+            holes.append({
+                "broker": self.labels[int(nodes[i])],
+                "constraint": round(float(constraint[i]), 4),
+                "unlinked_neighbour_pairs": int(degree[i] * (degree[i] - 1) / 2 - triangles[i]),
+                "missing_link": self._missing_link(binary, nodes, neighbours),
+            })
+        return holes
+
+    def _missing_link(self, binary, nodes, neighbours):
+        """
+        The first pair of (degree-ordered) neighbours that are not linked to each other.
+        """
+        for a_pos, a in enumerate(neighbours[:50]):
+            linked = set(binary.indices[binary.indptr[a]:binary.indptr[a + 1]].tolist())
+            for b in neighbours[a_pos + 1:50]:
+                if int(b) not in linked:
+                    return [self.labels[int(nodes[a])], self.labels[int(nodes[b])]]
+        return None
+
+
+def format_gaps(report: dict) -> str:
+    """
+    Compact text rendering of gap_candidates() for the gap analysis prompt.
+    """
+    lines = [
+        f"Graph: {report['entities']} entities, {report['edges']} relations accumulated over {report['runs']} runs; "
+        f"this topic's neighbourhood has {report['subgraph_entities']} entities, {report['subgraph_edges']} links "
+        f"and {report.get('components', 0)} clusters."
+    ]
+    if report["islands"]:
+        lines.append("Disconnected clusters (no link to the main body of work):")
+        lines += [f"- {island['size']} entities: {', '.join(island['entities'])}" for island in report["islands"]]
+    if report["bridges"]:
+        lines.append("Single-link bridges between clusters (thinly connected areas):")
+        lines += [
+            f"- {bridge['link'][0]} -- {bridge['link'][1]} (joins clusters of {bridge['cluster_sizes'][0]} "
+            f"and {bridge['cluster_sizes'][1]} entities)"
+            for bridge in report["bridges"]
+        ]
+    if report["structural_holes"]:
+        lines.append("Structural holes (brokers whose neighbours are not linked to each other):")
+        for hole in report["structural_holes"]:
+            line = (f"- {hole['broker']}: {hole['unlinked_neighbour_pairs']} unlinked neighbour pairs "
+                    f"(constraint {hole['constraint']})")
+            if hole["missing_link"]:
+                line += f"; e.g. no link between {hole['missing_link'][0]} and {hole['missing_link'][1]}"
+            lines.append(line)
+    if len(lines) == 1:
+        lines.append("No structural gap candidates found.")
+    return "\n".join(lines)
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_knowledge_graph() -> KnowledgeGraph:
+    """
+    Returns the process-wide graph, loaded from Config.KNOWLEDGE_GRAPH_PATH if it exists.
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                path = Config.KNOWLEDGE_GRAPH_PATH
+                _graph = KnowledgeGraph.load(path) if os.path.exists(path) else KnowledgeGraph()
+    return _graph
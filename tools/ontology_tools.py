@@ -1,28 +1,206 @@
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+
 from google.adk.tools.function_tool import FunctionTool
+from scientific_research_system.config import Config
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    """
+    Lower-cases and collapses punctuation/whitespace to single spaces.
+    """
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class AhoCorasick:
+    """
+    Multi-pattern automaton: finds every pattern occurring in a text in a single
+    pass, in time linear in the text length (plus matches), independent of the
+    number of patterns.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append(pattern_id)
+        self.lengths = [len(p) for p in patterns]
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """
+        Yields (start, end, pattern_id) for every occurrence.
+        """
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for pattern_id in self.output[node]:
+                yield i + 1 - self.lengths[pattern_id], i + 1, pattern_id
+
+
+class TfidfIndex:
+    """
+    Character-trigram TF-IDF vectors with an inverted index for nearest-neighbour
+    lookup. Only the postings of the query's own trigrams are visited, and of each
+    posting list (sorted by weight) only the first MAX_POSTINGS_PER_GRAM entries,
+    so a lookup costs the same however large the ontology grows. Common trigrams
+    have a low IDF, so the documents they would add contribute little to the score.
+    """
+
+    MAX_POSTINGS_PER_GRAM = 256
+
+    def __init__(self, documents: list[str]):
+        term_grams = [self._grams(doc) for doc in documents]
+        df = Counter(g for grams in term_grams for g in grams)
+        n_docs = len(documents)
+        self.idf = {g: math.log((1 + n_docs) / (1 + count)) + 1 for g, count in df.items()}
+        self.postings = defaultdict(list)
+        for doc_id, grams in enumerate(term_grams):
+            weights = {g: tf * self.idf[g] for g, tf in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for g, w in weights.items():
+                self.postings[g].append((doc_id, w / norm))
+        for postings in self.postings.values():
+            postings.sort(key=lambda posting: -posting[1])
+
+    @staticmethod
+    def _grams(text: str) -> Counter:
+        grams = Counter()
+        for word in text.split():
+            padded = f" {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def nearest(self, text: str):
+        """
+        Returns (doc_id, cosine similarity) of the closest document, or (None, 0.0).
+        """
+        weights = {g: tf * self.idf[g] for g, tf in self._grams(text).items() if g in self.idf}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if not norm:
+            return None, 0.0
+        scores = defaultdict(float)
+        for g, w in weights.items():
+            for doc_id, doc_w in self.postings[g][:self.MAX_POSTINGS_PER_GRAM]:
+                scores[doc_id] += w * doc_w
+        doc_id, score = max(scores.items(), key=lambda item: item[1])
+        return doc_id, score / norm
+
+
+class OntologyMatcher:
+    """
+    Domain-to-abstract-problem ontology compiled for fast lookup:
+    exact term matches via Aho-Corasick, fuzzy matches via TF-IDF.
+    """
+
+    def __init__(self, mappings: list[dict]):
+        self.terms = []
+        self.problems = []
+        for entry in mappings:
+            for term in entry["terms"]:
+                self.terms.append(_normalize(term))
+                self.problems.append(entry["abstract_problem"])
+        self.automaton = AhoCorasick(self.terms)
+        self.tfidf = TfidfIndex(self.terms)
+
+    @classmethod
+    def load(cls, path: str) -> "OntologyMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["mappings"])
+
+    def match(self, problem_description: str) -> dict:
+        """
+        Returns the best match as a dict with `abstract_problem`, `term`, `method`
+        ("exact", "fuzzy" or "none") and `score`.
+        """
+        text = f" {_normalize(problem_description)} "
+        best = None
+        for start, end, term_id in self.automaton.iter_matches(text):
+            # Whole words only; the longest (most specific) term wins
+            if text[start - 1] != " " or text[end] != " ":
+                continue
+            if best is None or len(self.terms[term_id]) > len(self.terms[best]):
+                best = term_id
+        if best is not None:
+            return {"abstract_problem": self.problems[best], "term": self.terms[best],
+                    "method": "exact", "score": 1.0}
+
+        term_id, score = self.tfidf.nearest(text.strip())
+        if term_id is not None and score >= Config.ONTOLOGY_FUZZY_THRESHOLD:
+            return {"abstract_problem": self.problems[term_id], "term": self.terms[term_id],
+                    "method": "fuzzy", "score": round(score, 4)}
+        return {"abstract_problem": None, "term": None, "method": "none", "score": round(score, 4)}
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_ontology_matcher() -> OntologyMatcher:
+    """
+    Returns the matcher compiled once from Config.ONTOLOGY_PATH.
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = OntologyMatcher.load(Config.ONTOLOGY_PATH)
+    return _matcher
+
+
+@lru_cache(maxsize=4096)
+def _match_cached(normalized_description: str) -> dict:
+    return get_ontology_matcher().match(normalized_description)
+
+
+def match_problem(problem_description: str) -> dict:
+    """
+    Cached ontology lookup returning match details (term, method, score).
+    """
+    return dict(_match_cached(_normalize(problem_description)))
+
 
 def canonicalize_problem(problem_description: str):
     """
-    Converts specific domain jargon into a mathematical abstract problem.
-    (Simulates an LLM-based ontology mapper).
-    """
-    problem_lower = problem_description.lower()
-    
-    # Mock mappings
-    mappings = {
-        "protein folding": "3D structural optimization in continuous space",
-        "traffic flow": "Fluid dynamics optimization on a graph",
-        "market prediction": "Time-series forecasting with non-stationary distributions",
-        "gene editing": "Sequence pattern matching and substitution",
-        "climate modeling": "Partial differential equation solving on a sphere"
-    }
-    
-    for key, value in mappings.items():
-        if key in problem_lower:
-            return value
-            
+    Converts specific domain jargon into a mathematical abstract problem
+    using the domain ontology (exact term match, then fuzzy TF-IDF match).
+    """
+    match = match_problem(problem_description)
+    if match["abstract_problem"]:
+        return match["abstract_problem"]
+
     return f"Abstract optimization problem based on: {problem_description}"
 
 canonicalize_tool = FunctionTool(
     func=canonicalize_problem
 )
-
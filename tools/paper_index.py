@@ -0,0 +1,370 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from scientific_research_system.config import Config
+
+# BM25 parameters (Robertson/Lucene defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title terms count this many times, so a topic in the title outranks a passing mention
+TITLE_WEIGHT = 2
+# Merge this many segments into one once there are that many (keeps segment count logarithmic)
+MERGE_FACTOR = 8
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their this "
+    "to was we were which with via using based towards toward new study".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """
+    LEB128 varint encoding of non-negative integers, vectorized.
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b""
+    sizes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        sizes += values >= (np.uint64(1) << np.uint64(7 * k))
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    out = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    for k in range(int(sizes.max())):
+        has = sizes > k
+        byte = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[offsets[has] + k] = (byte | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """
+    Inverse of encode_varints.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = np.arange(len(raw)) - starts[group]
+    weights = (raw & 0x7F).astype(np.float64) * np.exp2(7 * shift)
+    return np.bincount(group, weights=weights, minlength=len(ends)).astype(np.int64)
+
+
+def encode_postings(doc_ids: np.ndarray, freqs: np.ndarray) -> bytes:
+    """
+    Compact postings list: delta-encoded (sorted) doc IDs followed by term frequencies, all varints.
+    """
+    return encode_varints(np.diff(doc_ids, prepend=0)) + encode_varints(freqs)
+
+
+def decode_postings(data: bytes, df: int) -> tuple[np.ndarray, np.ndarray]:
+    values = decode_varints(data)
+    return np.cumsum(values[:df]), values[df:]
+
+
+class PaperIndex:
+    """
+    Incremental BM25 inverted index over harvested papers, stored in SQLite.
+
+    Papers are immutable: each batch of new papers is written as a new segment
+    (one compressed postings blob per term), so adds never rewrite existing
+    postings. Once MERGE_FACTOR segments accumulate, the smallest ones are
+    merged into one, like a log-structured merge tree. Searches score every
+    segment's postings with vectorized BM25 and keep the best documents.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.PAPER_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._lengths = np.zeros(0, dtype=np.float64)
+        self._lengths_lock = threading.Lock()
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                doc_id INTEGER PRIMARY KEY,
+                paper_id TEXT NOT NULL UNIQUE,
+                published TEXT,
+                title TEXT NOT NULL,
+                authors TEXT,
+                summary TEXT,
+                length INTEGER NOT NULL,
+                added_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, docs INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                df INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (term, segment)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    # ------------------------------------------------------------------ write
+
+    def add(self, papers: list[dict]) -> int:
+        """
+        Indexes papers (dicts with `paper_id`, `title`, and optionally `published`,
+        `authors` and `summary`) as one new segment. Papers already in the index
+        are skipped. Returns the number of papers added.
+        """
+        with self._write_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._add(conn, papers)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if added:
+                self._maybe_merge()
+        return added
+
+    def _add(self, conn: sqlite3.Connection, papers: list[dict]) -> int:
+        postings = {}
+        docs = 0
+        seen = set()
+        for paper in papers:
+            paper_id = paper["paper_id"]
+            if paper_id in seen or conn.execute("SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)).fetchone():
+                continue
+            seen.add(paper_id)
+            terms = tokenize(paper["title"]) * TITLE_WEIGHT + tokenize(paper.get("summary") or "")
+            if not terms:
+                continue
+            cursor = conn.execute(
+                "INSERT INTO papers(paper_id, published, title, authors, summary, length, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (paper_id, paper.get("published"), paper["title"], paper.get("authors"),
+                 paper.get("summary"), len(terms), time.time()),
+            )
+            doc_id = cursor.lastrowid
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(count)
+            docs += 1
+        if docs:
+            segment = conn.execute(
+                "INSERT INTO segments(docs, created_at) VALUES (?, ?)", (docs, time.time())
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO postings(term, segment, df, data) VALUES (?, ?, ?, ?)",
+                [
+                    (term, segment, len(ids), encode_postings(np.array(ids), np.array(freqs)))
+                    for term, (ids, freqs) in postings.items()
+                ],
+            )
+        return docs
+
+    def _maybe_merge(self):
+        conn = self._connect()
+        segments = conn.execute("SELECT segment FROM segments ORDER BY docs, segment").fetchall()
+        if len(segments) < MERGE_FACTOR:
+            return
+        self.merge([s for (s,) in segments[:MERGE_FACTOR]])
+
+    def merge(self, segments: list[int] = None):
+        """
+        Merges `segments` (default: all of them) into a single new segment.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if segments is None:
+                segments = [s for (s,) in conn.execute("SELECT segment FROM segments")]
+            if len(segments) < 2:
+                conn.execute("COMMIT")
+                return
+            marks = ",".join("?" * len(segments))
+            docs = conn.execute(f"SELECT COALESCE(SUM(docs), 0) FROM segments WHERE segment IN ({marks})",
+                                segments).fetchone()[0]
+            merged = conn.execute(
+                "INSERT INTO segments(docs, created_at) VALUES (?, ?)", (docs, time.time())
+            ).lastrowid
+            rows = conn.execute(
+                f"SELECT term, df, data FROM postings WHERE segment IN ({marks}) ORDER BY term", segments
+            ).fetchall()
+            batch = []
+            i = 0
+            while i < len(rows):
+                term = rows[i][0]
+                ids, freqs = [], []
+                while i < len(rows) and rows[i][0] == term:
+                    doc_ids, tf = decode_postings(rows[i][2], rows[i][1])
+                    ids.append(doc_ids)
+                    freqs.append(tf)
+                    i += 1
+                ids = np.concatenate(ids)
+                freqs = np.concatenate(freqs)
+                order = np.argsort(ids, kind="stable")
+                batch.append((term, merged, len(ids), encode_postings(ids[order], freqs[order])))
+            conn.execute(f"DELETE FROM postings WHERE segment IN ({marks})", segments)
+            conn.execute(f"DELETE FROM segments WHERE segment IN ({marks})", segments)
+            conn.executemany("INSERT INTO postings(term, segment, df, data) VALUES (?, ?, ?, ?)", batch)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------- read
+
+    def _doc_lengths(self, conn: sqlite3.Connection, max_doc_id: int) -> np.ndarray:
+        """
+        Document lengths indexed by doc ID (covering at least `max_doc_id`),
+        loaded incrementally as the index grows.
+        """
+        with self._lengths_lock:
+            known = len(self._lengths) - 1
+            if max_doc_id > known:
+                lengths = np.zeros(max_doc_id + 1, dtype=np.float64)
+                lengths[:len(self._lengths)] = self._lengths
+                for doc_id, length in conn.execute(
+                    "SELECT doc_id, length FROM papers WHERE doc_id > ?", (max(known, 0),)
+                ):
+                    lengths[doc_id] = length
+                self._lengths = lengths
+            return self._lengths
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Best BM25 matches for `query`. Each result carries its score and
+        `coverage`, the fraction of the query's terms it contains.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        conn = self._connect()
+        # One read transaction: statistics, postings and papers all come from the same
+        # snapshot, whatever adds and merges other connections commit meanwhile
+        conn.execute("BEGIN")
+        try:
+            return self._search(conn, terms, limit)
+        finally:
+            conn.execute("COMMIT")
+
+    def _search(self, conn: sqlite3.Connection, terms: list[str], limit: int) -> list[dict]:
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM papers").fetchone()
+        if not count:
+            return []
+        avg_length = total / count
+
+        postings = []
+        for index, term in enumerate(terms):
+            rows = conn.execute("SELECT df, data FROM postings WHERE term = ?", (term,)).fetchall()
+            if not rows:
+                continue
+            df = sum(r[0] for r in rows)
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for segment_df, data in rows:
+                postings.append((index, idf, *decode_postings(data, segment_df)))
+        if not postings:
+            return []
+        lengths = self._doc_lengths(conn, max(int(doc_ids.max()) for _, _, doc_ids, _ in postings))
+
+        doc_parts, score_parts, term_parts = [], [], []
+        for index, idf, doc_ids, tf in postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_ids] / avg_length)
+            doc_parts.append(doc_ids)
+            score_parts.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+            term_parts.append(np.full(len(doc_ids), index))
+
+        doc_ids, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        matched = np.bincount(inverse)
+        top = np.argsort(-scores, kind="stable")[:limit]
+
+        marks = ",".join("?" * len(top))
+        rows = {
+            row[0]: row[1:]
+            for row in conn.execute(
+                f"SELECT doc_id, paper_id, published, title, authors, summary FROM papers WHERE doc_id IN ({marks})",
+                [int(doc_ids[i]) for i in top],
+            )
+        }
+        results = []
+        for i in top:
+            paper_id, published, title, authors, summary = rows[int(doc_ids[i])]
+            results.append({
+                "paper_id": paper_id, "published": published, "title": title, "authors": authors,
+                "summary": summary, "score": round(float(scores[i]), 4),
+                "coverage": round(int(matched[i]) / len(terms), 4),
+            })
+        return results
+
+    def known(self, paper_ids: list[str]) -> set:
+        """
+        The subset of `paper_ids` (arXiv IDs without version) that are in the index.
+        """
+        paper_ids = list(dict.fromkeys(paper_ids))
+        found = set()
+        conn = self._connect()
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(paper_ids), 500):
+            chunk = paper_ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(row[0] for row in conn.execute(
+                f"SELECT paper_id FROM papers WHERE paper_id IN ({marks})", chunk
+            ))
+        return found
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        papers = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        segments = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        terms, postings_bytes = conn.execute(
+            "SELECT COUNT(DISTINCT term), COALESCE(SUM(length(data)), 0) FROM postings"
+        ).fetchone()
+        return {"papers": papers, "segments": segments, "terms": terms, "postings_bytes": postings_bytes}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_paper_index() -> PaperIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PaperIndex()
+    return _index
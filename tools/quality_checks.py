@@ -0,0 +1,318 @@
+import re
+
+import numpy as np
+from scientific_research_system.config import Config
+from scientific_research_system.tools.citation_store import get_citation_store
+from scientific_research_system.tools.citation_tools import audit_citation_graph
+from scientific_research_system.tools.code_tools import extract_code_blocks
+from scientific_research_system.tools.corpus_store import get_corpus_store
+from scientific_research_system.tools.dependency_resolver import resolve_requirements
+from scientific_research_system.tools.corpus_tools import (
+    check_paper_statistics, extract_paper_code, extract_test_results
+)
+from scientific_research_system.tools.forensics_tools import (
+    MIN_BENFORD_SAMPLE, check_p_value_batch
+)
+from scientific_research_system.tools.paper_index import get_paper_index
+
+# Share of each fraud risk signal in the FraudRiskScore (0-100)
+FRAUD_WEIGHTS = {"inconsistent_p_values": 35, "decision_errors": 35, "benford": 20, "p_hacking": 10}
+# Share of each reproducibility signal in the confidence score (0-100)
+REPRODUCIBILITY_WEIGHTS = {"code": 40, "hyperparameters": 30, "dependencies": 20, "versions": 10}
+# Hyperparameters that earn the full hyperparameter share
+EXPECTED_HYPERPARAMETERS = 5
+# Cap on flagged items and code listed in a report (counts are always exact)
+MAX_REPORTED_ITEMS = 20
+MAX_CODE_CHARS = 3000
+
+# arXiv identifiers: "arXiv:2401.00001", "arXiv ID: 2401.00001v2", arxiv.org links, and bare
+# five-digit IDs like "2401.00001" (four-digit bare IDs are too easily confused with numbers)
+_ARXIV_ID = re.compile(
+    r"(?:(?P<prefix>\barXiv(?:\s+ID)?\s*:?\s*|arxiv\.org/(?:abs|pdf|html)/)|(?<![\w./]))"
+    r"(?P<id>\d{4}\.\d{4,5})(?:v\d+)?(?![\w.]*\d)",
+    re.IGNORECASE,
+)
+# New-style identifiers (YYMM.NNNN) started in April 2007; five-digit numbers in January 2015
+_FIRST_ARXIV_MONTH = 704
+_FIVE_DIGIT_MONTH = 1501
+
+# Prose and import names of common packages -> distribution name
+KNOWN_PACKAGES = {
+    "torch": "torch", "pytorch": "torch", "torchvision": "torchvision", "tensorflow": "tensorflow",
+    "keras": "keras", "jax": "jax", "flax": "flax", "numpy": "numpy", "scipy": "scipy", "pandas": "pandas",
+    "sklearn": "scikit-learn", "scikit-learn": "scikit-learn", "transformers": "transformers",
+    "datasets": "datasets", "matplotlib": "matplotlib", "networkx": "networkx", "cv2": "opencv-python",
+    "opencv": "opencv-python", "pil": "pillow", "pillow": "pillow", "xgboost": "xgboost",
+    "lightgbm": "lightgbm", "statsmodels": "statsmodels", "gym": "gym", "gymnasium": "gymnasium",
+}
+# Names that are ordinary words in ML prose: they only count in code or with a version
+_AMBIGUOUS_NAMES = {"transformers", "datasets", "gym", "keras", "pillow", "opencv", "flax"}
+_PACKAGE_NAMES = "|".join(sorted(map(re.escape, KNOWN_PACKAGES), key=len, reverse=True))
+# "torch==1.9.0", "numpy<1.22", "PyTorch 1.9", "TensorFlow v2.4", or a bare mention
+_PACKAGE_MENTION = re.compile(
+    rf"(?<![\w-])({_PACKAGE_NAMES})(?:\s*(==|>=|<=|~=|<|>)\s*|\s+v?(?=\d+\.\d))?(\d+(?:\.\d+)+)?(?![\w-])",
+    re.IGNORECASE,
+)
+_IMPORT = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+_PYTHON_VERSION = re.compile(r"\bPython\s*(3\.\d{1,2})\b")
+
+_VALUE = r"(?:\s+(?:of|was|is|set\s+to|equal\s+to)|\s*[=:])?\s*"
+_FLOAT = r"(\d*\.?\d+(?:e-?\d+)?)"
+HYPERPARAMETERS = {
+    "learning_rate": re.compile(rf"(?:\blearning[\s-]rate|\blr\b){_VALUE}{_FLOAT}", re.IGNORECASE),
+    "batch_size": re.compile(rf"\bbatch[\s-]size{_VALUE}(\d+)", re.IGNORECASE),
+    "epochs": re.compile(r"\b(\d+)\s+(?:training\s+)?epochs\b|\bepochs" + _VALUE + r"(\d+)", re.IGNORECASE),
+    "dropout": re.compile(rf"\bdropout(?:\s+(?:rate|probability))?{_VALUE}(0?\.\d+)", re.IGNORECASE),
+    "weight_decay": re.compile(rf"\bweight[\s-]decay{_VALUE}{_FLOAT}", re.IGNORECASE),
+    "optimizer": re.compile(r"\b(AdamW|Adam|SGD|RMSprop|Adagrad|Adafactor|LAMB)\b"),
+    "seed": re.compile(rf"\b(?:random\s+)?seed{_VALUE}(\d+)", re.IGNORECASE),
+    "hidden_size": re.compile(rf"\bhidden[\s-](?:size|dimension|units){_VALUE}(\d+)", re.IGNORECASE),
+}
+
+
+def find_arxiv_ids(text: str) -> list[str]:
+    """
+    arXiv IDs (without version) mentioned in a text, in order of first mention.
+    """
+    return list(dict.fromkeys(
+        m.group("id") for m in _ARXIV_ID.finditer(text or "") if m.group("prefix") or len(m.group("id")) == 10
+    ))
+
+
+def _arxiv_id_problem(paper_id: str, this_month: int):
+    """
+    Why an arXiv ID cannot be genuine (malformed or dated in the future), or None.
+    """
+    month = int(paper_id[:4])
+    digits = len(paper_id) - 5
+    if not 1 <= month % 100 <= 12 or month < _FIRST_ARXIV_MONTH:
+        return "malformed arXiv ID (no such month)"
+    if (digits == 5) != (month >= _FIVE_DIGIT_MONTH):
+        return "malformed arXiv ID (wrong number of digits for its month)"
+    if month > this_month:
+        return "arXiv ID dated after today"
+    return None
+
+
+def _known_papers(paper_ids: list[str]) -> set:
+    """
+    IDs found in any local source: the paper index, the full-text corpus or the citation store.
+    """
+    known = set()
+    if Config.PAPER_INDEX_ENABLED and paper_ids:
+        known |= get_paper_index().known(paper_ids)
+    for store in (get_corpus_store(), get_citation_store()):
+        if store is not None:
+            known |= {paper_id for paper_id in paper_ids if paper_id in store}
+    return known
+
+
+def _corpus_papers(text: str, run_papers: set) -> list[str]:
+    """
+    Papers of this run (cited in the text or returned by its searches) that are in the local corpus.
+    """
+    store = get_corpus_store()
+    if store is None:
+        return []
+    candidates = find_arxiv_ids(text) + sorted(run_papers or ())
+    return [paper_id for paper_id in dict.fromkeys(candidates) if paper_id in store]
+
+
+def audit_citations(text: str, run_papers: set = None, today: str = None) -> dict:
+    """
+    Citation integrity of the mining output, without a model.
+
+    Every arXiv ID cited in `text` is checked for being malformed or dated in
+    the future. When this run's search results are known (`run_papers`), a
+    cited ID that no search returned and no local source knows is flagged as a
+    possible hallucination. Cited papers in the local citation store get their
+    reference lists audited for time-travelling citations. The score is the
+    percentage of checked citations that are valid.
+    """
+    cited = find_arxiv_ids(text)
+    this_month = np.datetime64(today or "today", "M").astype(object)
+    this_month = (this_month.year % 100) * 100 + this_month.month
+    known = set(run_papers or ()) | _known_papers(cited)
+
+    flagged = []
+    for paper_id in cited:
+        problem = _arxiv_id_problem(paper_id, this_month)
+        if problem is None and run_papers and paper_id not in known:
+            problem = "not returned by any search of this run (possible hallucination)"
+        if problem:
+            flagged.append({"paper_id": paper_id, "reason": problem})
+
+    checked = len(cited)
+    bad = len(flagged)
+    store = get_citation_store()
+    in_store = [paper_id for paper_id in cited if store is not None and paper_id in store]
+    graph = None
+    if in_store:
+        graph = audit_citation_graph(in_store)
+        checked += graph["edges_checked"] - graph["undated_edges"]
+        bad += graph["anomalies"]
+        flagged += [
+            {"paper_id": pair["citing"].get("paper_id"), "cites": pair["cited"].get("paper_id"),
+             "reason": "cites a paper published after it"}
+            for pair in graph["flagged_citations"]
+        ]
+
+    score = round(100 * (1 - bad / checked)) if checked else 100
+    if not checked:
+        report = "No arXiv citations or reference lists could be checked in the mining output."
+    else:
+        report = (f"Checked {len(cited)} cited arXiv IDs"
+                  + (f" and {graph['edges_checked']} references of {len(in_store)} papers in the citation store" if graph else "")
+                  + f": {bad} problem(s) found.")
+        if not run_papers:
+            report += " The run's search results were not available, so IDs were not checked for hallucination."
+    return {
+        "score": score,
+        "flagged_citations": flagged[:MAX_REPORTED_ITEMS],
+        "audit_report": report,
+        "checked": checked,
+    }
+
+
+def assess_fraud_risk(text: str, run_papers: set = None, alpha: float = 0.05) -> dict:
+    """
+    Statistical forensics of the mining output and of the run's papers in the local corpus, without a model.
+
+    APA-style results are checked with `check_p_value_batch`. Benford's law is only
+    applied to the full texts (their reported measurements, at least MIN_BENFORD_SAMPLE):
+    the numbers in search records and abstracts are dates, IDs, percentages and
+    counts, not a population Benford's law describes.
+    The FraudRiskScore is a weighted sum (FRAUD_WEIGHTS) of the inconsistent and
+    decision-error p-value rates, the worst Benford risk and the share of
+    significant p-values just below 0.05 (p-hacking).
+    """
+    buffer = (text or "").encode("utf-8")
+    p_values = check_p_value_batch(extract_test_results(buffer, "mining_output"), alpha)
+    benford = {}
+    results = list(p_values["results"])
+    checked = p_values["checked"]
+    inconsistencies = p_values["inconsistencies"]
+    decision_errors = p_values["decision_errors"]
+
+    papers = _corpus_papers(text, run_papers)
+    for paper_id in papers:
+        paper = check_paper_statistics(paper_id, alpha)
+        checked += paper["p_values"]["checked"]
+        inconsistencies += paper["p_values"]["inconsistencies"]
+        decision_errors += paper["p_values"]["decision_errors"]
+        results += [dict(r, label=f"{paper_id}:{r['label']}") for r in paper["p_values"]["results"]]
+        if "risk_score" in paper["benford"] and not paper["benford"].get("small_sample"):
+            benford[paper_id] = paper["benford"]
+
+    # Reported significant p-values ("p = .049") bunched just below alpha
+    significant = [r["reported_p"] for r in results if "error" not in r and r["comparison"] == "=" and r["reported_p"] <= alpha]
+    just_below = [p for p in significant if p > alpha - 0.01]
+    p_hacking = len(just_below) / len(significant) if len(significant) >= 3 else 0.0
+
+    benford_risk = max((b["risk_score"] for b in benford.values()), default=0)
+    score = (
+        FRAUD_WEIGHTS["inconsistent_p_values"] * (inconsistencies / checked if checked else 0)
+        + FRAUD_WEIGHTS["decision_errors"] * (decision_errors / checked if checked else 0)
+        + FRAUD_WEIGHTS["benford"] * benford_risk / 100
+        + FRAUD_WEIGHTS["p_hacking"] * p_hacking
+    )
+
+    red_flags = [
+        f"{r['label']}: reported p {r['comparison']} {r['reported_p']} but computed p = {r['calculated_p']}"
+        + (" (changes significance)" if r["decision_error"] else "")
+        for r in results if "error" not in r and not r["consistent"]
+    ][:MAX_REPORTED_ITEMS]
+    red_flags += [f"{name}: numbers deviate from Benford's law (risk {b['risk_score']})"
+                  for name, b in benford.items() if b["risk_score"] > 50]
+    if p_hacking >= 0.5:
+        red_flags.append(f"{len(just_below)} of {len(significant)} significant p-values lie just below {alpha} (possible p-hacking)")
+
+    analysis = (
+        f"Checked {checked} reported test results ({inconsistencies} inconsistent, {decision_errors} decision errors)"
+        f" in the mining output and {len(papers)} full-text papers from the local corpus. "
+        + (f"Benford's law was applied to {len(benford)} sample(s), worst risk {benford_risk}."
+           if benford else "Benford's law was not applied: no full text with at least "
+                           f"{MIN_BENFORD_SAMPLE} reported measurements.")
+    )
+    return {
+        "FraudRiskScore": round(score),
+        "red_flags": red_flags,
+        "forensic_analysis": analysis,
+        "checked": checked,
+    }
+
+
+def _dependencies(text: str, code: list[str]) -> dict:
+    """
+    PEP 508 requirements for the packages named in prose (with a version when stated) and imported in code.
+    """
+    requirements = {}
+    for match in _PACKAGE_MENTION.finditer(text):
+        name, operator, version = match.group(1).lower(), match.group(2), match.group(3)
+        distribution = KNOWN_PACKAGES[name]
+        if version:
+            # "PyTorch 1.9" means any 1.9.x release
+            spec = f"{operator}{version}" if operator else f"=={version}" + (".*" if version.count(".") == 1 else "")
+            requirements[distribution] = distribution + spec
+        elif name not in _AMBIGUOUS_NAMES:
+            requirements.setdefault(distribution, distribution)
+    for block in code:
+        for module in _IMPORT.findall(block):
+            distribution = KNOWN_PACKAGES.get(module.lower())
+            if distribution:
+                requirements.setdefault(distribution, distribution)
+    return requirements
+
+
+def assess_reproducibility(text: str, run_papers: set = None) -> dict:
+    """
+    Reproducibility of the mining output and of the run's papers in the local corpus, without a model.
+
+    Code blocks are extracted, hyperparameters are matched with HYPERPARAMETERS,
+    and the packages named in prose or imported in code are resolved with
+    `resolve_requirements`. The confidence score is a weighted sum
+    (REPRODUCIBILITY_WEIGHTS) of code being available, the hyperparameters found,
+    the dependencies resolving, and the share of dependencies with a version.
+    The dependency share is only awarded for a resolution against the local
+    package index (PACKAGE_INDEX_PATH); without one the dependencies are "not verified".
+    """
+    text = text or ""
+    code = extract_code_blocks(text)
+    papers = _corpus_papers(text, run_papers)
+    for paper_id in papers:
+        code += [block["code"] for block in extract_paper_code(paper_id)]
+
+    hyperparameters = {}
+    for name, pattern in HYPERPARAMETERS.items():
+        values = [next(v for v in m.groups() if v) for m in pattern.finditer(text)]
+        for block in code:
+            values += [next(v for v in m.groups() if v) for m in pattern.finditer(block)]
+        if values:
+            hyperparameters[name] = list(dict.fromkeys(values))[:5]
+
+    requirements = _dependencies(text, code)
+    dependencies = sorted(requirements.values())
+    python_version = next(iter(_PYTHON_VERSION.findall(text)), None)
+    environment = resolve_requirements(dependencies, python_version) if dependencies else None
+    if dependencies and environment is None:
+        environment = {"verified": False, "message": "Dependencies not verified: no package index (PACKAGE_INDEX_PATH)."}
+    versioned = sum(1 for name, spec in requirements.items() if spec != name)
+
+    score = (
+        REPRODUCIBILITY_WEIGHTS["code"] * bool(code)
+        + REPRODUCIBILITY_WEIGHTS["hyperparameters"] * min(1.0, len(hyperparameters) / EXPECTED_HYPERPARAMETERS)
+        + REPRODUCIBILITY_WEIGHTS["dependencies"] * bool(environment and environment.get("resolved"))
+        + REPRODUCIBILITY_WEIGHTS["versions"] * (versioned / len(dependencies) if dependencies else 0)
+    )
+    return {
+        "environment_config": {
+            "hyperparameters": hyperparameters,
+            "dependencies": dependencies,
+            "python_version": python_version,
+            "validation": environment,
+            "code_blocks": len(code),
+            "corpus_papers": papers,
+        },
+        "pseudo_code": "\n\n".join(code)[:MAX_CODE_CHARS],
+        "confidence_score": round(score),
+    }
@@ -0,0 +1,239 @@
+import asyncio
+import random
+import re
+import threading
+import time
+
+from scientific_research_system.config import Config
+
+# "retryDelay": "17s" (google.rpc.RetryInfo) or "Please retry in 17.2s"
+_RETRY_DELAY = re.compile(r"retry(?:Delay['\"]?\s*[:=]\s*['\"]?| in |[- ]after[:= ]\s*)(\d+(?:\.\d+)?)\s*s", re.I)
+
+
+class RateLimited(RuntimeError):
+    """
+    No call slot would be free before the caller's deadline.
+    """
+
+    def __init__(self, name: str, wait: float):
+        super().__init__(f"{name} rate limit: no slot for {wait:.1f}s")
+        self.name = name
+        self.wait = wait
+
+
+class RateLimiter:
+    """
+    Process-wide limiter shared by every caller of one API.
+
+    - Token buckets for requests per minute and (optionally) tokens per minute.
+      A limit of 0 disables that bucket.
+    - AIMD concurrency: the number of calls in flight grows by one slot per
+      window of successful calls, and is halved on every throttling response.
+    - A throttling response with a retry hint pauses every caller until the
+      hinted time, since the exhausted quota is shared.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float = 0, max_concurrency: int = 4):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.requests_left = float(rpm)
+        self.tokens_left = float(tpm)
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.calls = 0
+        self.waited = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self.requests_left = min(self.rpm, self.requests_left + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self.tokens_left = min(self.tpm, self.tokens_left + elapsed * self.tpm / 60.0)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """
+        Takes a slot if one is available and returns 0, otherwise returns how long to wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.in_flight >= int(self.concurrency):
+                return 0.05
+            waits = []
+            if self.rpm and self.requests_left < 1:
+                waits.append((1 - self.requests_left) * 60.0 / self.rpm)
+            # A request larger than the whole bucket goes through once the bucket is full
+            needed = min(tokens, self.tpm)
+            if self.tpm and self.tokens_left < needed:
+                waits.append((needed - self.tokens_left) * 60.0 / self.tpm)
+            if waits:
+                return max(waits)
+            if self.rpm:
+                self.requests_left -= 1
+            if self.tpm:
+                self.tokens_left -= tokens
+            self.in_flight += 1
+            self.calls += 1
+            return 0.0
+
+    def acquire(self, tokens: int = 0, deadline: float = None):
+        """
+        Blocks until a call (estimated to use `tokens` tokens) may start.
+        Raises RateLimited instead of waiting past `deadline` (time.monotonic()).
+        """
+        while True:
+            delay = self._try_acquire(tokens)
+            if not delay:
+                return
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise RateLimited(self.name, delay)
+            self.waited += delay
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0):
+        """
+        Awaits until a call (estimated to use `tokens` tokens) may start.
+        """
+        while True:
+            delay = self._try_acquire(tokens)
+            if not delay:
+                return
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+    def release(self, reserved: int = 0, used: int = None, throttled: bool = False, retry_after: float = None):
+        """
+        Ends a call. `used` corrects the token estimate made at acquire time;
+        `throttled` marks a 429 response (with the server's `retry_after` hint, if any).
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if self.tpm and used is not None:
+                self.tokens_left -= used - reserved
+            if throttled:
+                self.throttled += 1
+                self.concurrency = max(1.0, self.concurrency / 2)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+                # The server disagrees with our budget: start the next window empty
+                self.requests_left = min(self.requests_left, 0.0)
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "in_flight": self.in_flight,
+                "concurrency": round(self.concurrency, 2),
+                "waited_seconds": round(self.waited, 2),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """
+    Returns the shared limiter for "gemini", "arxiv" or "web", configured from Config.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                if name == "gemini":
+                    limiter = RateLimiter(name, Config.GEMINI_RPM, Config.GEMINI_TPM, Config.GEMINI_MAX_CONCURRENCY)
+                elif name == "arxiv":
+                    limiter = RateLimiter(name, Config.ARXIV_RPM, max_concurrency=Config.SEARCH_MAX_IN_FLIGHT)
+                elif name == "web":
+                    limiter = RateLimiter(name, Config.WEB_RPM, max_concurrency=Config.SEARCH_MAX_IN_FLIGHT)
+                else:
+                    raise ValueError(f"Unknown rate limiter '{name}'.")
+                _limiters[name] = limiter
+    return limiter
+
+
+def is_rate_limit_error(error) -> bool:
+    """
+    True for HTTP 429 / RESOURCE_EXHAUSTED / rate-limit errors from any client.
+    """
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "resource_exhausted", "ratelimit", "rate limit"))
+
+
+def retry_after_seconds(error):
+    """
+    The server's retry hint in seconds (Retry-After header, RetryInfo.retryDelay,
+    or "retry in Ns" in the message), or None.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    match = _RETRY_DELAY.search(f"{getattr(error, 'details', '')} {error}")
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """
+    Server hint when there is one, otherwise capped exponential backoff with full jitter.
+    """
+    if retry_after:
+        return min(retry_after, Config.RATE_LIMIT_MAX_BACKOFF)
+    return random.uniform(0, min(Config.RATE_LIMIT_MAX_BACKOFF, 2.0 ** attempt))
+
+
+def rate_limited_call(name: str, fn, throttled_result=None, retries: int = None, deadline: float = None):
+    """
+    Runs fn() under the named limiter, retrying on rate-limit errors (or results
+    for which `throttled_result(result)` is true) with backoff, up to `retries`
+    times (RATE_LIMIT_MAX_RETRIES by default). With retries=0 the call only waits
+    for a slot, and a throttled response is reported to the limiter and passed on
+    to the caller. Raises RateLimited if no slot is free before `deadline`.
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return fn()
+    if retries is None:
+        retries = Config.RATE_LIMIT_MAX_RETRIES
+    limiter = get_rate_limiter(name)
+    attempt = 0
+    while True:
+        limiter.acquire(deadline=deadline)
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt >= retries:
+                limiter.release(throttled=is_rate_limit_error(e))
+                raise
+            retry_after = retry_after_seconds(e)
+            limiter.release(throttled=True, retry_after=retry_after)
+        else:
+            throttled = throttled_result is not None and throttled_result(result)
+            if not throttled or attempt >= retries:
+                limiter.release(throttled=throttled)
+                return result
+            retry_after = None
+            limiter.release(throttled=True)
+        time.sleep(backoff_delay(attempt, retry_after))
+        attempt += 1
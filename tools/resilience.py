@@ -0,0 +1,256 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from scientific_research_system.config import Config
+from scientific_research_system.tools.concurrency import get_attempt_executor
+from scientific_research_system.tools.rate_limit import rate_limited_call
+from scientific_research_system.tools.telemetry import record_search_event
+
+logger = logging.getLogger(__name__)
+
+# Successful call latencies kept per source for the hedge delay
+LATENCY_WINDOW = 200
+# No hedging until a source has this many latency samples
+HEDGE_MIN_SAMPLES = 20
+
+
+class BackendUnavailable(RuntimeError):
+    """
+    A search backend gave no answer: its circuit is open, or every attempt
+    failed or ran out of deadline. Callers fall back to cached or partial results.
+    """
+
+    def __init__(self, source: str, reason: str):
+        super().__init__(f"{source} unavailable ({reason})")
+        self.source = source
+        self.reason = reason
+
+
+class _DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend after `threshold` consecutive failed attempts.
+    After `reset_seconds` one probe call is let through (half-open): success
+    closes the circuit, failure opens it again. A threshold of 0 disables it.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if not self.threshold or self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, success: bool) -> bool:
+        """
+        Records one attempt. Returns True if this failure opened the circuit.
+        """
+        with self._lock:
+            self.probing = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return False
+            self.failures += 1
+            if not self.threshold or self.failures < self.threshold:
+                return False
+            opened = self.opened_at is None or time.monotonic() - self.opened_at >= self.reset_seconds
+            self.opened_at = time.monotonic()
+            return opened
+
+
+class ResilientBackend:
+    """
+    Call policy of one search backend ("arxiv" or "web"):
+
+    - a deadline per call, covering every attempt, hedge and backoff;
+    - retries of failed attempts after an exponential backoff with full jitter,
+      never sleeping past the deadline;
+    - hedging (optional): when an attempt is still running after the source's
+      p95 latency, a duplicate request is sent and the first answer wins;
+    - a circuit breaker that fails calls fast while the backend is down.
+
+    This is the only layer that retries a search request: each attempt takes one
+    slot of the source's rate limiter (never waiting past the deadline) and a
+    throttled response counts as a failed attempt.
+    Attempts run on their own pool so a call can stop waiting at its deadline;
+    an abandoned attempt finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, source: str, deadline: float, retries: int, retry_base: float,
+                 hedge: bool, hedge_percentile: float, hedge_min_delay: float, breaker: CircuitBreaker):
+        self.source = source
+        self.deadline = deadline
+        self.retries = retries
+        self.retry_base = retry_base
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self):
+        """
+        Seconds after which an attempt is hedged, or None (hedging off or too few samples).
+        """
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not self.hedge or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return max(self.hedge_min_delay, samples[index])
+
+    def _timed(self, fn, failed_result):
+        started = time.monotonic()
+        result = fn()
+        if failed_result is not None and failed_result(result):
+            raise RuntimeError(str(result)[:200])
+        with self._lock:
+            self.latencies.append(time.monotonic() - started)
+        return result
+
+    def _attempt(self, fn, failed_result, deadline: float):
+        """
+        One attempt, hedged once if it is slower than the hedge delay.
+        Raises _DeadlineExceeded at the deadline or the error of the last request to fail.
+        """
+        executor = get_attempt_executor()
+        pending = {executor.submit(self._timed, fn, failed_result): "primary"}
+        delay = self.hedge_delay()
+        hedged = False
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # A primary that fails before the hedge delay is left to the retry loop
+            hedging = delay is not None and not hedged
+            done, _ = wait(pending, timeout=min(delay, remaining) if hedging else remaining,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                if hedging:
+                    pending[executor.submit(self._timed, fn, failed_result)] = "hedge"
+                    hedged = True
+                    record_search_event(self.source, "hedge")
+                continue
+            for future in done:
+                kind = pending.pop(future)
+                if future.exception() is None:
+                    if kind == "hedge":
+                        record_search_event(self.source, "hedge_won")
+                    return future.result()
+                error = future.exception()
+        if pending:
+            raise _DeadlineExceeded(f"no answer within {self.deadline:g}s")
+        raise error
+
+    def call(self, fn, failed_result=None, throttled_result=None):
+        """
+        Runs fn() under the policy. `failed_result(result)` marks results that are
+        failures even though no exception was raised (e.g. error strings), and
+        `throttled_result(result)` those that are rate-limit responses.
+        Raises BackendUnavailable when no attempt succeeds.
+        """
+        if not self.breaker.allow():
+            record_search_event(self.source, "short_circuit")
+            raise BackendUnavailable(self.source, "circuit open")
+        deadline = time.monotonic() + self.deadline
+
+        def request():
+            return rate_limited_call(self.source, fn, throttled_result, retries=0, deadline=deadline)
+
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(request, failed_result, deadline)
+            except Exception as e:
+                timed_out = isinstance(e, _DeadlineExceeded)
+                record_search_event(self.source, "timeout" if timed_out else "error")
+                if self.breaker.record(success=False):
+                    record_search_event(self.source, "circuit_open")
+                    logger.warning("%s search circuit opened after %d failures", self.source, self.breaker.failures)
+                    raise BackendUnavailable(self.source, f"circuit opened: {e}") from e
+                backoff = random.uniform(0, self.retry_base * 2 ** attempt)
+                if (timed_out or attempt >= self.retries or self.breaker.state != "closed"
+                        or time.monotonic() + backoff >= deadline):
+                    raise BackendUnavailable(self.source, str(e) or type(e).__name__) from e
+                logger.info("%s search failed (%s); retrying in %.2fs", self.source, e, backoff)
+                record_search_event(self.source, "retry")
+                time.sleep(backoff)
+                attempt += 1
+            else:
+                self.breaker.record(success=True)
+                return result
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "latency_samples": len(self.latencies),
+            "hedge_delay": round(delay, 3) if delay is not None else None,
+        }
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(source: str) -> ResilientBackend:
+    """
+    Returns the shared call policy for "arxiv" or "web", configured from Config.
+    """
+    backend = _backends.get(source)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(source)
+            if backend is None:
+                if source == "arxiv":
+                    deadline = Config.ARXIV_DEADLINE
+                elif source == "web":
+                    deadline = Config.WEB_DEADLINE
+                else:
+                    raise ValueError(f"Unknown search backend '{source}'.")
+                hedged = {name.strip() for name in Config.SEARCH_HEDGE.split(",")}
+                backend = ResilientBackend(
+                    source, deadline, Config.SEARCH_MAX_RETRIES, Config.SEARCH_RETRY_BASE,
+                    source in hedged, Config.SEARCH_HEDGE_PERCENTILE, Config.SEARCH_HEDGE_MIN_DELAY,
+                    CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS),
+                )
+                _backends[source] = backend
+    return backend
+
+
+def resilient_call(source: str, fn, failed_result=None, throttled_result=None):
+    """
+    Runs one search request under the source's rate limit and its deadline, retry,
+    hedging and circuit breaker policy (see ResilientBackend). When
+    SEARCH_RESILIENCE_ENABLED is off, only the rate limiter (and its 429 retries) applies.
+    """
+    if not Config.SEARCH_RESILIENCE_ENABLED:
+        return rate_limited_call(source, fn, throttled_result)
+    return get_backend(source).call(fn, failed_result, throttled_result)
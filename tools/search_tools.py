@@ -1,5 +1,87 @@
+import threading
+
 from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 from langchain_core.tools import tool
+from scientific_research_system.config import Config
+from scientific_research_system.tools.cache import cached_tool_call
+from scientific_research_system.tools.concurrency import fan_out, format_batch, split_queries
+from scientific_research_system.tools.dedup import Deduplicator, deduplicate_outcomes
+from scientific_research_system.tools.resilience import BackendUnavailable, resilient_call
+
+try:
+    from ddgs import DDGS
+except ImportError:
+    # Older langchain releases depend on the original package name
+    from duckduckgo_search import DDGS
+
+_search = None
+_clients = threading.local()
+
+def _get_ddgs() -> DDGS:
+    """
+    Returns this thread's long-lived DDGS client (keeps its HTTP connections)
+    configured with the search timeout.
+    """
+    client = getattr(_clients, "ddgs", None)
+    if client is None:
+        client = DDGS(timeout=Config.SEARCH_TIMEOUT)
+        _clients.ddgs = client
+    return client
+
+class PooledDuckDuckGoSearchAPIWrapper(DuckDuckGoSearchAPIWrapper):
+    """
+    DuckDuckGoSearchAPIWrapper that reuses a per-thread DDGS client
+    instead of opening a new one for every query.
+    """
+
+    def run(self, query: str) -> str:
+        """
+        One record per result (title, link, snippet) instead of the bare
+        snippets, so repeated pages and arXiv mirrors can be recognised.
+        """
+        results = self._ddgs_text(query)
+        if not results:
+            return "No good DuckDuckGo Search Result was found"
+        return "\n\n".join(
+            f"Title: {r.get('title', '')}\nLink: {r.get('href', '')}\nSnippet: {r.get('body', '')}" for r in results
+        )
+
+    def _ddgs_text(self, query: str, max_results: int = None) -> list[dict]:
+        results = _get_ddgs().text(
+            query,
+            region=self.region,
+            safesearch=self.safesearch,
+            timelimit=self.time,
+            max_results=max_results or self.max_results,
+            backend=self.backend,
+        )
+        return list(results or [])
+
+def _get_search() -> DuckDuckGoSearchRun:
+    """
+    Returns a shared DuckDuckGoSearchRun instead of building a new client per call.
+    """
+    global _search
+    if _search is None:
+        _search = DuckDuckGoSearchRun(api_wrapper=PooledDuckDuckGoSearchAPIWrapper())
+    return _search
+
+def web_search_cached(query: str) -> str:
+    """
+    Runs one web query through the tool cache (and, on a miss, the shared web rate
+    limit and the web deadline/retry/hedging policy). While the search backend is
+    unavailable, an expired cache entry is returned if there is one.
+    """
+    search = _get_search()
+    return cached_tool_call(
+        "web",
+        query,
+        lambda: resilient_call("web", lambda: search.run(query)),
+        ttl=Config.WEB_CACHE_TTL,
+        max_results=search.api_wrapper.max_results,
+        layout="records"
+    )
 
 @tool
 def web_search(query: str) -> str:
@@ -7,6 +89,24 @@ def web_search(query: str) -> str:
     Performs a web search to find general scientific information, blog posts, or simplified explanations.
     Useful for broad context or finding recent developments not yet on arXiv.
     """
-    search = DuckDuckGoSearchRun()
-    return search.run(query)
+    try:
+        return web_search_cached(query)
+    except BackendUnavailable as e:
+        return f"[search failed: {e}]"
 
+def web_batch_search(queries, deduplicator: Deduplicator = None) -> str:
+    """
+    Runs all queries concurrently and merges the results, without pages repeated
+    across queries (or, with a run's shared `deduplicator`, mirrors of its arXiv papers).
+    """
+    outcomes = fan_out(web_search_cached, split_queries(queries))
+    report = deduplicate_outcomes(outcomes, "web", deduplicator)
+    return format_batch(outcomes) + report
+
+@tool
+def web_search_batch(queries: list[str]) -> str:
+    """
+    Runs a web search for every query concurrently and returns the merged results,
+    one section per query. Pages repeated across queries are listed once.
+    """
+    return web_batch_search(queries)
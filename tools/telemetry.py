@@ -0,0 +1,359 @@
+import os
+import threading
+from collections import OrderedDict
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    ConsoleMetricExporter, InMemoryMetricReader, PeriodicExportingMetricReader
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from scientific_research_system.config import Config
+
+TELEMETRY_EXPORTERS = ("none", "console", "file", "otlp")
+SERVICE_NAME = "scientific-research-system"
+
+# Span attributes shared by the agent plugin and the run summary
+INVOCATION_ATTRIBUTE = "research.invocation_id"
+KIND_ATTRIBUTE = "research.kind"
+
+# Run summaries kept in memory for the app's Performance tab
+MAX_SUMMARIES = 32
+
+
+class RunSummaryProcessor(SpanProcessor):
+    """
+    Keeps the finished spans of recent runs (grouped by invocation) as plain
+    dicts, so a run's timing breakdown is available without any exporter.
+    """
+
+    def __init__(self, max_runs: int = MAX_SUMMARIES):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_end(self, span):
+        invocation_id = span.attributes.get(INVOCATION_ATTRIBUTE)
+        if not invocation_id:
+            return
+        record = {
+            "kind": span.attributes.get(KIND_ATTRIBUTE, "other"),
+            "name": span.name,
+            "seconds": (span.end_time - span.start_time) / 1e9,
+            "attributes": dict(span.attributes),
+        }
+        with self._lock:
+            self._runs.setdefault(invocation_id, []).append(record)
+            self._runs.move_to_end(invocation_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+    def spans(self, invocation_id: str) -> list[dict]:
+        with self._lock:
+            return list(self._runs.get(invocation_id, []))
+
+
+def _file_stream(path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return open(path, "a", encoding="utf-8")
+
+
+def _span_exporter(exporter: str):
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        return ConsoleSpanExporter(
+            out=_file_stream(Config.TELEMETRY_PATH),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        raise ImportError("TELEMETRY_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http.")
+    # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+    return OTLPSpanExporter()
+
+
+def _metric_exporter(exporter: str):
+    if exporter == "console":
+        return ConsoleMetricExporter()
+    if exporter == "file":
+        return ConsoleMetricExporter(
+            out=_file_stream(Config.TELEMETRY_PATH),
+            formatter=lambda metrics: metrics.to_json(indent=None) + os.linesep,
+        )
+    try:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    except ImportError:
+        raise ImportError("TELEMETRY_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http.")
+    return OTLPMetricExporter()
+
+
+class Telemetry:
+    """
+    The application's own tracer and meter providers.
+
+    They are deliberately not installed as the global providers, so ADK's
+    built-in spans do not get exported twice next to ours. Finished spans always
+    feed the in-memory run summaries; with TELEMETRY_EXPORTER set they are also
+    written to the console, to a JSONL file (offline) or to an OTLP collector.
+    """
+
+    def __init__(self, exporter: str = None):
+        self.exporter = (exporter or Config.TELEMETRY_EXPORTER).lower()
+        if self.exporter not in TELEMETRY_EXPORTERS:
+            raise ValueError(f"Unknown telemetry exporter '{self.exporter}'. Use one of {TELEMETRY_EXPORTERS}.")
+        resource = Resource.create({"service.name": SERVICE_NAME})
+
+        self.summaries = RunSummaryProcessor()
+        self.tracer_provider = TracerProvider(resource=resource)
+        self.tracer_provider.add_span_processor(self.summaries)
+
+        self.metric_reader = InMemoryMetricReader()
+        readers = [self.metric_reader]
+        if self.exporter != "none":
+            self.tracer_provider.add_span_processor(BatchSpanProcessor(_span_exporter(self.exporter)))
+            readers.append(PeriodicExportingMetricReader(
+                _metric_exporter(self.exporter),
+                export_interval_millis=Config.TELEMETRY_METRIC_INTERVAL * 1000,
+            ))
+        self.meter_provider = MeterProvider(resource=resource, metric_readers=readers)
+
+        self.tracer = self.tracer_provider.get_tracer("scientific_research_system")
+        meter = self.meter_provider.get_meter("scientific_research_system")
+        self.cache_requests = meter.create_counter(
+            "research.cache.requests", unit="1",
+            description="Cache lookups by cache, source and result (hit/miss)",
+        )
+        self.model_tokens = meter.create_counter(
+            "research.model.tokens", unit="{token}",
+            description="Model tokens by agent, model tier and type (prompt/completion)",
+        )
+        self.tool_duration = meter.create_histogram(
+            "research.tool.duration", unit="s", description="Tool call duration by tool",
+        )
+        self.dedup_documents = meter.create_counter(
+            "research.dedup.documents", unit="{document}",
+            description="Search results by source and dedup outcome (kept/exact/near)",
+        )
+        self.dedup_chars = meter.create_counter(
+            "research.dedup.chars_removed", unit="{char}",
+            description="Characters of duplicate search results removed, by source",
+        )
+        self.search_events = meter.create_counter(
+            "research.search.events", unit="1",
+            description="Search resilience events by source and event (retry, hedge, hedge_won, timeout, "
+                        "error, circuit_open, short_circuit, stale, partial)",
+        )
+
+    def search_stats(self) -> dict:
+        """
+        Process-wide search resilience events: {source: {event: count}}.
+        """
+        stats = {}
+        data = self.metric_reader.get_metrics_data()
+        for resource_metrics in (data.resource_metrics if data else []):
+            for scope in resource_metrics.scope_metrics:
+                for metric in scope.metrics:
+                    if metric.name != "research.search.events":
+                        continue
+                    for point in metric.data.data_points:
+                        attrs = point.attributes
+                        stats.setdefault(attrs["source"], {})[attrs["event"]] = point.value
+        return stats
+
+    def cache_stats(self) -> dict:
+        """
+        Process-wide cache lookups: {"cache/source": {"hits", "misses", "hit_rate"}}.
+        """
+        stats = {}
+        data = self.metric_reader.get_metrics_data()
+        for resource_metrics in (data.resource_metrics if data else []):
+            for scope in resource_metrics.scope_metrics:
+                for metric in scope.metrics:
+                    if metric.name != "research.cache.requests":
+                        continue
+                    for point in metric.data.data_points:
+                        attrs = point.attributes
+                        entry = stats.setdefault(f"{attrs['cache']}/{attrs['source']}", {"hits": 0, "misses": 0})
+                        entry["hits" if attrs["result"] == "hit" else "misses"] += point.value
+        for entry in stats.values():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / total, 4) if total else 0.0
+        return stats
+
+    def shutdown(self):
+        self.tracer_provider.shutdown()
+        self.meter_provider.shutdown()
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """
+    Returns the process-wide Telemetry instance (created lazily from Config).
+    """
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry()
+    return _telemetry
+
+
+def record_cache(cache: str, source: str, hit: bool):
+    """
+    Counts one cache lookup ("tool", "llm" or "checkpoint" cache).
+    """
+    if Config.TELEMETRY_ENABLED:
+        get_telemetry().cache_requests.add(1, {"cache": cache, "source": source, "result": "hit" if hit else "miss"})
+
+
+def record_dedup(source: str, report: dict):
+    """
+    Counts the outcome of deduplicating one search response (see tools/dedup.py).
+    """
+    if Config.TELEMETRY_ENABLED and report["documents"]:
+        telemetry = get_telemetry()
+        kept = report["documents"] - report["exact_duplicates"] - report["near_duplicates"]
+        for result, count in (("kept", kept), ("exact", report["exact_duplicates"]),
+                              ("near", report["near_duplicates"])):
+            if count:
+                telemetry.dedup_documents.add(count, {"source": source, "result": result})
+        if report["chars_removed"]:
+            telemetry.dedup_chars.add(report["chars_removed"], {"source": source})
+
+
+def record_search_event(source: str, event: str):
+    """
+    Counts one search resilience event (see tools/resilience.py).
+    """
+    if Config.TELEMETRY_ENABLED:
+        get_telemetry().search_events.add(1, {"source": source, "event": event})
+
+
+def parse_prices(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    Parses "model=prompt/completion,..." (USD per million tokens) into {model: (prompt, completion)}.
+    """
+    prices = {}
+    for item in (spec or "").split(","):
+        if "=" not in item or "/" not in item:
+            continue
+        model, rates = item.split("=", 1)
+        prompt, completion = rates.split("/", 1)
+        try:
+            prices[model.strip()] = (float(prompt), float(completion))
+        except ValueError:
+            continue
+    return prices
+
+
+def model_cost(model: str, prompt_tokens: int, completion_tokens: int, prices: dict = None):
+    """
+    Cost in USD of one model call at `prices` (default MODEL_PRICES), or None for a model without a price.
+    """
+    prices = parse_prices(Config.MODEL_PRICES) if prices is None else prices
+    # Versioned names ("gemini-2.5-flash-001") use the price of their base model
+    name = max((m for m in prices if model == m or model.startswith(m + "-")), key=len, default=None)
+    if name is None:
+        return None
+    prompt_price, completion_price = prices[name]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+def _agent_row(summary: dict, name: str) -> dict:
+    return summary["agents"].setdefault(name, {
+        "seconds": 0.0, "model_seconds": 0.0, "tool_seconds": 0.0,
+        "model_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+    })
+
+
+def run_summary(invocation_id: str) -> dict:
+    """
+    Timing breakdown of one run from its spans: wall time, stages, agents
+    (leaf agents, with their model/tool time and tokens), tools, models and
+    model tiers (calls, latency, tokens, fallbacks and cost at MODEL_PRICES;
+    answers served from the LLM cache cost nothing).
+    """
+    summary = {"seconds": 0.0, "stages": [], "agents": {}, "tools": {}, "models": {}, "tiers": {}}
+    prices = parse_prices(Config.MODEL_PRICES)
+    for span in get_telemetry().summaries.spans(invocation_id):
+        attrs = span["attributes"]
+        kind = span["kind"]
+        agent_name = attrs.get("research.agent")
+        if kind == "workflow":
+            summary["seconds"] = max(summary["seconds"], span["seconds"])
+        if kind == "stage":
+            summary["stages"].append({"stage": agent_name, "seconds": span["seconds"]})
+        if kind in ("stage", "agent") and attrs.get("research.leaf"):
+            _agent_row(summary, agent_name)["seconds"] += span["seconds"]
+        elif kind == "model":
+            prompt = attrs.get("gen_ai.usage.input_tokens", 0)
+            completion = attrs.get("gen_ai.usage.output_tokens", 0)
+            cache_hit = bool(attrs.get("research.cache_hit"))
+            agent = _agent_row(summary, agent_name)
+            agent["model_seconds"] += span["seconds"]
+            agent["model_calls"] += 1
+            agent["prompt_tokens"] += prompt
+            agent["completion_tokens"] += completion
+            # The model that answered (after fallbacks), else the one requested
+            name = attrs.get("gen_ai.response.model") or attrs.get("gen_ai.request.model", "unknown")
+            cost = 0.0 if cache_hit else model_cost(name, prompt, completion, prices)
+            model = summary["models"].setdefault(name, {
+                "calls": 0, "seconds": 0.0, "cache_hits": 0, "cost_usd": 0.0,
+            })
+            model["calls"] += 1
+            model["seconds"] += span["seconds"]
+            model["cache_hits"] += int(cache_hit)
+            model["cost_usd"] += cost or 0.0
+            tier = summary["tiers"].setdefault(attrs.get("research.model.tier", "unrouted"), {
+                "calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                "fallbacks": 0, "cost_usd": 0.0, "unpriced_calls": 0, "models": [],
+            })
+            tier["calls"] += 1
+            tier["seconds"] += span["seconds"]
+            tier["prompt_tokens"] += prompt
+            tier["completion_tokens"] += completion
+            tier["fallbacks"] += int(bool(attrs.get("research.model.fallbacks")))
+            tier["cost_usd"] += cost or 0.0
+            tier["unpriced_calls"] += int(cost is None)
+            if name not in tier["models"]:
+                tier["models"].append(name)
+        elif kind == "tool":
+            _agent_row(summary, agent_name)["tool_seconds"] += span["seconds"]
+            tool = summary["tools"].setdefault(attrs.get("gen_ai.tool.name"), {
+                "calls": 0, "seconds": 0.0, "args_bytes": 0, "result_bytes": 0,
+            })
+            tool["calls"] += 1
+            tool["seconds"] += span["seconds"]
+            tool["args_bytes"] += attrs.get("research.tool.args_bytes", 0)
+            tool["result_bytes"] += attrs.get("research.tool.result_bytes", 0)
+    for tier in summary["tiers"].values():
+        tier["mean_seconds"] = tier["seconds"] / tier["calls"]
+        tier["cost_usd"] = round(tier["cost_usd"], 6)
+    for model in summary["models"].values():
+        model["cost_usd"] = round(model["cost_usd"], 6)
+    # Slowest first
+    summary["stages"].sort(key=lambda stage: -stage["seconds"])
+    return summary
+
+
+def format_tiers(summary: dict) -> str:
+    """
+    The model tier rows of a run summary as a text table (CLI output).
+    """
+    lines = [f"{'tier':12s} {'calls':>5s} {'seconds':>8s} {'mean s':>7s} {'prompt':>9s} {'output':>8s} "
+             f"{'fallbk':>6s} {'cost USD':>10s}  models"]
+    for name, tier in sorted(summary["tiers"].items()):
+        cost = f"{tier['cost_usd']:.4f}" + ("+?" if tier["unpriced_calls"] else "")
+        lines.append(f"{name:12s} {tier['calls']:5d} {tier['seconds']:8.2f} {tier['mean_seconds']:7.2f} "
+                     f"{tier['prompt_tokens']:9d} {tier['completion_tokens']:8d} {tier['fallbacks']:6d} "
+                     f"{cost:>10s}  {', '.join(tier['models'])}")
+    total = sum(tier["cost_usd"] for tier in summary["tiers"].values())
+    lines.append(f"{'total':12s} {sum(t['calls'] for t in summary['tiers'].values()):5d} {'':8s} {'':7s} "
+                 f"{'':9s} {'':8s} {'':6s} {total:10.4f}")
+    return "\n".join(lines)